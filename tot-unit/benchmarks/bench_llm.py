@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from common import write_json
+from tot_unit.core import Candidate
+from tot_unit.core.selectors import GreedySelector
+from tot_unit.core.stoppers import MaxStepStopper
+from tot_unit.llm import LLMConfig
+from tot_unit.llm_tot import LLMToT, LLMToTConfig, LLMToTStepConfig
+from tot_unit.mock import LATENCY_DISTRIBUTIONS, MockLLM, MockLLMConfig, MockRegistry, MockServer
+
+
+def _prompt_builder(step: int, cand: Candidate) -> str:
+    return f"Continue the solution.\n{cand.text}"
+
+
+def _vote_prompt_builder(step: int, candidates: list[Candidate]) -> str:
+    prompt = 'Pick the most promising choice and end with "The best choice is {s}".\n'
+    for i, cand in enumerate(candidates, 1):
+        prompt += f"Choice {i}:\n{cand.text}\n"
+    return prompt
+
+
+def _llm_tot(args: argparse.Namespace, width: int, api_base: str, registry: MockRegistry | None) -> LLMToT:
+    llm = LLMConfig(
+        api_key="mock",
+        api_base=api_base,
+        model="mock",
+        max_n_per_request=args.max_n,
+        retry_backoff=0.0,
+        max_rate_limit_retries=50,
+        max_concurrency=args.concurrency,
+        http2=False,
+    )
+    cfg = LLMToTConfig(
+        steps=args.depth,
+        n_generate=args.n_generate,
+        n_select=width,
+        n_evaluate=args.n_evaluate,
+        step_llms=[LLMToTStepConfig(gen=llm, judge=llm)] * args.depth,
+        prompt_builder=_prompt_builder,
+        vote_prompt_builder=_vote_prompt_builder,
+        max_concurrency=args.concurrency,
+    )
+    return LLMToT(cfg=cfg, selector=GreedySelector(), stopper=MaxStepStopper(max_step=args.depth - 1), registry=registry)
+
+
+def _timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="LLMToT benchmark against the offline mock LLM")
+    parser.add_argument("--widths", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--n-generate", type=int, default=4)
+    parser.add_argument("--n-evaluate", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.02, help="mean seconds per request")
+    parser.add_argument("--dist", default="lognormal", choices=LATENCY_DISTRIBUTIONS)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--max-n", type=int, default=None, help="server-side cap on n per request")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--http", action="store_true", help="go through a local HTTP server instead of in-process clients")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    mock_cfg = MockLLMConfig(
+        latency=args.latency,
+        latency_dist=args.dist,
+        rate_limit_rate=args.rate_limit,
+        max_n=args.max_n,
+        seed=args.seed,
+    )
+    initial = [Candidate(state=None, text="")]
+    print(f"{'width':>6}{'sync s':>10}{'async s':>10}{'speedup':>9}{'requests':>10}{'429s':>7}{'tokens':>10}")
+    rows = []
+    for width in args.widths:
+        timings = {}
+        for mode in ("sync", "async"):
+            llm = MockLLM(mock_cfg)
+            server = MockServer(llm).start() if args.http else None
+            try:
+                api_base = server.url if server is not None else "http://mock.invalid/v1"
+                tot = _llm_tot(args, width, api_base, None if server is not None else MockRegistry(llm))
+                if mode == "sync":
+                    timings[mode] = _timed(lambda: tot.run(initial))
+                else:
+                    timings[mode] = _timed(lambda: asyncio.run(tot.arun(initial)))
+            finally:
+                if server is not None:
+                    server.stop()
+            stats = llm.stats
+        row = {
+            "width": width,
+            "sync_seconds": timings["sync"],
+            "async_seconds": timings["async"],
+            "speedup": timings["sync"] / timings["async"],
+            "requests": stats.requests,
+            "rate_limited": stats.rate_limited,
+            "tokens": stats.prompt_tokens + stats.completion_tokens,
+        }
+        rows.append(row)
+        print(
+            f"{width:>6}{row['sync_seconds']:>10.3f}{row['async_seconds']:>10.3f}{row['speedup']:>8.1f}x"
+            f"{row['requests']:>10}{row['rate_limited']:>7}{row['tokens']:>10,}"
+        )
+    write_json(args.json, "llm", vars(args), rows)
+
+
+if __name__ == "__main__":
+    main()
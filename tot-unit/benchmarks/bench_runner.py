@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import argparse
+import random
+import tracemalloc
+
+from common import timeit, write_json
+from tot_unit.core import Candidate, ToTConfig, ToTRunner
+from tot_unit.core.selectors import GreedySelector
+from tot_unit.core.stoppers import MaxStepStopper
+
+
+class _Generator:
+    def generate(self, step: int, current: list[Candidate], n_generate: int) -> list[Candidate]:
+        return [
+            Candidate(state=None, text=f"{cand.text} s{step}c{i}", meta={"step": step})
+            for cand in current
+            for i in range(n_generate)
+        ]
+
+
+class _Evaluator:
+    def __init__(self, seed: int) -> None:
+        self.rng = random.Random(seed)
+
+    def evaluate(self, step: int, candidates: list[Candidate], n_evaluate: int) -> list[float]:
+        return [self.rng.random() for _ in candidates]
+
+
+def _runner(width: int, depth: int, n_generate: int, retention: str) -> ToTRunner:
+    cfg = ToTConfig(steps=depth, n_generate=n_generate, n_select=width, n_evaluate=1, log_retention=retention)
+    return ToTRunner(_Generator(), _Evaluator(0), GreedySelector(), MaxStepStopper(max_step=depth - 1), cfg)
+
+
+def _memory_per_candidate(width: int, depth: int, n_generate: int, retention: str) -> tuple[float, int]:
+    runner = _runner(width, depth, n_generate, retention)
+    initial = [Candidate(state=None, text="root")]
+    tracemalloc.start()
+    try:
+        result = runner.run(initial)
+        # what the returned result keeps alive, telemetry included
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    generated = result.search.generated if result.search is not None else 0
+    return current / max(1, generated), generated
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ToTRunner throughput benchmark (no LLM calls)")
+    parser.add_argument("--widths", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--depths", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--n-generate", type=int, default=4)
+    parser.add_argument("--retention", default="full", choices=["full", "selected", "summary", "none"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    print(f"{'width':>6}{'depth':>6}{'candidates':>12}{'ms/run':>10}{'steps/s':>10}{'cand/s':>12}{'B/cand':>10}")
+    rows = []
+    initial = [Candidate(state=None, text="root")]
+    for width in args.widths:
+        for depth in args.depths:
+            runner = _runner(width, depth, args.n_generate, args.retention)
+            seconds = timeit(lambda: runner.run(initial), args.repeat)
+            per_cand, generated = _memory_per_candidate(width, depth, args.n_generate, args.retention)
+            row = {
+                "width": width,
+                "depth": depth,
+                "candidates": generated,
+                "seconds": seconds,
+                "steps_per_sec": depth / seconds,
+                "candidates_per_sec": generated / seconds,
+                "bytes_per_candidate": per_cand,
+            }
+            rows.append(row)
+            print(
+                f"{width:>6}{depth:>6}{generated:>12,}{seconds * 1e3:>10.2f}{row['steps_per_sec']:>10.0f}"
+                f"{row['candidates_per_sec']:>12,.0f}{per_cand:>10.0f}"
+            )
+    write_json(args.json, "runner", vars(args), rows)
+
+
+if __name__ == "__main__":
+    main()
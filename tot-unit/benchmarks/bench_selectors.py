@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import argparse
+import random
+
+from common import timeit, write_json
+from tot_unit.core import Candidate
+from tot_unit.core.fast_selectors import MMRSelector, SoftmaxSelector, TopKSelector, WeightedSampleSelector
+from tot_unit.core.selectors import GreedySelector, SampleSelector
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Selector scaling benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--k", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    selectors = {
+        "GreedySelector": GreedySelector(),
+        "TopKSelector": TopKSelector(),
+        "SampleSelector": SampleSelector(seed=0),
+        "WeightedSampleSelector": WeightedSampleSelector(seed=0),
+        "SoftmaxSelector": SoftmaxSelector(seed=0, temperature=0.5),
+        "MMRSelector": MMRSelector(),
+    }
+
+    rng = random.Random(0)
+    print(f"{'selector':<24}" + "".join(f"{n:>14,}" for n in args.sizes))
+    rows: dict[str, list[float]] = {name: [] for name in selectors}
+    for n in args.sizes:
+        candidates = [Candidate(state=None, text=f"candidate {i} {rng.random():.6f}") for i in range(n)]
+        scores = [rng.random() for _ in range(n)]
+        for name, selector in selectors.items():
+            rows[name].append(timeit(lambda: selector.select(candidates, scores, args.k), args.repeat))
+    for name, times in rows.items():
+        print(f"{name:<24}" + "".join(f"{t * 1e3:>12.2f}ms" for t in times))
+    write_json(
+        args.json,
+        "selectors",
+        vars(args),
+        [{"selector": name, "n": n, "seconds": t} for name, times in rows.items() for n, t in zip(args.sizes, times)],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import json
+import os
+import platform
+import sys
+import time
+from typing import Callable
+
+# benchmarks run from a checkout without installing the package
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+
+def timeit(fn: Callable[[], object], repeat: int) -> float:
+    """
+    Best wall time of `repeat` calls, in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def write_json(path: str | None, benchmark: str, params: dict, rows: list[dict]) -> None:
+    """
+    Machine-readable results for CI comparisons; no-op without `path`.
+    """
+    if not path:
+        return
+    payload = {
+        "benchmark": benchmark,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "params": params,
+        "rows": rows,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
@@ -11,6 +11,7 @@ from tot_unit.core.selectors import GreedySelector
 from tot_unit.core.stoppers import MaxStepStopper
 from tot_unit.llm import LLMConfig
 from tot_unit.llm_tot import LLMToT, LLMToTConfig, LLMToTStepConfig
+from tot_unit.prompts import Prompt
 
 
 @dataclass(frozen=True)
@@ -34,9 +35,10 @@ VOTE_PROMPT = (
 )
 
 
-def _prompt_builder(step: int, cand: Candidate[TextState]) -> str:
+def _prompt_builder(step: int, cand: Candidate[TextState]) -> Prompt:
+    # instruction as a stable prefix shared by siblings, so provider prompt caching can hit
     base_prompt = COT_PROMPT.format(input=cand.state.prompt)
-    return base_prompt + cand.text
+    return Prompt(prefix=(base_prompt,), suffix=cand.text)
 
 
 def _stop_provider(step: int, cand: Candidate[TextState]) -> Optional[str]:
@@ -126,6 +128,12 @@ def main():
     print("\n--- Best ---\n")
     print(best)
 
+    usage = llm_tot.usage
+    print(
+        f"\n[usage] prompt={usage.prompt_tokens} (cached={usage.cached_prompt_tokens}) "
+        f"completion={usage.completion_tokens}"
+    )
+
 
 if __name__ == "__main__":
     main()
@@ -1,8 +1,60 @@
 from .core.types import Candidate, Trace, RunResult, StepLog
-from .core.interfaces import Generator, Evaluator, Selector, Stopper
+from .core.interfaces import Generator, Evaluator, Selector, Stopper, AsyncGenerator, AsyncEvaluator, EarlyCommitSelector, Deduplicator
 from .core.runner import ToTRunner, ToTConfig
-from .pipeline import Pipeline, Stage
-from .llm import LLMConfig, OpenAICompatibleClient, StepRouter, LLMGenerator, LLMVoteEvaluator
+from .core.search import SearchStrategy, SearchBudget, SearchStats, BeamSearch, BestFirstSearch, DFSSearch, MCTSSearch
+from .core.async_runner import AsyncToTRunner
+from .core.pipelined import PipelinedToTRunner
+from .core.batch import BatchCheckpoint
+from .core.checkpoint import RunCheckpoint, RunState
+from .core.budget import BudgetTracker, RunBudget, Spend, StepPlan
+from .core.tracing import Span, SpanExporter, RunTelemetry, CallStats, Price, current_telemetry, current_trace
+from .core.hooks import Hook, BaseHook, Profiler, PhaseStats, ProfileEvent
+from .core.dedup import CandidateDeduper, CountPriorEvaluator, DedupStats
+from .core.logs import StepLogSink, JSONLStepLogSink, ParquetStepLogSink, StepLogReader
+from .core.tree import CandidateStore, RunStores, TreeCandidate
+from .core.codec import StateCodec, JSONCodec, PickleCodec
+from .pipeline import Pipeline, PipelineStream, Stage, StageOptions, StageStats
+from .llm import (
+    LLMConfig,
+    OpenAICompatibleClient,
+    AsyncOpenAICompatibleClient,
+    StepRouter,
+    LLMGenerator,
+    LLMVoteEvaluator,
+    AsyncLLMGenerator,
+    AsyncLLMVoteEvaluator,
+    EarlyStop,
+    UsageStats,
+    stop_on_regex,
+    stop_at_length,
+)
+from .cache import CacheStats, CompletionCache, MemoryCache, SQLiteCache, TieredCache, default_cache
+from .prompts import Prompt
+from .voting import VoteChunking
+from .routing import AsyncRoutedClient, EndpointHealth, ProviderHealth, RoutedClient, RoutingPolicy, RoutingStats
+from .vote_parsing import (
+    JSONVoteParser,
+    RankingVoteParser,
+    RegexVoteParser,
+    VoteParser,
+    count_votes,
+    register_vote_pattern,
+    structured_vote_options,
+)
+from .adaptive import AdaptiveVoting, AdaptiveGeneration
+from .otel import OpenTelemetryExporter
+from .value import LLMValueEvaluator, AsyncLLMValueEvaluator, ValuePromptBuilder
+from .clients import ClientRegistry, default_registry
+from .mock import MockLLM, MockLLMConfig, MockRegistry, MockServer, MockOpenAI, AsyncMockOpenAI
+from .limits import (
+    EndpointLimits,
+    InFlightLimiter,
+    RateLimiter,
+    TokenBucket,
+    AdaptiveConcurrency,
+    EndpointLimiter,
+    endpoint_limiter,
+)
 from .llm_tot import LLMToT, LLMToTConfig, LLMToTStepConfig
 
 __all__ = [
@@ -16,13 +68,110 @@ __all__ = [
     "Stopper",
     "ToTRunner",
     "ToTConfig",
+    "SearchStrategy",
+    "SearchBudget",
+    "SearchStats",
+    "BeamSearch",
+    "BestFirstSearch",
+    "DFSSearch",
+    "MCTSSearch",
+    "AsyncGenerator",
+    "AsyncEvaluator",
+    "EarlyCommitSelector",
+    "Deduplicator",
+    "AsyncToTRunner",
+    "PipelinedToTRunner",
+    "BatchCheckpoint",
+    "RunCheckpoint",
+    "RunBudget",
+    "BudgetTracker",
+    "Spend",
+    "StepPlan",
+    "RunState",
+    "Span",
+    "SpanExporter",
+    "RunTelemetry",
+    "CallStats",
+    "Price",
+    "current_trace",
+    "current_telemetry",
+    "Hook",
+    "BaseHook",
+    "Profiler",
+    "PhaseStats",
+    "ProfileEvent",
+    "CandidateDeduper",
+    "CountPriorEvaluator",
+    "DedupStats",
+    "StepLogSink",
+    "JSONLStepLogSink",
+    "ParquetStepLogSink",
+    "StepLogReader",
+    "CandidateStore",
+    "RunStores",
+    "TreeCandidate",
+    "StateCodec",
+    "JSONCodec",
+    "PickleCodec",
     "Pipeline",
     "Stage",
+    "StageOptions",
+    "StageStats",
+    "PipelineStream",
     "LLMConfig",
     "OpenAICompatibleClient",
+    "AsyncOpenAICompatibleClient",
     "StepRouter",
     "LLMGenerator",
     "LLMVoteEvaluator",
+    "AsyncLLMGenerator",
+    "AsyncLLMVoteEvaluator",
+    "EarlyStop",
+    "UsageStats",
+    "stop_on_regex",
+    "stop_at_length",
+    "CacheStats",
+    "CompletionCache",
+    "MemoryCache",
+    "SQLiteCache",
+    "TieredCache",
+    "default_cache",
+    "Prompt",
+    "VoteChunking",
+    "RoutingPolicy",
+    "RoutingStats",
+    "RoutedClient",
+    "AsyncRoutedClient",
+    "EndpointHealth",
+    "ProviderHealth",
+    "VoteParser",
+    "RegexVoteParser",
+    "RankingVoteParser",
+    "JSONVoteParser",
+    "count_votes",
+    "register_vote_pattern",
+    "structured_vote_options",
+    "AdaptiveVoting",
+    "AdaptiveGeneration",
+    "OpenTelemetryExporter",
+    "LLMValueEvaluator",
+    "AsyncLLMValueEvaluator",
+    "ValuePromptBuilder",
+    "ClientRegistry",
+    "default_registry",
+    "MockLLM",
+    "MockLLMConfig",
+    "MockRegistry",
+    "MockServer",
+    "MockOpenAI",
+    "AsyncMockOpenAI",
+    "EndpointLimits",
+    "InFlightLimiter",
+    "RateLimiter",
+    "TokenBucket",
+    "AdaptiveConcurrency",
+    "EndpointLimiter",
+    "endpoint_limiter",
     "LLMToT",
     "LLMToTConfig",
     "LLMToTStepConfig",
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from statistics import NormalDist
+from typing import Callable, Hashable, Optional
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def sample_rounds(n: int, batch: int) -> list[int]:
+    """
+    Split `n` samples into rounds of at most `batch`.
+    """
+    return [min(batch, n - i) for i in range(0, n, batch)]
+
+
+@dataclass(frozen=True)
+class AdaptiveVoting:
+    """
+    Request vote samples `batch` at a time and stop once the top `top_k`
+    set is decided: the k-th candidate leads the (k+1)-th by more votes than
+    are left to cast, so the remaining votes could not change the selection.
+    With `confidence` (e.g. 0.95) voting also stops when that lead is
+    significant under a sign test, which may rarely change the selection.
+    Scores are rescaled to `n_evaluate` votes so thresholds keep their meaning.
+    """
+
+    batch: int = 2
+    top_k: int = 1
+    confidence: Optional[float] = None
+
+    def __post_init__(self) -> None:
+        if self.batch < 1:
+            raise ValueError("batch must be >= 1")
+        if self.top_k < 1:
+            raise ValueError("top_k must be >= 1")
+        if self.confidence is not None and not 0.5 < self.confidence < 1.0:
+            raise ValueError("confidence must be in (0.5, 1)")
+
+    def decided(self, votes: list[float], remaining: int) -> bool:
+        if remaining <= 0 or self.top_k >= len(votes):
+            return True
+        order = sorted(votes, reverse=True)
+        lead = order[self.top_k - 1] - order[self.top_k]
+        if lead > remaining:
+            return True
+        if self.confidence is None or lead <= 0:
+            return False
+        contested = order[self.top_k - 1] + order[self.top_k]
+        z = NormalDist().inv_cdf(self.confidence)
+        return lead >= z * math.sqrt(contested)
+
+    @staticmethod
+    def rescale(votes: list[float], drawn: int, n_evaluate: int) -> list[float]:
+        if drawn <= 0 or drawn == n_evaluate:
+            return votes
+        return [v * n_evaluate / drawn for v in votes]
+
+
+@dataclass(frozen=True)
+class AdaptiveGeneration:
+    """
+    Request children `batch` samples at a time and stop once `patience`
+    rounds in a row produced nothing new. A sample is new if `key(text)`
+    (normalized text by default) hasn't been seen for this parent.
+    """
+
+    batch: int = 2
+    patience: int = 1
+    key: Callable[[str], Hashable] = field(default=_normalize, compare=False)
+
+    def __post_init__(self) -> None:
+        if self.batch < 1:
+            raise ValueError("batch must be >= 1")
+        if self.patience < 1:
+            raise ValueError("patience must be >= 1")
+
+    def tracker(self) -> "NoveltyTracker":
+        return NoveltyTracker(self)
+
+
+class NoveltyTracker:
+    """
+    Per-parent state of AdaptiveGeneration.
+    """
+
+    def __init__(self, cfg: AdaptiveGeneration) -> None:
+        self.cfg = cfg
+        self.seen: set[Hashable] = set()
+        self.stale = 0
+
+    def add(self, samples: list[str]) -> int:
+        new = 0
+        for text in samples:
+            key = self.cfg.key(text)
+            if key not in self.seen:
+                self.seen.add(key)
+                new += 1
+        # a round only counts as stale when it had samples and none were new
+        self.stale = self.stale + 1 if samples and new == 0 else 0
+        return new
+
+    @property
+    def done(self) -> bool:
+        return self.stale >= self.cfg.patience
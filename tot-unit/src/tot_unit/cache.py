@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional, Protocol
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class CompletionCache(Protocol):
+    """
+    Key/value store for single completion samples. Keys come from `completion_key`.
+    """
+
+    stats: CacheStats
+
+    def get(self, key: str) -> Optional[str]: ...
+
+    def put(self, key: str, value: str) -> None: ...
+
+
+def completion_key(
+    model: str,
+    api_base: str,
+    prompt: Any,
+    temperature: float,
+    max_tokens: int,
+    stop: Optional[str],
+    index: int,
+) -> str:
+    """
+    Content address of the `index`-th sample for a request. `prompt` may be
+    any JSON-serializable value (plain text or a message list).
+    """
+    payload = json.dumps(
+        [model, api_base.rstrip("/"), prompt, temperature, max_tokens, stop, index],
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryCache:
+    """
+    In-process LRU tier with optional TTL (seconds).
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float | None = None) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1")
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._data: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and self.ttl is not None and time.time() - item[1] > self.ttl:
+                del self._data[key]
+                item = None
+            if item is None:
+                self.stats.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.stats.hits += 1
+            return item[0]
+
+    def put(self, key: str, value: str) -> None:
+        with self._lock:
+            self._data[key] = (value, time.time())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache:
+    """
+    On-disk tier backed by a single SQLite file. Safe to share across threads.
+    """
+
+    def __init__(self, path: str, ttl: float | None = None) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.stats = CacheStats()
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS completions (key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value, created FROM completions WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl is not None and time.time() - row[1] > self.ttl:
+                with self._conn:
+                    self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.stats.misses += 1
+                return None
+            self.stats.hits += 1
+            return row[0]
+
+    def put(self, key: str, value: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, value, created) VALUES (?, ?, ?)",
+                (key, value, time.time()),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class TieredCache:
+    """
+    Checks tiers in order (fastest first) and promotes hits into the faster tiers.
+    `stats` counts a lookup once, regardless of how many tiers were consulted.
+    """
+
+    def __init__(self, tiers: list[CompletionCache]) -> None:
+        if not tiers:
+            raise ValueError("tiers must not be empty")
+        self.tiers = tiers
+        self.stats = CacheStats()
+
+    def get(self, key: str) -> Optional[str]:
+        for i, tier in enumerate(self.tiers):
+            value = tier.get(key)
+            if value is not None:
+                for faster in self.tiers[:i]:
+                    faster.put(key, value)
+                self.stats.hits += 1
+                return value
+        self.stats.misses += 1
+        return None
+
+    def put(self, key: str, value: str) -> None:
+        for tier in self.tiers:
+            tier.put(key, value)
+
+
+def default_cache(path: str | None = None, max_size: int = 10000, ttl: float | None = None) -> CompletionCache:
+    """
+    Memory LRU, backed by SQLite when `path` is given.
+    """
+    memory = MemoryCache(max_size=max_size, ttl=ttl)
+    if path is None:
+        return memory
+    return TieredCache([memory, SQLiteCache(path, ttl=ttl)])
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import threading
+import weakref
+from typing import TYPE_CHECKING, Any
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+if TYPE_CHECKING:
+    from .llm import LLMConfig
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+class ClientRegistry:
+    """
+    Shares OpenAI SDK clients (and their HTTP connection pools) between every
+    OpenAICompatibleClient pointing at the same endpoint with the same
+    transport settings, across steps, runs and LLMToT instances.
+
+    Async clients are kept per event loop: httpx connections cannot be reused
+    across loops.
+    """
+
+    def __init__(self) -> None:
+        self._sync: dict[tuple, OpenAI] = {}
+        self._async: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[tuple, AsyncOpenAI]] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(cfg: LLMConfig) -> tuple:
+        return (
+            cfg.api_key,
+            cfg.api_base.rstrip("/"),
+            cfg.timeout,
+            cfg.connect_timeout,
+            cfg.max_connections,
+            cfg.max_keepalive_connections,
+            cfg.http2,
+        )
+
+    @staticmethod
+    def _http_kwargs(cfg: LLMConfig) -> dict[str, Any]:
+        return {
+            "http2": cfg.http2 and _http2_available(),
+            "limits": httpx.Limits(
+                max_connections=cfg.max_connections,
+                max_keepalive_connections=cfg.max_keepalive_connections,
+                keepalive_expiry=cfg.keepalive_expiry,
+            ),
+            "timeout": httpx.Timeout(cfg.timeout, connect=cfg.connect_timeout),
+        }
+
+    def sync_client(self, cfg: LLMConfig) -> OpenAI:
+        key = self._key(cfg)
+        with self._lock:
+            client = self._sync.get(key)
+            if client is None:
+                # retries are handled per chunk by OpenAICompatibleClient
+                client = OpenAI(
+                    api_key=cfg.api_key,
+                    base_url=cfg.api_base,
+                    max_retries=0,
+                    http_client=httpx.Client(**self._http_kwargs(cfg)),
+                )
+                self._sync[key] = client
+            return client
+
+    def async_client(self, cfg: LLMConfig) -> AsyncOpenAI:
+        loop = asyncio.get_running_loop()
+        key = self._key(cfg)
+        with self._lock:
+            per_loop = self._async.setdefault(loop, {})
+            client = per_loop.get(key)
+            if client is None:
+                client = AsyncOpenAI(
+                    api_key=cfg.api_key,
+                    base_url=cfg.api_base,
+                    max_retries=0,
+                    http_client=httpx.AsyncClient(**self._http_kwargs(cfg)),
+                )
+                per_loop[key] = client
+            return client
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "sync_clients": len(self._sync),
+                "async_clients": sum(len(v) for v in self._async.values()),
+            }
+
+    def close(self) -> None:
+        """
+        Close pooled sync connections. Async pools are released with their loop.
+        """
+        with self._lock:
+            for client in self._sync.values():
+                client.close()
+            self._sync.clear()
+
+
+default_registry = ClientRegistry()
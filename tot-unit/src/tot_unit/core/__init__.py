@@ -1,7 +1,21 @@
 from .types import Candidate, Trace, RunResult, StepLog
-from .interfaces import Generator, Evaluator, Selector, Stopper
+from .interfaces import Generator, Evaluator, Selector, Stopper, AsyncGenerator, AsyncEvaluator, EarlyCommitSelector, Deduplicator
 from .runner import ToTRunner, ToTConfig
+from .search import SearchStrategy, SearchBudget, SearchStats, BeamSearch, BestFirstSearch, DFSSearch, MCTSSearch
+from .async_runner import AsyncToTRunner
+from .pipelined import PipelinedToTRunner
+from .batch import BatchCheckpoint
+from .checkpoint import RunCheckpoint, RunState
+from .budget import BudgetTracker, RunBudget, Spend, StepPlan
+from .tracing import Span, SpanExporter, RunTelemetry, CallStats, Price, current_telemetry, current_trace
+from .hooks import Hook, BaseHook, Profiler, PhaseStats, ProfileEvent
+from .dedup import CandidateDeduper, CountPriorEvaluator, DedupStats
+from .logs import StepLogSink, JSONLStepLogSink, ParquetStepLogSink, StepLogReader
+from .tree import CandidateStore, RunStores, TreeCandidate
+from .codec import StateCodec, JSONCodec, PickleCodec
+from .adapters import as_async_generator, as_async_evaluator
 from .selectors import GreedySelector, SampleSelector
+from .fast_selectors import TopKSelector, WeightedSampleSelector, SoftmaxSelector, MMRSelector
 from .stoppers import MaxStepStopper, ScoreThresholdStopper
 
 __all__ = [
@@ -15,8 +29,59 @@ __all__ = [
     "Stopper",
     "ToTRunner",
     "ToTConfig",
+    "SearchStrategy",
+    "SearchBudget",
+    "SearchStats",
+    "BeamSearch",
+    "BestFirstSearch",
+    "DFSSearch",
+    "MCTSSearch",
+    "AsyncGenerator",
+    "AsyncEvaluator",
+    "EarlyCommitSelector",
+    "Deduplicator",
+    "AsyncToTRunner",
+    "PipelinedToTRunner",
+    "BatchCheckpoint",
+    "RunCheckpoint",
+    "RunBudget",
+    "BudgetTracker",
+    "Spend",
+    "StepPlan",
+    "RunState",
+    "Span",
+    "SpanExporter",
+    "RunTelemetry",
+    "CallStats",
+    "Price",
+    "current_trace",
+    "current_telemetry",
+    "Hook",
+    "BaseHook",
+    "Profiler",
+    "PhaseStats",
+    "ProfileEvent",
+    "CandidateDeduper",
+    "CountPriorEvaluator",
+    "DedupStats",
+    "StepLogSink",
+    "JSONLStepLogSink",
+    "ParquetStepLogSink",
+    "StepLogReader",
+    "CandidateStore",
+    "RunStores",
+    "TreeCandidate",
+    "StateCodec",
+    "JSONCodec",
+    "PickleCodec",
+    "as_async_generator",
+    "as_async_evaluator",
     "GreedySelector",
     "SampleSelector",
+    "TopKSelector",
+    "WeightedSampleSelector",
+    "SoftmaxSelector",
+    "MMRSelector",
     "MaxStepStopper",
     "ScoreThresholdStopper",
 ]
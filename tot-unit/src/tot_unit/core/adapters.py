@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+from typing import Generic, TypeVar
+
+from .interfaces import AsyncEvaluator, AsyncGenerator, Evaluator, Generator
+from .types import Candidate
+
+
+StateT = TypeVar("StateT")
+
+
+class AsyncGeneratorAdapter(Generic[StateT]):
+    """
+    Run a sync Generator in a worker thread so it can be used by AsyncToTRunner.
+    """
+
+    def __init__(self, generator: Generator[StateT]) -> None:
+        self.generator = generator
+
+    async def generate(self, step: int, current: list[Candidate[StateT]], n_generate: int) -> list[Candidate[StateT]]:
+        return await asyncio.to_thread(self.generator.generate, step, current, n_generate)
+
+
+class AsyncEvaluatorAdapter(Generic[StateT]):
+    """
+    Run a sync Evaluator in a worker thread so it can be used by AsyncToTRunner.
+    """
+
+    def __init__(self, evaluator: Evaluator[StateT]) -> None:
+        self.evaluator = evaluator
+
+    async def evaluate(self, step: int, candidates: list[Candidate[StateT]], n_evaluate: int) -> list[float]:
+        return await asyncio.to_thread(self.evaluator.evaluate, step, candidates, n_evaluate)
+
+
+def as_async_generator(generator: Generator[StateT] | AsyncGenerator[StateT]) -> AsyncGenerator[StateT]:
+    if inspect.iscoroutinefunction(generator.generate):
+        return generator
+    return AsyncGeneratorAdapter(generator)
+
+
+def as_async_evaluator(evaluator: Evaluator[StateT] | AsyncEvaluator[StateT]) -> AsyncEvaluator[StateT]:
+    if inspect.iscoroutinefunction(evaluator.evaluate):
+        return evaluator
+    return AsyncEvaluatorAdapter(evaluator)
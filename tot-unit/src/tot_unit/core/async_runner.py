@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+from dataclasses import replace
+from typing import AsyncIterator, Generic, Iterable, Sequence, TypeVar
+
+from .adapters import as_async_evaluator, as_async_generator
+from .batch import BatchCheckpoint, as_checkpoint, pending_problems
+from .budget import RunBudget
+from .checkpoint import RunCheckpoint, as_run_checkpoint, restore_rng, resume_state, runner_components
+from .hooks import Hook, phase
+from .interfaces import AsyncEvaluator, AsyncGenerator, Deduplicator, Evaluator, Generator, Selector, Stopper
+from .logs import StepLogSink
+from .runner import ToTConfig
+from .search import BeamSearch, SearchStrategy
+from .tracing import SpanExporter, run_scope
+from .types import Candidate, RunResult
+
+
+StateT = TypeVar("StateT")
+
+
+class AsyncToTRunner(Generic[StateT]):
+    """
+    Asyncio version of ToTRunner. Same step semantics, but generation and
+    evaluation are awaited so components can fan out I/O concurrently.
+    Sync components are accepted and run in worker threads. `strategy`,
+    `checkpoint` / `resume` and `budget` work as in ToTRunner: the runner
+    drives the same core.search strategies, awaiting each expansion.
+    """
+
+    def __init__(
+        self,
+        generator: AsyncGenerator[StateT] | Generator[StateT],
+        evaluator: AsyncEvaluator[StateT] | Evaluator[StateT],
+        selector: Selector[StateT],
+        stopper: Stopper[StateT],
+        cfg: ToTConfig,
+        sink: StepLogSink | None = None,
+        dedup: Deduplicator[StateT] | None = None,
+        exporter: SpanExporter | None = None,
+        hooks: Sequence[Hook] = (),
+        checkpoint: RunCheckpoint | str | None = None,
+        budget: RunBudget | None = None,
+        strategy: SearchStrategy[StateT] | None = None,
+    ) -> None:
+        self.generator = as_async_generator(generator)
+        self.evaluator = as_async_evaluator(evaluator)
+        self.selector = selector
+        self.stopper = stopper
+        self.cfg = cfg
+        self.sink = sink
+        self.dedup = dedup
+        self.exporter = exporter
+        self.hooks = tuple(hooks)
+        self.checkpoint = as_run_checkpoint(checkpoint)
+        self.budget = budget
+        self.strategy = strategy or BeamSearch()
+        if not hasattr(self.strategy, "asearch"):
+            raise ValueError("strategy has no asearch; AsyncToTRunner needs a strategy it can await")
+        if self.checkpoint is not None and not isinstance(self.strategy, BeamSearch):
+            raise ValueError("checkpointing is supported with BeamSearch only")
+
+    async def run(self, initial_candidates: list[Candidate[StateT]], run_id: str | None = None) -> RunResult[StateT]:
+        run_id = run_id or uuid.uuid4().hex
+        with run_scope(run_id, self.exporter) as telemetry, phase(self.hooks, "run", run_id=run_id) as p:
+            result = p["result"] = await self.strategy.asearch(self, initial_candidates, run_id)
+        return replace(result, telemetry=telemetry)
+
+    async def resume(self, run_id: str | None = None) -> RunResult[StateT]:
+        """
+        Continue a checkpointed run; see ToTRunner.resume.
+        """
+        state = resume_state(self.checkpoint, run_id)
+        if state.done:
+            return RunResult(final_candidates=state.frontier, logs=state.logs, search=state.search)
+        restore_rng(runner_components(self), state.rng)
+        with run_scope(state.run_id, self.exporter) as telemetry, phase(
+            self.hooks, "run", run_id=state.run_id, resumed_at=state.step
+        ) as p:
+            result = p["result"] = await self.strategy.asearch(self, state.frontier, state.run_id, state=state)
+        return replace(result, telemetry=telemetry)
+
+    async def run_batch(
+        self,
+        problems: Iterable[list[Candidate[StateT]]],
+        max_concurrent: int = 32,
+        checkpoint: BatchCheckpoint | str | None = None,
+    ) -> AsyncIterator[tuple[int, RunResult[StateT]]]:
+        """
+        Async counterpart of ToTRunner.run_batch: up to `max_concurrent` trees
+        share one event loop, results are yielded as each tree finishes.
+        """
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be >= 1")
+        ckpt = as_checkpoint(checkpoint)
+        done = ckpt.load() if ckpt is not None else {}
+        for index in sorted(done):
+            yield index, done[index]
+
+        todo = pending_problems(problems, done)
+        running: dict[asyncio.Task, int] = {}
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(running) < max_concurrent:
+                    item = next(todo, None)
+                    if item is None:
+                        exhausted = True
+                        break
+                    running[asyncio.create_task(self.run(item[1]))] = item[0]
+                if not running:
+                    return
+                finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    index = running.pop(task)
+                    result = task.result()
+                    if ckpt is not None:
+                        ckpt.record(index, result)
+                    yield index, result
+        finally:
+            for task in running:
+                task.cancel()
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from typing import Iterable, Iterator, Mapping, TypeVar
+
+from .codec import PickleCodec, StateCodec, run_result_from_dict, run_result_to_dict
+from .types import Candidate, RunResult
+
+
+StateT = TypeVar("StateT")
+
+
+# records are written as {"index": ..., "result": ...}, so the index is read without parsing the result
+_INDEX = re.compile(rb'^\{"index": (\d+),')
+
+
+class RecordedResults(Mapping[int, RunResult]):
+    """
+    Results stored in a BatchCheckpoint, keyed by problem index. Only the
+    byte offset of each record is kept in memory; a result is read and
+    decoded when it is looked up, so resuming a large batch doesn't load
+    every finished tree at once.
+    """
+
+    def __init__(self, path: str, offsets: dict[int, int], codec: StateCodec) -> None:
+        self.path = path
+        self.codec = codec
+        self._offsets = offsets
+
+    def __getitem__(self, index: int) -> RunResult:
+        offset = self._offsets[index]
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            rec = json.loads(f.readline())
+        return run_result_from_dict(rec["result"], self.codec)
+
+    def __contains__(self, index: object) -> bool:
+        return index in self._offsets
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._offsets)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+
+class BatchCheckpoint:
+    """
+    Append-only JSONL record of finished trees, keyed by problem index.
+    Re-running a batch with the same checkpoint skips the recorded problems.
+    """
+
+    def __init__(self, path: str, codec: StateCodec | None = None) -> None:
+        self.path = path
+        self.codec = codec or PickleCodec()
+        self._lock = threading.Lock()
+
+    def load(self) -> RecordedResults:
+        """
+        Recorded results, decoded lazily (see RecordedResults). A problem
+        recorded twice maps to its last record.
+        """
+        offsets: dict[int, int] = {}
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                pos = 0
+                for line in f:
+                    start, pos = pos, pos + len(line)
+                    if not line.endswith(b"\n"):
+                        # torn last line from a crash
+                        continue
+                    match = _INDEX.match(line)
+                    if match is not None:
+                        offsets[int(match.group(1))] = start
+                        continue
+                    try:
+                        offsets[int(json.loads(line)["index"])] = start
+                    except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                        continue
+        return RecordedResults(self.path, offsets, self.codec)
+
+    def record(self, index: int, result: RunResult) -> None:
+        line = json.dumps({"index": index, "result": run_result_to_dict(result, self.codec)}, ensure_ascii=False)
+        with self._lock:
+            parent = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(parent, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+
+def as_checkpoint(checkpoint: BatchCheckpoint | str | None) -> BatchCheckpoint | None:
+    if checkpoint is None or isinstance(checkpoint, BatchCheckpoint):
+        return checkpoint
+    return BatchCheckpoint(checkpoint)
+
+
+def pending_problems(
+    problems: Iterable[list[Candidate[StateT]]],
+    done: Mapping[int, RunResult[StateT]],
+) -> Iterator[tuple[int, list[Candidate[StateT]]]]:
+    for index, initial in enumerate(problems):
+        if index not in done:
+            yield index, initial
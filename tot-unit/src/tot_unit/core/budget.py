@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Mapping
+
+from .tracing import Price, RunTelemetry, current_telemetry
+
+if TYPE_CHECKING:
+    from .runner import ToTConfig
+
+
+@dataclass(frozen=True)
+class RunBudget:
+    """
+    Spend caps of one run. Tokens, calls and cost come live from the run's
+    LLM call spans (see core.tracing; the LLM clients record one per
+    request), so only what has already returned counts; `max_cost` needs
+    `prices` per model. Wall time counts from the start of the run (or of
+    its resumption).
+
+    Reaching a hard cap ends the run with its best candidates so far
+    (SearchStats.stopped_by == "budget"). Before that, steps are paced to
+    land on the soft caps (`soft` times each hard cap): when the spend per
+    step so far projects past them, n_generate, n_evaluate and the beam
+    width shrink for the next step; past a soft cap every step runs at the
+    minimum widths.
+    """
+
+    max_tokens: int | None = None
+    max_calls: int | None = None
+    max_seconds: float | None = None
+    max_cost: float | None = None
+    prices: Mapping[str, Price] = field(default_factory=dict, compare=False)
+    soft: float = 0.8
+    min_generate: int = 1
+    min_evaluate: int = 1
+    min_select: int = 1
+
+    def __post_init__(self) -> None:
+        if not 0.0 < self.soft <= 1.0:
+            raise ValueError("soft must be in (0, 1]")
+        if min(self.min_generate, self.min_evaluate, self.min_select) < 1:
+            raise ValueError("min_generate, min_evaluate and min_select must be >= 1")
+        if self.max_cost is not None and not self.prices:
+            raise ValueError("max_cost needs prices")
+
+
+@dataclass(frozen=True)
+class Spend:
+    tokens: int = 0
+    calls: int = 0
+    seconds: float = 0.0
+    cost: float = 0.0
+
+
+@dataclass(frozen=True)
+class StepPlan:
+    """
+    Widths of one step. `scale` is its expected cost relative to a step at
+    the configured widths.
+    """
+
+    n_generate: int
+    n_evaluate: int
+    n_select: int
+    scale: float = 1.0
+
+
+class BudgetTracker:
+    """
+    Live spend of one run against a RunBudget, and the plan of each step.
+    Created by the runner inside the run, so it sees that run's telemetry.
+    """
+
+    def __init__(self, budget: RunBudget, cfg: ToTConfig, telemetry: RunTelemetry | None = None) -> None:
+        self.budget = budget
+        self.cfg = cfg
+        self.telemetry = telemetry if telemetry is not None else current_telemetry()
+        self.plans: dict[int, StepPlan] = {}
+        self._started = time.perf_counter()
+        # summed `scale` of the steps spent so far: spend / units = spend of a full step
+        self._units = 0.0
+
+    def spend(self) -> Spend:
+        seconds = time.perf_counter() - self._started
+        if self.telemetry is None:
+            return Spend(seconds=seconds)
+        total = self.telemetry.total()
+        cost = self.telemetry.cost(self.budget.prices) if self.budget.max_cost is not None else 0.0
+        return Spend(tokens=total.total_tokens, calls=total.calls, seconds=seconds, cost=cost)
+
+    def _usage(self, spend: Spend) -> list[tuple[float, float]]:
+        b = self.budget
+        pairs = [
+            (spend.tokens, b.max_tokens),
+            (spend.calls, b.max_calls),
+            (spend.seconds, b.max_seconds),
+            (spend.cost, b.max_cost),
+        ]
+        return [(float(spent), float(cap)) for spent, cap in pairs if cap is not None]
+
+    def exhausted(self) -> bool:
+        return any(spent >= cap for spent, cap in self._usage(self.spend()))
+
+    def plan(self, step: int) -> StepPlan:
+        """
+        Widths for `step`, fixed once asked for so every phase of the step
+        agrees.
+        """
+        plan = self.plans.get(step)
+        if plan is None:
+            plan = self.plans[step] = self._plan(step)
+            self._units += plan.scale
+        return plan
+
+    def _plan(self, step: int) -> StepPlan:
+        usage = self._usage(self.spend())
+        scale = 1.0
+        steps_left = max(1, self.cfg.steps - step)
+        for spent, cap in usage:
+            target = self.budget.soft * cap
+            if spent >= target:
+                scale = 0.0
+                break
+            if self._units > 0 and spent > 0:
+                full_step = spent / self._units
+                scale = min(scale, (target - spent) / (full_step * steps_left))
+        return self._scaled(scale)
+
+    def _scaled(self, scale: float) -> StepPlan:
+        cfg, b = self.cfg, self.budget
+        if scale >= 1.0:
+            return StepPlan(cfg.n_generate, cfg.n_evaluate, cfg.n_select)
+        # generation cost grows with beam x n_generate, so each takes the square root
+        root = math.sqrt(max(0.0, scale))
+        n_generate = min(cfg.n_generate, max(b.min_generate, round(cfg.n_generate * root)))
+        n_select = min(cfg.n_select, max(b.min_select, round(cfg.n_select * root)))
+        n_evaluate = min(cfg.n_evaluate, max(b.min_evaluate, round(cfg.n_evaluate * scale)))
+        actual = (n_generate * n_select / (cfg.n_generate * cfg.n_select) + n_evaluate / cfg.n_evaluate) / 2
+        return StepPlan(n_generate, n_evaluate, n_select, actual)
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import base64
+import json
+import os
+import pickle
+import random
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import Any, Generic, Mapping, TypeVar
+
+from .codec import PickleCodec, StateCodec, candidate_from_dict, candidate_to_dict, step_log_from_dict, step_log_to_dict
+from .search import SearchStats
+from .types import Candidate, StepLog
+
+
+StateT = TypeVar("StateT")
+
+CHECKPOINT_VERSION = 2
+
+
+@dataclass
+class RunState(Generic[StateT]):
+    """
+    Snapshot of a run between two steps: `frontier` (with `scores`) is the
+    input of step `step`. `done` marks a finished run, whose frontier is the
+    final result. `rng` holds the random state of the run's components.
+    """
+
+    run_id: str
+    step: int
+    frontier: list[Candidate[StateT]]
+    scores: list[float]
+    logs: list[StepLog[StateT]] = field(default_factory=list)
+    search: SearchStats | None = None
+    rng: dict[str, str] = field(default_factory=dict)
+    done: bool = False
+
+
+def _pickled(value: Any) -> str:
+    return base64.b64encode(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)).decode("ascii")
+
+
+def _unpickled(data: str) -> Any:
+    return pickle.loads(base64.b64decode(data))
+
+
+def runner_components(runner: Any) -> dict[str, Any]:
+    return {name: getattr(runner, name, None) for name in ("generator", "evaluator", "selector", "stopper", "dedup")}
+
+
+def capture_rng(components: Mapping[str, Any]) -> dict[str, str]:
+    """
+    Random state of every component holding a `_rng` (random.Random or numpy
+    Generator), e.g. the sampling selectors. The global `random` module is
+    left alone: it is shared with everything else in the process.
+    """
+    states: dict[str, str] = {}
+    for name, obj in components.items():
+        rng = getattr(obj, "_rng", None)
+        if isinstance(rng, random.Random):
+            states[name] = _pickled(rng.getstate())
+        elif hasattr(rng, "bit_generator"):
+            states[name] = _pickled(rng.bit_generator.state)
+    return states
+
+
+def restore_rng(components: Mapping[str, Any], states: Mapping[str, str]) -> None:
+    for name, obj in components.items():
+        rng = getattr(obj, "_rng", None)
+        if name not in states or rng is None:
+            continue
+        if isinstance(rng, random.Random):
+            rng.setstate(_unpickled(states[name]))
+        elif hasattr(rng, "bit_generator"):
+            rng.bit_generator.state = _unpickled(states[name])
+
+
+def run_state_to_dict(state: RunState, codec: StateCodec, logs_from: int = 0) -> dict:
+    """
+    JSON record of `state`; with `logs_from`, only the logs after the first
+    `logs_from` (those of earlier records of the same run).
+    """
+    return {
+        "version": CHECKPOINT_VERSION,
+        "run_id": state.run_id,
+        "step": state.step,
+        "frontier": [candidate_to_dict(c, codec) for c in state.frontier],
+        "scores": list(state.scores),
+        "logs": [step_log_to_dict(log, codec) for log in state.logs[logs_from:]],
+        "search": asdict(state.search) if state.search is not None else None,
+        "rng": dict(state.rng),
+        "done": state.done,
+    }
+
+
+def run_state_from_dict(data: dict, codec: StateCodec, logs: list[StepLog] | None = None) -> RunState:
+    """
+    RunState of one record; `logs` are those of the run's earlier records.
+    """
+    if data.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"unsupported checkpoint version {data.get('version')!r}")
+    search = data.get("search")
+    return RunState(
+        run_id=data["run_id"],
+        step=data["step"],
+        frontier=[candidate_from_dict(c, codec) for c in data["frontier"]],
+        scores=list(data["scores"]),
+        logs=(logs or []) + [step_log_from_dict(log, codec) for log in data["logs"]],
+        search=SearchStats(**search) if search is not None else None,
+        rng=dict(data.get("rng") or {}),
+        done=data.get("done", False),
+    )
+
+
+class RunCheckpoint:
+    """
+    RunStates of every run under `directory`, one JSON-lines file per run id.
+    Each step appends one record holding the step's state and only the step
+    logs added since the previous record, so a run's checkpoints cost O(steps)
+    to write; loading replays the records. A record torn by a crash is
+    ignored, leaving the previous one. `codec` encodes `Candidate.state`
+    (see core.codec). Tree-backed candidates are stored with their full text
+    and come back as plain Candidates.
+    """
+
+    suffix = ".ckpt.jsonl"
+
+    def __init__(self, directory: str, codec: StateCodec | None = None) -> None:
+        self.directory = directory
+        self.codec = codec or PickleCodec()
+        # run id -> (step, number of logs) of the last record written or loaded here
+        self._written: dict[str, tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def path(self, run_id: str) -> str:
+        return os.path.join(self.directory, run_id + self.suffix)
+
+    def save(self, state: RunState) -> None:
+        """
+        Append `state` to its run's file. The first record of a run in this
+        process (or of a run started over) replaces the file atomically.
+        """
+        with self._lock:
+            last = self._written.get(state.run_id)
+            append = last is not None and state.step > last[0] and len(state.logs) >= last[1]
+            record = run_state_to_dict(state, self.codec, logs_from=last[1] if append else 0)
+            line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+            os.makedirs(self.directory, exist_ok=True)
+            path = self.path(state.run_id)
+            if append:
+                with open(path, "ab") as f:
+                    f.write(line)
+                    f.flush()
+                    os.fsync(f.fileno())
+            else:
+                tmp = f"{path}.{os.getpid()}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(line)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, path)
+            self._written[state.run_id] = (state.step, len(state.logs))
+
+    def _records(self, run_id: str) -> list[dict]:
+        path = self.path(run_id)
+        if not os.path.exists(path):
+            return []
+        with open(path, "rb") as f:
+            lines = f.read().split(b"\n")
+        # the last element is the unterminated tail: empty, or a record torn by a crash
+        return [json.loads(line) for line in lines[:-1] if line.strip()]
+
+    def load(self, run_id: str) -> RunState | None:
+        state: RunState | None = None
+        for record in self._records(run_id):
+            state = run_state_from_dict(record, self.codec, state.logs if state is not None else None)
+        if state is not None:
+            with self._lock:
+                self._written[run_id] = (state.step, len(state.logs))
+        return state
+
+    def run_ids(self) -> list[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name[: -len(self.suffix)] for name in os.listdir(self.directory) if name.endswith(self.suffix))
+
+    def latest(self, unfinished: bool = True) -> str | None:
+        """
+        Most recently written run id (only runs not yet done by default).
+        """
+        ids = sorted(self.run_ids(), key=lambda r: os.path.getmtime(self.path(r)), reverse=True)
+        for run_id in ids:
+            if not unfinished:
+                return run_id
+            records = self._records(run_id)
+            if records and not records[-1].get("done", False):
+                return run_id
+        return None
+
+    def discard(self, run_id: str) -> None:
+        with self._lock:
+            self._written.pop(run_id, None)
+        try:
+            os.remove(self.path(run_id))
+        except FileNotFoundError:
+            pass
+
+
+def as_run_checkpoint(checkpoint: RunCheckpoint | str | None) -> RunCheckpoint | None:
+    if checkpoint is None or isinstance(checkpoint, RunCheckpoint):
+        return checkpoint
+    return RunCheckpoint(checkpoint)
+
+
+def resume_state(checkpoint: RunCheckpoint | None, run_id: str | None = None) -> RunState:
+    """
+    State to resume: that of `run_id`, else of the latest unfinished run.
+    """
+    if checkpoint is None:
+        raise ValueError("resume needs a checkpoint")
+    run_id = run_id or checkpoint.latest()
+    state = checkpoint.load(run_id) if run_id is not None else None
+    if state is None:
+        raise FileNotFoundError(f"no checkpoint for run {run_id!r} in {checkpoint.directory}")
+    return state
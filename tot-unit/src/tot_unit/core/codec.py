@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import base64
+import pickle
+from typing import Any, Protocol
+
+from .types import Candidate, RunResult, StepLog
+
+
+class StateCodec(Protocol):
+    """
+    Converts `Candidate.state` to and from a JSON-serializable value.
+    """
+
+    def encode(self, state: Any) -> Any: ...
+
+    def decode(self, data: Any) -> Any: ...
+
+
+class JSONCodec:
+    """
+    For states that are already JSON-native (str, numbers, lists, dicts, None).
+    """
+
+    def encode(self, state: Any) -> Any:
+        return state
+
+    def decode(self, data: Any) -> Any:
+        return data
+
+
+class PickleCodec:
+    """
+    Default codec: handles arbitrary picklable states (dataclasses, tuples, ...).
+    Only load files you wrote yourself.
+    """
+
+    def encode(self, state: Any) -> Any:
+        return base64.b64encode(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)).decode("ascii")
+
+    def decode(self, data: Any) -> Any:
+        return pickle.loads(base64.b64decode(data))
+
+
+def candidate_to_dict(cand: Candidate, codec: StateCodec) -> dict:
+    return {"state": codec.encode(cand.state), "text": cand.text, "meta": cand.meta}
+
+
+def candidate_from_dict(data: dict, codec: StateCodec) -> Candidate:
+    return Candidate(state=codec.decode(data["state"]), text=data["text"], meta=dict(data.get("meta") or {}))
+
+
+def step_log_to_dict(log: StepLog, codec: StateCodec) -> dict:
+    return {
+        "step": log.step,
+        "candidates": [candidate_to_dict(c, codec) for c in log.candidates],
+        "scores": list(log.scores),
+        "selected": [candidate_to_dict(c, codec) for c in log.selected],
+        "stats": dict(log.stats),
+    }
+
+
+def step_log_from_dict(data: dict, codec: StateCodec) -> StepLog:
+    return StepLog(
+        step=data["step"],
+        candidates=[candidate_from_dict(c, codec) for c in data["candidates"]],
+        scores=list(data["scores"]),
+        selected=[candidate_from_dict(c, codec) for c in data["selected"]],
+        stats=data.get("stats") or {},
+    )
+
+
+def run_result_to_dict(result: RunResult, codec: StateCodec) -> dict:
+    return {
+        "final_candidates": [candidate_to_dict(c, codec) for c in result.final_candidates],
+        "logs": [step_log_to_dict(log, codec) for log in result.logs],
+    }
+
+
+def run_result_from_dict(data: dict, codec: StateCodec) -> RunResult:
+    return RunResult(
+        final_candidates=[candidate_from_dict(c, codec) for c in data["final_candidates"]],
+        logs=[step_log_from_dict(log, codec) for log in data["logs"]],
+    )
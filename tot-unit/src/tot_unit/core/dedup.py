@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import math
+import random
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Hashable, TypeVar
+
+from .interfaces import Deduplicator, Evaluator
+from .types import Candidate
+
+
+StateT = TypeVar("StateT")
+
+_MERSENNE = (1 << 61) - 1
+DEDUP_METHODS = ("exact", "minhash", "simhash")
+
+
+@dataclass
+class DedupStats:
+    """
+    Running totals across every step deduplicated by one instance.
+    `saved_tokens` estimates the evaluation prompt tokens (~4 chars per token)
+    of the candidates that were dropped.
+    """
+
+    candidates: int = 0
+    kept: int = 0
+    exact: int = 0
+    near: int = 0
+    saved_tokens: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    @property
+    def removed(self) -> int:
+        return self.exact + self.near
+
+    def record(self, candidates: int, kept: int, exact: int, near: int, saved_tokens: int) -> None:
+        with self._lock:
+            self.candidates += candidates
+            self.kept += kept
+            self.exact += exact
+            self.near += near
+            self.saved_tokens += saved_tokens
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _shingles(text: str, n: int) -> set[int]:
+    text = _normalize(text)
+    grams = [text[i : i + n] for i in range(max(1, len(text) - n + 1))]
+    return {int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest(), "little") for g in grams}
+
+
+def _split(cand: Candidate) -> tuple[Hashable, str]:
+    """
+    (parent key, text added at this step). Near-duplicates are only looked for
+    among siblings, on the new text, so a long shared parent does not make
+    every sibling look alike.
+    """
+    delta = getattr(cand, "delta", None)
+    if delta is not None:
+        return ("node", cand.parent_id), delta
+    cut = cand.meta.get("parent_len")
+    if cut is None:
+        return None, cand.text
+    return cand.text[:cut], cand.text[cut:]
+
+
+def _with_meta(cand: Candidate[StateT], meta: dict[str, Any]) -> Candidate[StateT]:
+    merged = copy.copy(cand)
+    object.__setattr__(merged, "meta", meta)
+    return merged
+
+
+@dataclass(frozen=True)
+class CandidateDeduper(Deduplicator[StateT]):
+    """
+    Collapses exact duplicates (normalized full text) and, with `method`
+    "minhash" or "simhash", near-duplicate siblings whose estimated similarity
+    is at least `threshold` (Jaccard of character `shingle`-grams for MinHash,
+    1 - hamming/64 for SimHash). The first candidate of each group is kept,
+    with the others' meta merged in and `meta["dup_count"]` set to the group
+    size (see CountPriorEvaluator).
+    """
+
+    method: str = "minhash"
+    threshold: float = 0.8
+    shingle: int = 3
+    num_perm: int = 64
+    seed: int = 1
+    stats: DedupStats = field(default_factory=DedupStats, compare=False)
+    _perms: list[tuple[int, int]] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if self.method not in DEDUP_METHODS:
+            raise ValueError(f"method must be one of {DEDUP_METHODS}")
+        if not 0.0 < self.threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+        rng = random.Random(self.seed)
+        perms = [(rng.randrange(1, _MERSENNE), rng.randrange(0, _MERSENNE)) for _ in range(self.num_perm)]
+        object.__setattr__(self, "_perms", perms)
+
+    def _minhash(self, text: str) -> tuple[int, ...]:
+        hs = _shingles(text, self.shingle)
+        return tuple(min((a * h + b) % _MERSENNE for h in hs) for a, b in self._perms)
+
+    def _simhash(self, text: str) -> int:
+        weights = [0] * 64
+        for h in _shingles(text, self.shingle):
+            for bit in range(64):
+                weights[bit] += 1 if h >> bit & 1 else -1
+        return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+    def _sketch(self, text: str) -> Any:
+        return self._minhash(text) if self.method == "minhash" else self._simhash(text)
+
+    def _similar(self, a: Any, b: Any) -> bool:
+        if self.method == "minhash":
+            return sum(x == y for x, y in zip(a, b)) / len(a) >= self.threshold
+        return 1.0 - bin(a ^ b).count("1") / 64.0 >= self.threshold
+
+    def dedup(self, step: int, candidates: list[Candidate[StateT]]) -> list[Candidate[StateT]]:
+        groups: list[list[Candidate[StateT]]] = []
+        by_text: dict[str, int] = {}
+        # parent key -> [(sketch, group index)] of kept siblings
+        sketches: dict[Hashable, list[tuple[Any, int]]] = {}
+        exact = near = 0
+
+        for cand in candidates:
+            key = _normalize(cand.text)
+            if key in by_text:
+                groups[by_text[key]].append(cand)
+                exact += 1
+                continue
+            match = None
+            if self.method != "exact":
+                parent, body = _split(cand)
+                sketch = self._sketch(body)
+                siblings = sketches.setdefault(parent, [])
+                match = next((g for s, g in siblings if self._similar(sketch, s)), None)
+                if match is None:
+                    siblings.append((sketch, len(groups)))
+            if match is not None:
+                groups[match].append(cand)
+                near += 1
+                by_text[key] = match
+                continue
+            by_text[key] = len(groups)
+            groups.append([cand])
+
+        kept = [self._merge(group) for group in groups]
+        saved = sum(len(c.text) for group in groups for c in group[1:]) // 4
+        self.stats.record(len(candidates), len(kept), exact, near, saved)
+        return kept
+
+    def _merge(self, group: list[Candidate[StateT]]) -> Candidate[StateT]:
+        head = group[0]
+        if len(group) == 1:
+            return head
+        meta = dict(head.meta)
+        for other in group[1:]:
+            for k, v in other.meta.items():
+                meta.setdefault(k, v)
+        meta["dup_count"] = sum(c.meta.get("dup_count", 1) for c in group)
+        return _with_meta(head, meta)
+
+
+@dataclass(frozen=True)
+class CountPriorEvaluator(Evaluator[StateT]):
+    """
+    Adds `weight * log(dup_count)` to the wrapped evaluator's scores, so a
+    candidate the generator produced several times keeps that as a prior.
+    """
+
+    evaluator: Evaluator[StateT]
+    weight: float = 1.0
+
+    def evaluate(self, step: int, candidates: list[Candidate[StateT]], n_evaluate: int) -> list[float]:
+        scores = self.evaluator.evaluate(step, candidates, n_evaluate)
+        return [s + self.weight * math.log(c.meta.get("dup_count", 1)) for c, s in zip(candidates, scores)]
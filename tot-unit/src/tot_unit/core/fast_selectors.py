@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Callable, Generic, TypeVar
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from .interfaces import Selector
+from .selectors import selection_seed
+from .types import Candidate
+
+
+StateT = TypeVar("StateT")
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError('NumPy selectors need numpy: pip install "tot-unit[fast]"')
+
+
+def _as_scores(candidates: list[Candidate], scores: list[float]) -> Any:
+    if len(candidates) != len(scores):
+        raise ValueError("candidates and scores must have the same length")
+    return np.asarray(scores, dtype=np.float64)
+
+
+def _top_k(values: Any, k: int) -> Any:
+    """
+    Indices of the k largest values, largest first. O(n + k log k).
+    """
+    n = values.shape[0]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < n:
+        part = np.argpartition(-values, k - 1)[:k]
+    else:
+        part = np.arange(n)
+    # stable on the partitioned slice keeps lower indices first on ties
+    return part[np.argsort(-values[part], kind="stable")]
+
+
+@dataclass(frozen=True)
+class TopKSelector(Selector[StateT]):
+    """
+    Greedy top-k via argpartition, for beams over very large candidate sets.
+    """
+
+    def __post_init__(self) -> None:
+        _require_numpy()
+
+    def select(self, candidates: list[Candidate[StateT]], scores: list[float], n_select: int) -> list[Candidate[StateT]]:
+        values = _as_scores(candidates, scores)
+        return [candidates[i] for i in _top_k(values, n_select)]
+
+
+@dataclass(frozen=True)
+class _GumbelSelector(Generic[StateT]):
+    seed: int | None = 42
+    _rng: Any = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        _require_numpy()
+        object.__setattr__(self, "_rng", np.random.default_rng(self.seed))
+
+    def _sample(self, logits: Any, k: int) -> Any:
+        # Gumbel-top-k: top-k of logits + Gumbel noise == sampling k without replacement
+        seed = selection_seed(self.seed, logits.tobytes())
+        rng = np.random.default_rng(seed) if seed is not None else self._rng
+        noisy = logits + rng.gumbel(size=logits.shape[0])
+        return _top_k(noisy, k)
+
+
+@dataclass(frozen=True)
+class WeightedSampleSelector(_GumbelSelector[StateT], Selector[StateT]):
+    """
+    Vectorized SampleSelector: probability proportional to max(score, 0),
+    without replacement. Zero-weight candidates are drawn only after all
+    positive ones, uniformly.
+    """
+
+    def select(self, candidates: list[Candidate[StateT]], scores: list[float], n_select: int) -> list[Candidate[StateT]]:
+        weights = np.maximum(_as_scores(candidates, scores), 0.0)
+        if not weights.any():
+            return [candidates[i] for i in self._sample(np.zeros_like(weights), n_select)]
+        with np.errstate(divide="ignore"):
+            logits = np.log(weights)
+        # zero weights go last, in random order
+        floor = logits[np.isfinite(logits)].min() - 1e6
+        logits = np.where(np.isfinite(logits), logits, floor)
+        return [candidates[i] for i in self._sample(logits, n_select)]
+
+
+@dataclass(frozen=True)
+class SoftmaxSelector(_GumbelSelector[StateT], Selector[StateT]):
+    """
+    Samples without replacement from softmax(scores / temperature). Low
+    temperature approaches greedy, high temperature approaches uniform.
+    """
+
+    temperature: float = 1.0
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        if self.temperature <= 0:
+            raise ValueError("temperature must be > 0")
+
+    def select(self, candidates: list[Candidate[StateT]], scores: list[float], n_select: int) -> list[Candidate[StateT]]:
+        logits = _as_scores(candidates, scores) / self.temperature
+        return [candidates[i] for i in self._sample(logits, n_select)]
+
+
+def hashed_ngram_embed(candidates: list[Candidate], dim: int = 512, n: int = 3) -> Any:
+    """
+    Cheap text embedding: L2-normalized bag of hashed character n-grams.
+    """
+    _require_numpy()
+    out = np.zeros((len(candidates), dim), dtype=np.float32)
+    for row, cand in enumerate(candidates):
+        text = cand.text
+        for i in range(max(1, len(text) - n + 1)):
+            out[row, zlib.crc32(text[i : i + n].encode("utf-8")) % dim] += 1.0
+    norms = np.linalg.norm(out, axis=1, keepdims=True)
+    return out / np.where(norms > 0, norms, 1.0)
+
+
+@dataclass(frozen=True)
+class MMRSelector(Selector[StateT]):
+    """
+    Maximal marginal relevance: greedily picks the candidate maximizing
+    (1 - diversity) * score - diversity * (max similarity to those already
+    picked). Scores are min-max normalized first. Only the `pool_size` best-scored
+    candidates are considered, so cost stays O(pool_size * n_select).
+    """
+
+    diversity: float = 0.3
+    pool_size: int = 256
+    embed: Callable[[list[Candidate]], Any] = hashed_ngram_embed
+
+    def __post_init__(self) -> None:
+        _require_numpy()
+        if not 0.0 <= self.diversity <= 1.0:
+            raise ValueError("diversity must be in [0, 1]")
+
+    def select(self, candidates: list[Candidate[StateT]], scores: list[float], n_select: int) -> list[Candidate[StateT]]:
+        values = _as_scores(candidates, scores)
+        pool = _top_k(values, max(n_select, self.pool_size))
+        if pool.size == 0:
+            return []
+        rel = values[pool]
+        span = rel.max() - rel.min()
+        rel = (rel - rel.min()) / span if span > 0 else np.ones_like(rel)
+        vecs = np.asarray(self.embed([candidates[i] for i in pool]), dtype=np.float32)
+
+        chosen: list[int] = []
+        max_sim = np.zeros(pool.size, dtype=np.float64)
+        available = np.ones(pool.size, dtype=bool)
+        for _ in range(min(n_select, pool.size)):
+            gain = (1.0 - self.diversity) * rel - self.diversity * max_sim
+            gain[~available] = -np.inf
+            pick = int(np.argmax(gain))
+            chosen.append(pick)
+            available[pick] = False
+            max_sim = np.maximum(max_sim, vecs @ vecs[pick])
+        return [candidates[pool[i]] for i in chosen]
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterator, Protocol, Sequence
+
+
+class Hook(Protocol):
+    """
+    Called around every phase of a run: "run", "generate", "dedup",
+    "evaluate", "select", "stop", and "stage" for Pipeline stages. `payload`
+    holds the phase inputs in `before`; the same dict gains the outputs (or
+    "error") by the time `after` runs. Hooks may run concurrently for
+    overlapping phases of async and pipelined runs.
+    """
+
+    def before(self, phase: str, step: int | None, payload: dict[str, Any]) -> None: ...
+
+    def after(self, phase: str, step: int | None, payload: dict[str, Any]) -> None: ...
+
+
+class BaseHook:
+    """
+    No-op Hook to subclass when only one side is needed.
+    """
+
+    def before(self, phase: str, step: int | None, payload: dict[str, Any]) -> None:
+        pass
+
+    def after(self, phase: str, step: int | None, payload: dict[str, Any]) -> None:
+        pass
+
+
+@contextmanager
+def phase(hooks: Sequence[Hook], name: str, step: int | None = None, **payload: Any) -> Iterator[dict[str, Any]]:
+    """
+    Run `before` / `after` of every hook around the block; the block stores
+    its outputs in the yielded payload. Free when there are no hooks.
+    """
+    if not hooks:
+        yield payload
+        return
+    for hook in hooks:
+        hook.before(name, step, payload)
+    try:
+        yield payload
+    except BaseException as e:
+        payload["error"] = e
+        raise
+    finally:
+        for hook in reversed(hooks):
+            hook.after(name, step, payload)
+
+
+@dataclass
+class PhaseStats:
+    count: int = 0
+    wall: float = 0.0
+    cpu: float = 0.0
+    alloc: int = 0
+
+
+@dataclass(frozen=True)
+class ProfileEvent:
+    name: str
+    step: int | None
+    stack: tuple[str, ...]
+    start: float
+    wall: float
+    cpu: float
+    alloc: int
+    tid: int
+
+
+_STACK: contextvars.ContextVar[tuple[str, ...]] = contextvars.ContextVar("tot_profile_stack", default=())
+
+
+class Profiler(BaseHook):
+    """
+    Records wall time, process CPU time and (with `allocations`) net bytes
+    allocated per phase, via tracemalloc. `summary()` aggregates per phase,
+    `chrome_trace()` / `folded()` export the timeline for chrome://tracing /
+    Perfetto and for flamegraph.pl / speedscope.
+    """
+
+    def __init__(self, allocations: bool = False) -> None:
+        self.allocations = allocations
+        self.events: list[ProfileEvent] = []
+        self._open: dict[int, tuple[float, float, int, contextvars.Token]] = {}
+        self._lanes: dict[Any, int] = {}
+        self._lock = threading.Lock()
+        if allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _lane(self) -> int:
+        # one timeline row per asyncio task or thread
+        try:
+            key: Any = asyncio.current_task()
+        except RuntimeError:
+            key = None
+        if key is None:
+            key = threading.get_ident()
+        with self._lock:
+            return self._lanes.setdefault(key, len(self._lanes) + 1)
+
+    @staticmethod
+    def _label(phase: str, payload: dict[str, Any]) -> str:
+        # Pipeline stages are told apart by name
+        return str(payload["stage"]) if phase == "stage" and "stage" in payload else phase
+
+    def before(self, phase: str, step: int | None, payload: dict[str, Any]) -> None:
+        token = _STACK.set(_STACK.get() + (self._label(phase, payload),))
+        alloc = tracemalloc.get_traced_memory()[0] if self.allocations else 0
+        with self._lock:
+            self._open[id(payload)] = (time.perf_counter(), time.process_time(), alloc, token)
+
+    def after(self, phase: str, step: int | None, payload: dict[str, Any]) -> None:
+        end, cpu_end = time.perf_counter(), time.process_time()
+        alloc_end = tracemalloc.get_traced_memory()[0] if self.allocations else 0
+        with self._lock:
+            start, cpu_start, alloc_start, token = self._open.pop(id(payload))
+        stack = _STACK.get()
+        _STACK.reset(token)
+        event = ProfileEvent(
+            name=self._label(phase, payload),
+            step=step,
+            stack=stack,
+            start=start,
+            wall=end - start,
+            cpu=cpu_end - cpu_start,
+            alloc=alloc_end - alloc_start,
+            tid=self._lane(),
+        )
+        with self._lock:
+            self.events.append(event)
+
+    def summary(self) -> dict[str, PhaseStats]:
+        out: dict[str, PhaseStats] = {}
+        with self._lock:
+            events = list(self.events)
+        for e in events:
+            stats = out.setdefault(e.name, PhaseStats())
+            stats.count += 1
+            stats.wall += e.wall
+            stats.cpu += e.cpu
+            stats.alloc += e.alloc
+        return out
+
+    def chrome_trace(self, path: str | None = None) -> dict[str, Any]:
+        """
+        Chrome trace-event JSON ("X" complete events, microseconds).
+        """
+        with self._lock:
+            events = sorted(self.events, key=lambda e: e.start)
+        origin = events[0].start if events else 0.0
+        pid = os.getpid()
+        trace = {
+            "traceEvents": [
+                {
+                    "name": e.name if e.step is None else f"{e.name} [step {e.step}]",
+                    "cat": "tot",
+                    "ph": "X",
+                    "ts": (e.start - origin) * 1e6,
+                    "dur": e.wall * 1e6,
+                    "pid": pid,
+                    "tid": e.tid,
+                    "args": {"step": e.step, "cpu_ms": e.cpu * 1e3, "alloc_bytes": e.alloc},
+                }
+                for e in events
+            ],
+            "displayTimeUnit": "ms",
+        }
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(trace, f)
+        return trace
+
+    def folded(self, path: str | None = None) -> str:
+        """
+        Collapsed stacks ("run;evaluate 1234") weighted by self wall time in
+        microseconds, the input format of flamegraph.pl and speedscope.
+        """
+        with self._lock:
+            events = list(self.events)
+        total: dict[tuple[str, ...], float] = {}
+        for e in events:
+            total[e.stack] = total.get(e.stack, 0.0) + e.wall
+        self_time = dict(total)
+        for stack, wall in total.items():
+            if len(stack) > 1 and stack[:-1] in self_time:
+                self_time[stack[:-1]] -= wall
+        lines = [f"{';'.join(stack)} {max(0, round(t * 1e6))}" for stack, t in sorted(self_time.items())]
+        text = "\n".join(lines) + ("\n" if lines else "")
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        return text
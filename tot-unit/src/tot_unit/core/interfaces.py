@@ -34,11 +34,54 @@ class Selector(Protocol[StateT]):
     def select(self, candidates: list[Candidate[StateT]], scores: list[float], n_select: int) -> list[Candidate[StateT]]: ...
 
 
+class EarlyCommitSelector(Selector[StateT], Protocol[StateT]):
+    """
+    Selector that can commit to candidates before every score is known.
+    `scores` holds None for candidates still being evaluated and `n_pending`
+    is an upper bound on how many more candidates may still arrive (None =
+    unknown); fewer may come, so a commit must hold for any number up to it.
+    Returns indices, outside `committed`, whose selection is already certain.
+    """
+
+    def commit(
+        self,
+        scores: list[float | None],
+        n_select: int,
+        committed: set[int],
+        n_pending: int | None,
+    ) -> list[int]: ...
+
+
+class Deduplicator(Protocol[StateT]):
+    """
+    Collapse duplicate candidates between generation and evaluation.
+    Returns the candidates to evaluate, in their original order.
+    """
+
+    def dedup(self, step: int, candidates: list[Candidate[StateT]]) -> list[Candidate[StateT]]: ...
+
+
 class Stopper(Protocol[StateT]):
     """
-    Decide whether ToT should stop early.
+    Decide whether ToT should stop early. Stoppers are goal tests unless they
+    set `goal = False` (a pure limit, like MaxStepStopper).
     """
 
     def should_stop(self, step: int, selected: list[Candidate[StateT]], scores: list[float]) -> bool: ...
 
 
+class AsyncGenerator(Protocol[StateT]):
+    """
+    Async counterpart of Generator. Use it when expansion is I/O bound
+    (remote LLM calls) so parents of one step can be expanded concurrently.
+    """
+
+    async def generate(self, step: int, current: list[Candidate[StateT]], n_generate: int) -> list[Candidate[StateT]]: ...
+
+
+class AsyncEvaluator(Protocol[StateT]):
+    """
+    Async counterpart of Evaluator.
+    """
+
+    async def evaluate(self, step: int, candidates: list[Candidate[StateT]], n_evaluate: int) -> list[float]: ...
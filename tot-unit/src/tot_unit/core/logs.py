@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import threading
+from typing import Any, Iterator, Protocol
+
+from .codec import PickleCodec, StateCodec, candidate_to_dict, step_log_from_dict, step_log_to_dict
+from .types import StepLog
+
+
+LOG_RETENTION_MODES = ("full", "selected", "summary", "none")
+
+
+def summarize(scores: list[float]) -> dict[str, float]:
+    if not scores:
+        return {"n": 0}
+    return {
+        "n": len(scores),
+        "min": float(min(scores)),
+        "max": float(max(scores)),
+        "mean": float(sum(scores)) / len(scores),
+    }
+
+
+def retain(log: StepLog, mode: str) -> StepLog | None:
+    """
+    Reduce a StepLog to what `mode` keeps in memory:
+    full - everything; selected - only the selected candidates (with their
+    scores); summary - score statistics only; none - nothing.
+    """
+    if mode == "full":
+        return log
+    if mode == "selected":
+        by_id = {id(c): s for c, s in zip(log.candidates, log.scores)}
+        scores = [by_id.get(id(c), float("nan")) for c in log.selected]
+        return StepLog(step=log.step, candidates=list(log.selected), scores=scores, selected=log.selected, stats=log.stats)
+    if mode == "summary":
+        return StepLog(step=log.step, candidates=[], scores=[], selected=[], stats=log.stats)
+    if mode == "none":
+        return None
+    raise ValueError(f"unknown log retention mode: {mode!r}")
+
+
+class StepLogSink(Protocol):
+    """
+    Receives every full StepLog as soon as its step finishes.
+    """
+
+    def write(self, log: StepLog, run_id: str | None = None) -> None: ...
+
+    def close(self) -> None: ...
+
+
+def record_step(
+    logs: list[StepLog],
+    log: StepLog,
+    retention: str,
+    sink: StepLogSink | None,
+    run_id: str | None,
+) -> None:
+    if sink is not None:
+        sink.write(log, run_id=run_id)
+    kept = retain(log, retention)
+    if kept is not None:
+        logs.append(kept)
+
+
+def _record(log: StepLog, run_id: str | None, codec: StateCodec) -> dict[str, Any]:
+    rec = step_log_to_dict(log, codec)
+    rec["run_id"] = run_id
+    return rec
+
+
+class JSONLStepLogSink:
+    """
+    One JSON object per step, appended and flushed as the run progresses.
+    Thread-safe, so concurrent runs of a batch can share one file.
+    """
+
+    def __init__(self, path: str, codec: StateCodec | None = None) -> None:
+        self.path = path
+        self.codec = codec or PickleCodec()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def write(self, log: StepLog, run_id: str | None = None) -> None:
+        line = json.dumps(_record(log, run_id, self.codec), ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class ParquetStepLogSink:
+    """
+    Buffers steps and writes them as Parquet row groups (needs pyarrow).
+    Candidate lists are stored as JSON strings.
+    """
+
+    def __init__(self, path: str, codec: StateCodec | None = None, row_group_size: int = 256) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:  # pragma: no cover - optional dependency
+            raise ImportError('ParquetStepLogSink needs pyarrow: pip install "tot-unit[parquet]"') from e
+        self._pa = pa
+        self.codec = codec or PickleCodec()
+        self.row_group_size = row_group_size
+        self._schema = pa.schema(
+            [
+                ("run_id", pa.string()),
+                ("step", pa.int64()),
+                ("scores", pa.list_(pa.float64())),
+                ("candidates", pa.string()),
+                ("selected", pa.string()),
+                ("stats", pa.string()),
+            ]
+        )
+        self._writer = pq.ParquetWriter(path, self._schema)
+        self._rows: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def write(self, log: StepLog, run_id: str | None = None) -> None:
+        row = {
+            "run_id": run_id,
+            "step": log.step,
+            "scores": [float(s) for s in log.scores],
+            "candidates": json.dumps([candidate_to_dict(c, self.codec) for c in log.candidates], ensure_ascii=False),
+            "selected": json.dumps([candidate_to_dict(c, self.codec) for c in log.selected], ensure_ascii=False),
+            "stats": json.dumps(log.stats),
+        }
+        with self._lock:
+            self._rows.append(row)
+            if len(self._rows) >= self.row_group_size:
+                self._flush()
+
+    def _flush(self) -> None:
+        if self._rows:
+            self._writer.write_table(self._pa.Table.from_pylist(self._rows, schema=self._schema))
+            self._rows = []
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush()
+            self._writer.close()
+
+
+class StepLogReader:
+    """
+    Lazy reader for JSONL step logs. The file is memory-mapped and only line
+    offsets are indexed, so `len`, random access and iteration never load a
+    whole run into memory.
+    """
+
+    def __init__(self, path: str, codec: StateCodec | None = None) -> None:
+        self.path = path
+        self.codec = codec or PickleCodec()
+        self._offsets: list[int] | None = None
+
+    def _index(self) -> list[int]:
+        if self._offsets is None:
+            offsets: list[int] = []
+            with open(self.path, "rb") as f:
+                pos = 0
+                for line in f:
+                    if line.strip():
+                        offsets.append(pos)
+                    pos += len(line)
+            self._offsets = offsets
+        return self._offsets
+
+    def __len__(self) -> int:
+        return len(self._index())
+
+    def raw(self, index: int) -> dict[str, Any]:
+        offset = self._index()[index]
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = mm.find(b"\n", offset)
+            return json.loads(mm[offset : end if end >= 0 else len(mm)])
+
+    def __getitem__(self, index: int) -> StepLog:
+        return step_log_from_dict(self.raw(index), self.codec)
+
+    def iter_raw(self, run_id: str | None = None) -> Iterator[dict[str, Any]]:
+        """
+        Undecoded records (states stay encoded), optionally for one run only.
+        """
+        if os.path.getsize(self.path) == 0:
+            return
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = 0
+            size = len(mm)
+            while pos < size:
+                end = mm.find(b"\n", pos)
+                end = size if end < 0 else end
+                line = mm[pos:end]
+                pos = end + 1
+                if not line.strip():
+                    continue
+                rec = json.loads(line)
+                if run_id is None or rec.get("run_id") == run_id:
+                    yield rec
+
+    def __iter__(self) -> Iterator[StepLog]:
+        for rec in self.iter_raw():
+            yield step_log_from_dict(rec, self.codec)
+
+    def iter_run(self, run_id: str) -> Iterator[StepLog]:
+        for rec in self.iter_raw(run_id):
+            yield step_log_from_dict(rec, self.codec)
+
+    def run_ids(self) -> list[str]:
+        seen: dict[str, None] = {}
+        for rec in self.iter_raw():
+            if rec.get("run_id") is not None:
+                seen.setdefault(rec["run_id"], None)
+        return list(seen)
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+from dataclasses import dataclass, field, replace
+from typing import Generic, Sequence, TypeVar
+
+from .adapters import as_async_evaluator, as_async_generator
+from .hooks import Hook, phase
+from .interfaces import AsyncEvaluator, AsyncGenerator, Evaluator, Generator, Selector, Stopper
+from .logs import StepLogSink, record_step, summarize
+from .runner import ToTConfig
+from .tracing import SpanExporter, run_scope, span_scope
+from .types import Candidate, RunResult, StepLog
+
+
+StateT = TypeVar("StateT")
+
+
+@dataclass
+class _StepState(Generic[StateT]):
+    candidates: list[Candidate[StateT]] = field(default_factory=list)
+    scores: list[float | None] = field(default_factory=list)
+    committed: list[int] = field(default_factory=list)
+    # parents whose generation has not returned yet
+    generating: int = 0
+    # parents whose children are not fully scored yet
+    running: int = 0
+    # the parent set is final once the previous step has been selected
+    closed: bool = False
+
+
+class PipelinedToTRunner(Generic[StateT]):
+    """
+    ToT runner without the per-step barrier. Each parent is expanded and its
+    children scored as an independent task; as soon as the selector can commit
+    to a child (see EarlyCommitSelector), next-step generation from that child
+    starts while the rest of the step is still being evaluated.
+
+    The evaluator is called once per parent on that parent's children, so it
+    must score candidates independently (value/heuristic scoring, not voting
+    across the whole set). Selectors without `commit` behave like a barrier.
+    While generations are in flight each is assumed to return the full
+    `n_generate` children, so rank-based commits wait for them; threshold
+    commits (GreedySelector(threshold=...)) don't depend on that bound.
+    Work started for step s + 1 is cancelled if the stopper ends the run at s.
+    """
+
+    def __init__(
+        self,
+        generator: AsyncGenerator[StateT] | Generator[StateT],
+        evaluator: AsyncEvaluator[StateT] | Evaluator[StateT],
+        selector: Selector[StateT],
+        stopper: Stopper[StateT],
+        cfg: ToTConfig,
+        sink: StepLogSink | None = None,
+        exporter: SpanExporter | None = None,
+        hooks: Sequence[Hook] = (),
+    ) -> None:
+        self.generator = as_async_generator(generator)
+        self.evaluator = as_async_evaluator(evaluator)
+        self.selector = selector
+        self.stopper = stopper
+        self.cfg = cfg
+        self.sink = sink
+        self.exporter = exporter
+        self.hooks = tuple(hooks)
+
+    async def run(self, initial_candidates: list[Candidate[StateT]], run_id: str | None = None) -> RunResult[StateT]:
+        run_id = run_id or uuid.uuid4().hex
+        with run_scope(run_id, self.exporter) as telemetry, phase(self.hooks, "run", run_id=run_id) as p:
+            result = p["result"] = await self._run(initial_candidates, run_id)
+        return replace(result, telemetry=telemetry)
+
+    async def _run(self, initial_candidates: list[Candidate[StateT]], run_id: str) -> RunResult[StateT]:
+        if self.cfg.steps <= 0:
+            return RunResult(final_candidates=initial_candidates, logs=[])
+
+        states = [_StepState[StateT]() for _ in range(self.cfg.steps)]
+        tasks: set[asyncio.Task] = set()
+        logs: list[StepLog[StateT]] = []
+
+        def spawn(step: int, parent: Candidate[StateT]) -> None:
+            st = states[step]
+            st.generating += 1
+            st.running += 1
+            tasks.add(asyncio.create_task(expand(step, parent)))
+
+        def try_commit(step: int) -> None:
+            commit = getattr(self.selector, "commit", None)
+            st = states[step]
+            if commit is None or step + 1 >= self.cfg.steps:
+                return
+            # an upper bound: dedup, adaptive sampling, early stop or a failed chunk return
+            # fewer children, but how many is only known once that generation returns
+            n_pending = st.generating * self.cfg.n_generate if st.closed else None
+            for i in commit(st.scores, self.cfg.n_select, set(st.committed), n_pending):
+                st.committed.append(i)
+                spawn(step + 1, st.candidates[i])
+
+        async def expand(step: int, parent: Candidate[StateT]) -> None:
+            st = states[step]
+            with span_scope("tot.step", step=step):
+                with span_scope("tot.generate", role="gen"), phase(self.hooks, "generate", step, parents=[parent]) as p:
+                    children = p["candidates"] = await self.generator.generate(step, [parent], self.cfg.n_generate)
+                base = len(st.candidates)
+                st.candidates.extend(children)
+                st.scores.extend([None] * len(children))
+                st.generating -= 1
+                with span_scope("tot.evaluate", role="judge"), phase(self.hooks, "evaluate", step, candidates=children) as p:
+                    scores = await self.evaluator.evaluate(step, children, self.cfg.n_evaluate) if children else []
+                    p["scores"] = scores
+            if len(scores) != len(children):
+                raise ValueError("evaluator must return one score per candidate")
+            st.scores[base : base + len(children)] = scores
+            st.running -= 1
+            try_commit(step)
+
+        try:
+            for cand in initial_candidates:
+                spawn(0, cand)
+            states[0].closed = True
+
+            for step in range(self.cfg.steps):
+                st = states[step]
+                while st.running > 0:
+                    done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                    for t in done:
+                        tasks.discard(t)
+                        t.result()
+
+                scores = [float(s) for s in st.scores]
+                committed = set(st.committed)
+                rest = [i for i in range(len(st.candidates)) if i not in committed]
+                with span_scope("tot.select", step=step):
+                    with phase(self.hooks, "select", step, candidates=st.candidates, scores=scores) as p:
+                        fill = self.selector.select(
+                            [st.candidates[i] for i in rest],
+                            [scores[i] for i in rest],
+                            self.cfg.n_select - len(committed),
+                        )
+                        selected = p["selected"] = [st.candidates[i] for i in st.committed] + fill
+                log = StepLog(
+                    step=step,
+                    candidates=list(st.candidates),
+                    scores=scores,
+                    selected=selected,
+                    stats=summarize(scores),
+                )
+                record_step(logs, log, self.cfg.log_retention, self.sink, run_id)
+
+                with phase(self.hooks, "stop", step, selected=selected, scores=scores) as p:
+                    stop = p["stop"] = self.stopper.should_stop(step, selected, scores)
+                if stop or step + 1 >= self.cfg.steps:
+                    return RunResult(final_candidates=selected, logs=logs)
+
+                for cand in fill:
+                    spawn(step + 1, cand)
+                states[step + 1].closed = True
+                try_commit(step + 1)
+
+            return RunResult(final_candidates=logs[-1].selected, logs=logs)
+        finally:
+            for t in tasks:
+                t.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
@@ -1,10 +1,19 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Generic, TypeVar
-
-from .interfaces import Evaluator, Generator, Selector, Stopper
-from .types import Candidate, RunResult, StepLog
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, replace
+from typing import Generic, Iterable, Iterator, Sequence, TypeVar
+
+from .batch import BatchCheckpoint, as_checkpoint, pending_problems
+from .budget import RunBudget
+from .checkpoint import RunCheckpoint, as_run_checkpoint, restore_rng, resume_state, runner_components
+from .hooks import Hook, phase
+from .interfaces import Deduplicator, Evaluator, Generator, Selector, Stopper
+from .logs import LOG_RETENTION_MODES, StepLogSink
+from .search import BeamSearch, SearchStrategy
+from .tracing import SpanExporter, run_scope
+from .types import Candidate, RunResult
 
 
 StateT = TypeVar("StateT")
@@ -16,11 +25,28 @@ class ToTConfig:
     n_generate: int
     n_select: int
     n_evaluate: int
+    # what RunResult.logs keeps: "full", "selected", "summary" or "none"
+    log_retention: str = "full"
+
+    def __post_init__(self) -> None:
+        if self.log_retention not in LOG_RETENTION_MODES:
+            raise ValueError(f"log_retention must be one of {LOG_RETENTION_MODES}")
 
 
 class ToTRunner(Generic[StateT]):
     """
     Generic ToT engine. Does not assume any LLM usage.
+
+    `sink` receives every full StepLog as it happens (see core.logs), while
+    `cfg.log_retention` decides how much of it stays in RunResult.logs.
+    `strategy` walks the tree (see core.search); the default is the BFS beam.
+    `dedup` collapses duplicate candidates between generation and evaluation.
+    Every run collects spans into RunResult.telemetry; `exporter` receives them
+    when the run ends. `hooks` are called around every phase (see core.hooks).
+    With `checkpoint` (a RunCheckpoint or its directory), the beam strategy
+    saves the run after every step, and `resume` continues it. `budget` caps
+    the tokens, calls, cost and wall time of each run and paces the widths
+    of its steps (see core.budget).
     """
 
     def __init__(
@@ -30,29 +56,88 @@ class ToTRunner(Generic[StateT]):
         selector: Selector[StateT],
         stopper: Stopper[StateT],
         cfg: ToTConfig,
+        sink: StepLogSink | None = None,
+        strategy: SearchStrategy[StateT] | None = None,
+        dedup: Deduplicator[StateT] | None = None,
+        exporter: SpanExporter | None = None,
+        hooks: Sequence[Hook] = (),
+        checkpoint: RunCheckpoint | str | None = None,
+        budget: RunBudget | None = None,
     ) -> None:
         self.generator = generator
         self.evaluator = evaluator
         self.selector = selector
         self.stopper = stopper
         self.cfg = cfg
-
-    def run(self, initial_candidates: list[Candidate[StateT]]) -> RunResult[StateT]:
-        current = initial_candidates
-        logs: list[StepLog[StateT]] = []
-
-        for step in range(self.cfg.steps):
-            candidates = self.generator.generate(step, current, self.cfg.n_generate)
-            scores = self.evaluator.evaluate(step, candidates, self.cfg.n_evaluate)
-            selected = self.selector.select(candidates, scores, self.cfg.n_select)
-
-            logs.append(StepLog(step=step, candidates=candidates, scores=scores, selected=selected))
-
-            if self.stopper.should_stop(step, selected, scores):
-                return RunResult(final_candidates=selected, logs=logs)
-
-            current = selected
-
-        return RunResult(final_candidates=current, logs=logs)
-
-
+        self.sink = sink
+        self.strategy = strategy or BeamSearch()
+        self.dedup = dedup
+        self.exporter = exporter
+        self.hooks = tuple(hooks)
+        self.checkpoint = as_run_checkpoint(checkpoint)
+        self.budget = budget
+        if self.checkpoint is not None and not isinstance(self.strategy, BeamSearch):
+            raise ValueError("checkpointing is supported with BeamSearch only")
+
+    def run(self, initial_candidates: list[Candidate[StateT]], run_id: str | None = None) -> RunResult[StateT]:
+        run_id = run_id or uuid.uuid4().hex
+        with run_scope(run_id, self.exporter) as telemetry, phase(self.hooks, "run", run_id=run_id) as p:
+            result = p["result"] = self.strategy.search(self, initial_candidates, run_id)
+        return replace(result, telemetry=telemetry)
+
+    def resume(self, run_id: str | None = None) -> RunResult[StateT]:
+        """
+        Continue a checkpointed run (the latest unfinished one by default)
+        from the step after its last snapshot. Finished runs return their
+        result without calling any component.
+        """
+        state = resume_state(self.checkpoint, run_id)
+        if state.done:
+            return RunResult(final_candidates=state.frontier, logs=state.logs, search=state.search)
+        restore_rng(runner_components(self), state.rng)
+        with run_scope(state.run_id, self.exporter) as telemetry, phase(
+            self.hooks, "run", run_id=state.run_id, resumed_at=state.step
+        ) as p:
+            result = p["result"] = self.strategy.search(self, state.frontier, state.run_id, state=state)
+        return replace(result, telemetry=telemetry)
+
+    def run_batch(
+        self,
+        problems: Iterable[list[Candidate[StateT]]],
+        max_workers: int = 8,
+        checkpoint: BatchCheckpoint | str | None = None,
+    ) -> Iterator[tuple[int, RunResult[StateT]]]:
+        """
+        Run independent trees on a thread pool, `max_workers` at a time.
+        Yields (problem index, result) as each tree finishes. Problems already
+        recorded in `checkpoint` are yielded first without re-running.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be >= 1")
+        ckpt = as_checkpoint(checkpoint)
+        done = ckpt.load() if ckpt is not None else {}
+        # one at a time: recorded results are decoded as they are yielded
+        for index in sorted(done):
+            yield index, done[index]
+
+        todo = pending_problems(problems, done)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            running: dict[Future, int] = {}
+            exhausted = False
+            while True:
+                # keep a bounded window so huge batches aren't materialized at once
+                while not exhausted and len(running) < max_workers * 2:
+                    item = next(todo, None)
+                    if item is None:
+                        exhausted = True
+                        break
+                    running[pool.submit(self.run, item[1])] = item[0]
+                if not running:
+                    return
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    index = running.pop(fut)
+                    result = fut.result()
+                    if ckpt is not None:
+                        ckpt.record(index, result)
+                    yield index, result
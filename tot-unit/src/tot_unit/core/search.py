@@ -0,0 +1,524 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import math
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Callable, Generator, Generic, Protocol, TypeVar
+
+from .budget import BudgetTracker, StepPlan
+from .hooks import phase
+from .logs import record_step, summarize
+from .tracing import current_telemetry, span_scope
+from .types import Candidate, RunResult, StepLog
+
+if TYPE_CHECKING:
+    from .async_runner import AsyncToTRunner
+    from .checkpoint import RunState
+    from .runner import ToTRunner
+
+
+StateT = TypeVar("StateT")
+
+
+@dataclass(frozen=True)
+class SearchBudget:
+    """
+    Limits for one search. `tokens` returns a cumulative token count (e.g.
+    `lambda: usage.total_tokens`); without it the run's telemetry is used
+    (every prompt, completion and judge token of the run's LLM calls), and
+    for components making no recorded calls tokens are estimated from the
+    generated text at ~4 chars per token.
+    """
+
+    max_expansions: int | None = None
+    max_tokens: int | None = None
+    tokens: Callable[[], int] | None = field(default=None, compare=False)
+
+
+@dataclass
+class SearchStats:
+    """
+    Cost of one search. An expansion is one parent handed to the generator;
+    calls count generate + evaluate invocations. `*_to_solution` are taken
+    when the stopper first fires, i.e. the stopper is the goal test; stoppers
+    that only limit depth (`goal = False`, e.g. MaxStepStopper) stop with
+    "steps" instead. `tokens_estimated` marks `tokens` as estimated from text.
+    """
+
+    strategy: str
+    expansions: int = 0
+    generate_calls: int = 0
+    evaluate_calls: int = 0
+    generated: int = 0
+    tokens: int = 0
+    tokens_estimated: bool = False
+    calls_to_solution: int | None = None
+    expansions_to_solution: int | None = None
+    tokens_to_solution: int | None = None
+    # "solution", "budget", "steps" (depth limit reached) or "exhausted" (nothing left to expand)
+    stopped_by: str = "steps"
+
+    @property
+    def calls(self) -> int:
+        return self.generate_calls + self.evaluate_calls
+
+    @property
+    def solved(self) -> bool:
+        return self.calls_to_solution is not None
+
+
+class SearchStrategy(Protocol[StateT]):
+    """
+    How a runner walks the tree with its generator, evaluator, selector and
+    stopper. `cfg.steps` is the depth limit. AsyncToTRunner awaits
+    `asearch(runner, initial, run_id)` instead; the built-in strategies have
+    both, since they are written once as a walk (see _Strategy).
+    """
+
+    def search(self, runner: "ToTRunner[StateT]", initial: list[Candidate[StateT]], run_id: str) -> RunResult[StateT]: ...
+
+
+class _Search(Generic[StateT]):
+    """
+    Budget and bookkeeping shared by the strategies: every generate/evaluate
+    call goes through here so stats, logs and budgets stay consistent.
+    """
+
+    def __init__(
+        self, runner: "ToTRunner[StateT] | AsyncToTRunner[StateT]", budget: SearchBudget, name: str, run_id: str
+    ) -> None:
+        self.runner = runner
+        self.cfg = runner.cfg
+        self.budget = budget
+        self.run_id = run_id
+        self.stats = SearchStats(strategy=name)
+        self.logs: list[StepLog[StateT]] = []
+        self._tokens0 = self._token_total()
+        # (step, score, order, candidate) of every evaluated node, for best-so-far
+        self._seen: list[tuple[int, float, int, Candidate[StateT]]] = []
+        self._order = itertools.count()
+        run_budget = getattr(runner, "budget", None)
+        self.tracker = BudgetTracker(run_budget, self.cfg) if run_budget is not None else None
+
+    def restore(self, state: "RunState[StateT]") -> None:
+        """
+        Continue from a checkpoint: counters, logs and the token baseline.
+        """
+        if state.search is not None:
+            self.stats = replace(state.search, strategy=self.stats.strategy)
+        self.logs = list(state.logs)
+        self._tokens0 = self._token_total() - self.stats.tokens
+
+    def checkpoint(self, step: int, frontier: list[Candidate[StateT]], scores: list[float], done: bool = False) -> None:
+        ckpt = self.runner.checkpoint
+        if ckpt is None:
+            return
+        from .checkpoint import RunState, capture_rng, runner_components
+
+        state = RunState(
+            run_id=self.run_id,
+            step=step,
+            frontier=frontier,
+            scores=scores,
+            logs=self.logs,
+            search=self.stats,
+            rng=capture_rng(runner_components(self.runner)),
+            done=done,
+        )
+        ckpt.save(state)
+
+    def plan(self, step: int) -> StepPlan:
+        """
+        Widths of `step`: the configured ones, or paced by the run budget.
+        """
+        if self.tracker is None:
+            return StepPlan(self.cfg.n_generate, self.cfg.n_evaluate, self.cfg.n_select)
+        return self.tracker.plan(step)
+
+    def exhausted(self) -> bool:
+        if self.tracker is not None and self.tracker.exhausted():
+            return True
+        b = self.budget
+        if b.max_expansions is not None and self.stats.expansions >= b.max_expansions:
+            return True
+        return b.max_tokens is not None and self.stats.tokens >= b.max_tokens
+
+    def _token_total(self) -> int:
+        if self.budget.tokens is not None:
+            return self.budget.tokens()
+        telemetry = current_telemetry()
+        return telemetry.total().total_tokens if telemetry is not None else 0
+
+    def _count_tokens(self, candidates: list[Candidate[StateT]]) -> None:
+        telemetry = current_telemetry()
+        if self.budget.tokens is not None or (telemetry is not None and telemetry.calls()):
+            self.stats.tokens = self._token_total() - self._tokens0
+            self.stats.tokens_estimated = False
+        else:
+            self.stats.tokens += sum(len(c.delta if hasattr(c, "delta") else c.text) for c in candidates) // 4
+            self.stats.tokens_estimated = True
+
+    def _begin(self, step: int, parents: list[Candidate[StateT]]) -> tuple[list[Candidate[StateT]], StepPlan]:
+        if self.budget.max_expansions is not None:
+            parents = parents[: max(0, self.budget.max_expansions - self.stats.expansions)]
+        return parents, self.plan(step)
+
+    def _generated(
+        self, step: int, parents: list[Candidate[StateT]], children: list[Candidate[StateT]]
+    ) -> list[Candidate[StateT]]:
+        self.stats.expansions += len(parents)
+        self.stats.generate_calls += 1
+        self.stats.generated += len(children)
+        if self.runner.dedup is not None:
+            with phase(self.runner.hooks, "dedup", step, candidates=children) as p:
+                children = p["kept"] = self.runner.dedup.dedup(step, children)
+        return children
+
+    def _scored(
+        self, step: int, children: list[Candidate[StateT]], scores: list[float]
+    ) -> tuple[list[Candidate[StateT]], list[float]]:
+        if children:
+            self.stats.evaluate_calls += 1
+        self._count_tokens(children)
+        for c, s in zip(children, scores):
+            self._seen.append((step, s, next(self._order), c))
+        return children, scores
+
+    def expand(self, step: int, parents: list[Candidate[StateT]]) -> tuple[list[Candidate[StateT]], list[float]]:
+        parents, plan = self._begin(step, parents)
+        runner, hooks = self.runner, self.runner.hooks
+        scores: list[float] = []
+        with span_scope("tot.step", step=step):
+            with span_scope("tot.generate", role="gen"), phase(hooks, "generate", step, parents=parents) as p:
+                children = p["candidates"] = runner.generator.generate(step, parents, plan.n_generate)
+            children = self._generated(step, parents, children)
+            if children:
+                with span_scope("tot.evaluate", role="judge"), phase(hooks, "evaluate", step, candidates=children) as p:
+                    scores = p["scores"] = runner.evaluator.evaluate(step, children, plan.n_evaluate)
+        return self._scored(step, children, scores)
+
+    async def aexpand(self, step: int, parents: list[Candidate[StateT]]) -> tuple[list[Candidate[StateT]], list[float]]:
+        """
+        `expand` for runners with async components (AsyncToTRunner).
+        """
+        parents, plan = self._begin(step, parents)
+        runner, hooks = self.runner, self.runner.hooks
+        scores: list[float] = []
+        with span_scope("tot.step", step=step):
+            with span_scope("tot.generate", role="gen"), phase(hooks, "generate", step, parents=parents) as p:
+                children = p["candidates"] = await runner.generator.generate(step, parents, plan.n_generate)
+            children = self._generated(step, parents, children)
+            if children:
+                with span_scope("tot.evaluate", role="judge"), phase(hooks, "evaluate", step, candidates=children) as p:
+                    scores = p["scores"] = await runner.evaluator.evaluate(step, children, plan.n_evaluate)
+        return self._scored(step, children, scores)
+
+    def select(
+        self, step: int, children: list[Candidate[StateT]], scores: list[float]
+    ) -> tuple[list[Candidate[StateT]], list[float]]:
+        """
+        Prune children with the runner's selector, log the step and return the
+        survivors with their scores.
+        """
+        with span_scope("tot.select", step=step):
+            with phase(self.runner.hooks, "select", step, candidates=children, scores=scores) as p:
+                selected = p["selected"] = self.runner.selector.select(children, scores, self.plan(step).n_select)
+        by_id = {id(c): s for c, s in zip(children, scores)}
+        log = StepLog(step=step, candidates=children, scores=scores, selected=selected, stats=summarize(scores))
+        record_step(self.logs, log, self.cfg.log_retention, self.runner.sink, self.run_id)
+        return selected, [by_id[id(c)] for c in selected]
+
+    def stop_reason(self, step: int, selected: list[Candidate[StateT]], scores: list[float]) -> str | None:
+        """
+        "solution" if the stopper fires as a goal test, "steps" if it fires as
+        a depth limit (`goal = False`), None to go on.
+        """
+        with phase(self.runner.hooks, "stop", step, selected=selected, scores=scores) as p:
+            stop = p["stop"] = self.runner.stopper.should_stop(step, selected, scores)
+        if not stop:
+            return None
+        if not getattr(self.runner.stopper, "goal", True):
+            return "steps"
+        if self.stats.calls_to_solution is None:
+            self.stats.calls_to_solution = self.stats.calls
+            self.stats.expansions_to_solution = self.stats.expansions
+            self.stats.tokens_to_solution = self.stats.tokens
+        return "solution"
+
+    def result(self, final: list[Candidate[StateT]] | None, stopped_by: str) -> RunResult[StateT]:
+        self.stats.stopped_by = stopped_by
+        if final is None:
+            final = self.best()
+        return RunResult(final_candidates=final, logs=self.logs, search=self.stats)
+
+    def best(self) -> list[Candidate[StateT]]:
+        """
+        Best-so-far: the deepest nodes reached, highest score first.
+        """
+        ranked = heapq.nlargest(self.cfg.n_select, self._seen, key=lambda t: (t[0], t[1], -t[2]))
+        return [t[3] for t in ranked]
+
+
+# a walk yields (step, parents) to expand, is sent back (children, scores) and returns the result
+Walk = Generator[tuple[int, list[Candidate[StateT]]], tuple[list[Candidate[StateT]], list[float]], RunResult[StateT]]
+
+
+class _Strategy(Generic[StateT]):
+    """
+    Base of the built-in strategies: each is written once as a `_walk`, and
+    `search` / `asearch` drive it with a sync or an async runner.
+    """
+
+    def _name(self) -> str:
+        raise NotImplementedError
+
+    def _walk(self, s: _Search[StateT], initial: list[Candidate[StateT]], state: "RunState[StateT] | None") -> Walk:
+        raise NotImplementedError
+
+    def search(
+        self,
+        runner: "ToTRunner[StateT]",
+        initial: list[Candidate[StateT]],
+        run_id: str,
+        state: "RunState[StateT] | None" = None,
+    ) -> RunResult[StateT]:
+        s: _Search[StateT] = _Search(runner, self.budget, self._name(), run_id)
+        walk = self._walk(s, initial, state)
+        try:
+            request = next(walk)
+            while True:
+                request = walk.send(s.expand(*request))
+        except StopIteration as done:
+            return done.value
+
+    async def asearch(
+        self,
+        runner: "AsyncToTRunner[StateT]",
+        initial: list[Candidate[StateT]],
+        run_id: str,
+        state: "RunState[StateT] | None" = None,
+    ) -> RunResult[StateT]:
+        s: _Search[StateT] = _Search(runner, self.budget, self._name(), run_id)
+        walk = self._walk(s, initial, state)
+        try:
+            request = next(walk)
+            while True:
+                request = walk.send(await s.aexpand(*request))
+        except StopIteration as done:
+            return done.value
+
+
+@dataclass(frozen=True)
+class BeamSearch(_Strategy[StateT]):
+    """
+    Level-synchronous BFS: expand the whole beam, keep `n_select` per step.
+    This is ToTRunner's default strategy.
+    """
+
+    budget: SearchBudget = field(default_factory=SearchBudget)
+
+    def _name(self) -> str:
+        return "beam"
+
+    def _walk(self, s: _Search[StateT], initial: list[Candidate[StateT]], state: "RunState[StateT] | None") -> Walk:
+        """
+        With `state` (from a RunCheckpoint), continue that run at `state.step`
+        with `state.frontier` as the beam; `initial` is ignored then.
+        """
+        runner = s.runner
+        current: list[Candidate[StateT]] = initial
+        current_scores: list[float] = []
+        start = 0
+        if state is not None:
+            s.restore(state)
+            current, current_scores, start = state.frontier, state.scores, state.step
+        for step in range(start, runner.cfg.steps):
+            if s.exhausted():
+                # not done: resuming with a larger budget continues from here
+                s.checkpoint(step, current, current_scores)
+                return s.result(current, "budget")
+            candidates, scores = yield step, current
+            selected, selected_scores = s.select(step, candidates, scores)
+
+            # the stopper sees every score of the step, not only the survivors'
+            reason = s.stop_reason(step, selected, scores)
+            if reason is not None:
+                result = s.result(selected, reason)
+                s.checkpoint(step + 1, selected, selected_scores, done=True)
+                return result
+
+            current, current_scores = selected, selected_scores
+            s.checkpoint(step + 1, current, current_scores, done=step + 1 >= runner.cfg.steps)
+
+        return s.result(current, "steps")
+
+
+@dataclass(frozen=True)
+class BestFirstSearch(_Strategy[StateT]):
+    """
+    Best-first expansion over a priority queue of every unexpanded node.
+    Priority is `score - cost_per_step * (step + 1)`, so `cost_per_step > 0`
+    gives A* with path length as g and the evaluator score as -h. `priority`
+    replaces that rule entirely: (candidate, score, step) -> float, higher first.
+    Pops `pop_size` nodes per generate call.
+    """
+
+    budget: SearchBudget = field(default_factory=SearchBudget)
+    cost_per_step: float = 0.0
+    pop_size: int = 1
+    priority: Callable[[Candidate[StateT], float, int], float] | None = None
+
+    def _priority(self, cand: Candidate[StateT], score: float, step: int) -> float:
+        if self.priority is not None:
+            return self.priority(cand, score, step)
+        return score - self.cost_per_step * (step + 1)
+
+    def _name(self) -> str:
+        return "astar" if self.cost_per_step else "best_first"
+
+    def _walk(self, s: _Search[StateT], initial: list[Candidate[StateT]], state: "RunState[StateT] | None") -> Walk:
+        order = itertools.count()
+        # (-priority, order, step of the node, node); initial candidates sit at step -1
+        frontier: list[tuple[float, int, int, Candidate[StateT]]] = [
+            (-math.inf, next(order), -1, c) for c in initial
+        ]
+        heapq.heapify(frontier)
+        last = s.cfg.steps - 1
+
+        while frontier:
+            if s.exhausted():
+                return s.result(None, "budget")
+            # expand nodes of the same depth together: generate takes one step index
+            _, _, step, first = heapq.heappop(frontier)
+            parents = [first]
+            deferred = []
+            while frontier and len(parents) < self.pop_size and len(deferred) < self.pop_size:
+                item = heapq.heappop(frontier)
+                if item[2] == step:
+                    parents.append(item[3])
+                else:
+                    deferred.append(item)
+            for item in deferred:
+                heapq.heappush(frontier, item)
+
+            children, scores = yield step + 1, parents
+            if not children:
+                continue
+            selected, sel_scores = s.select(step + 1, children, scores)
+            reason = s.stop_reason(step + 1, selected, sel_scores)
+            if reason is not None:
+                return s.result(selected, reason)
+            if step + 1 < last:
+                for c, sc in zip(selected, sel_scores):
+                    heapq.heappush(frontier, (-self._priority(c, sc, step + 1), next(order), step + 1, c))
+
+        return s.result(None, "exhausted" if last >= 0 else "steps")
+
+
+@dataclass(frozen=True)
+class DFSSearch(_Strategy[StateT]):
+    """
+    Depth-first search with backtracking. Children kept by the selector are
+    tried best-first; those scoring below `prune_below` are never expanded.
+    """
+
+    budget: SearchBudget = field(default_factory=SearchBudget)
+    prune_below: float | None = None
+
+    def _name(self) -> str:
+        return "dfs"
+
+    def _walk(self, s: _Search[StateT], initial: list[Candidate[StateT]], state: "RunState[StateT] | None") -> Walk:
+        stack: list[tuple[int, Candidate[StateT]]] = [(-1, c) for c in reversed(initial)]
+        last = s.cfg.steps - 1
+
+        while stack:
+            if s.exhausted():
+                return s.result(None, "budget")
+            step, node = stack.pop()
+            children, scores = yield step + 1, [node]
+            if not children:
+                continue
+            selected, sel_scores = s.select(step + 1, children, scores)
+            reason = s.stop_reason(step + 1, selected, sel_scores)
+            if reason is not None:
+                return s.result(selected, reason)
+            if step + 1 >= last:
+                continue
+            ranked = sorted(zip(selected, sel_scores), key=lambda t: t[1])
+            for c, sc in ranked:
+                if self.prune_below is None or sc >= self.prune_below:
+                    stack.append((step + 1, c))
+
+        return s.result(None, "exhausted" if last >= 0 else "steps")
+
+
+class _Node(Generic[StateT]):
+    __slots__ = ("cand", "step", "parent", "children", "visits", "value", "prior")
+
+    def __init__(self, cand: Candidate[StateT] | None, step: int, parent: "_Node[StateT] | None", prior: float) -> None:
+        self.cand = cand
+        self.step = step
+        self.parent = parent
+        self.children: list[_Node[StateT]] | None = None
+        self.visits = 0
+        self.value = 0.0
+        self.prior = prior
+
+
+@dataclass(frozen=True)
+class MCTSSearch(_Strategy[StateT]):
+    """
+    Monte Carlo tree search with UCT. The evaluator score stands in for a
+    rollout: expanding a leaf scores its children and backs up the best one.
+    Runs until a solution, `max_iterations`, or the budget.
+    """
+
+    budget: SearchBudget = field(default_factory=SearchBudget)
+    max_iterations: int = 100
+    exploration: float = 1.4
+
+    def _uct(self, node: _Node[StateT], parent_visits: int) -> float:
+        if node.visits == 0:
+            return math.inf
+        return node.value / node.visits + self.exploration * math.sqrt(math.log(parent_visits) / node.visits)
+
+    def _name(self) -> str:
+        return "mcts"
+
+    def _walk(self, s: _Search[StateT], initial: list[Candidate[StateT]], state: "RunState[StateT] | None") -> Walk:
+        last = s.cfg.steps - 1
+        root: _Node[StateT] = _Node(None, -2, None, 0.0)
+        root.children = [_Node(c, -1, root, 0.0) for c in initial]
+
+        for _ in range(self.max_iterations):
+            if s.exhausted():
+                return s.result(None, "budget")
+            node = root
+            while node.children:
+                parent_visits = max(1, node.visits)
+                node = max(node.children, key=lambda n: (self._uct(n, parent_visits), n.prior))
+            if node.children is not None or node.step >= last:
+                # fully explored dead end or depth limit: back up its own estimate again
+                if node is root:
+                    break
+                value = node.prior
+            else:
+                children, scores = yield node.step + 1, [node.cand]
+                node.children = []
+                if children:
+                    selected, sel_scores = s.select(node.step + 1, children, scores)
+                    reason = s.stop_reason(node.step + 1, selected, sel_scores)
+                    if reason is not None:
+                        return s.result(selected, reason)
+                    node.children = [_Node(c, node.step + 1, node, sc) for c, sc in zip(selected, sel_scores)]
+                    for child in node.children:
+                        child.visits, child.value = 1, child.prior
+                value = max((c.prior for c in node.children), default=node.prior)
+            while node is not None:
+                node.visits += 1
+                node.value += value
+                node = node.parent
+
+        return s.result(None, "steps")
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import hashlib
+import heapq
 import random
-from dataclasses import dataclass
+from array import array
+from dataclasses import dataclass, field
 from typing import Generic, TypeVar
 
 from .interfaces import Selector
+from .tracing import current_trace
 from .types import Candidate
 
 
@@ -13,42 +17,100 @@ StateT = TypeVar("StateT")
 
 @dataclass(frozen=True)
 class GreedySelector(Selector[StateT]):
+    """
+    Top-k by score. With `threshold`, a candidate scoring at least the
+    threshold is good enough to be committed as soon as it is scored
+    (used by the pipelined runner); `select` itself is unaffected.
+    """
+
+    threshold: float | None = None
+
     def select(self, candidates: list[Candidate[StateT]], scores: list[float], n_select: int) -> list[Candidate[StateT]]:
         if len(candidates) != len(scores):
             raise ValueError("candidates and scores must have the same length")
-        order = sorted(range(len(candidates)), key=lambda i: scores[i], reverse=True)
-        return [candidates[i] for i in order[:n_select]]
+        # same order as a stable descending sort, O(n log k)
+        order = heapq.nlargest(n_select, range(len(candidates)), key=scores.__getitem__)
+        return [candidates[i] for i in order]
+
+    def commit(
+        self,
+        scores: list[float | None],
+        n_select: int,
+        committed: set[int],
+        n_pending: int | None,
+    ) -> list[int]:
+        slots = n_select - len(committed)
+        out: list[int] = []
+        if slots <= 0:
+            return out
+        known = [i for i, s in enumerate(scores) if s is not None and i not in committed]
+        if self.threshold is not None:
+            for i in known:
+                if len(out) >= slots:
+                    return out
+                if scores[i] >= self.threshold:
+                    out.append(i)
+        if n_pending is None:
+            return out
+        # certain top-k: fewer rivals (unscored, or ranked ahead by the stable sort) than free slots
+        unscored = sum(1 for s in scores if s is None) + n_pending
+        taken = set(out)
+        for i in known:
+            if len(out) >= slots:
+                break
+            if i in taken:
+                continue
+            ahead = sum(1 for j in known if j != i and j not in taken and (scores[j] > scores[i] or (scores[j] == scores[i] and j < i)))
+            if unscored + ahead < slots - len(out):
+                out.append(i)
+                taken.add(i)
+        return out
+
+
+def selection_seed(seed: int | None, scores: bytes) -> int | None:
+    """
+    Seed for one draw of a sampling selector inside a run, derived from
+    (seed, run id, step, scores): concurrent runs sharing the selector don't
+    consume each other's draws, and a run repeated with the same run_id draws
+    the same samples. None outside a run or for an unseeded selector.
+    """
+    trace = current_trace()
+    if seed is None or trace is None:
+        return None
+    h = hashlib.sha256(f"{seed}|{trace.trace_id}|{trace.meta.get('step')}|".encode())
+    h.update(scores)
+    return int.from_bytes(h.digest()[:8], "little")
 
 
 @dataclass(frozen=True)
 class SampleSelector(Selector[StateT]):
+    """
+    Score-proportional sampling without replacement. Inside a run each step
+    draws from its own RNG (see selection_seed), so runs sharing the selector
+    stay reproducible; outside one, the RNG seeded once is used.
+    """
+
     seed: int | None = 42
+    _rng: random.Random = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_rng", random.Random(self.seed))
 
     def select(self, candidates: list[Candidate[StateT]], scores: list[float], n_select: int) -> list[Candidate[StateT]]:
         if len(candidates) != len(scores):
             raise ValueError("candidates and scores must have the same length")
-        rng = random.Random(self.seed)
         weights = [max(0.0, float(s)) for s in scores]
-        total = sum(weights)
-        if total <= 0:
+        seed = selection_seed(self.seed, array("d", weights).tobytes())
+        rng = random.Random(seed) if seed is not None else self._rng
+        if sum(weights) <= 0:
             idx = list(range(len(candidates)))
             rng.shuffle(idx)
             return [candidates[i] for i in idx[:n_select]]
 
-        chosen: list[int] = []
-        pool = list(range(len(candidates)))
-        for _ in range(min(n_select, len(pool))):
-            r = rng.random() * total
-            acc = 0.0
-            pick = pool[-1]
-            for i in pool:
-                acc += weights[i]
-                if acc >= r:
-                    pick = i
-                    break
-            chosen.append(pick)
-            total -= weights[pick]
-            pool.remove(pick)
+        # Efraimidis-Spirakis: top-k of u ** (1 / w) is a weighted sample without replacement.
+        # Zero weights get key 0 and are only picked once positive weights run out.
+        keys = [rng.random() ** (1.0 / w) if w > 0 else 0.0 for w in weights]
+        chosen = heapq.nlargest(n_select, range(len(candidates)), key=keys.__getitem__)
         return [candidates[i] for i in chosen]
 
 
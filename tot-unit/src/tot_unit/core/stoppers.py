@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Generic, TypeVar
+from typing import ClassVar, Generic, TypeVar
 
 from .interfaces import Stopper
 from .types import Candidate
@@ -13,6 +13,8 @@ StateT = TypeVar("StateT")
 @dataclass(frozen=True)
 class MaxStepStopper(Stopper[StateT]):
     max_step: int
+    # a depth limit, not a goal test: searches it ends report stopped_by "steps"
+    goal: ClassVar[bool] = False
 
     def should_stop(self, step: int, selected: list[Candidate[StateT]], scores: list[float]) -> bool:
         return step >= self.max_step
@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable, Iterator, Mapping, Protocol, TypeVar
+
+from .types import Trace
+
+
+T = TypeVar("T")
+
+CALL_SPAN = "llm.call"
+
+
+@dataclass
+class Span:
+    """
+    One timed unit of work. Times are epoch seconds; ids follow the W3C
+    trace-context sizes (32 hex chars for traces, 16 for spans).
+    """
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: str | None
+    start: float
+    end: float = 0.0
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+@dataclass(frozen=True)
+class Price:
+    """
+    USD per million tokens; `cached_input` defaults to the `input` price.
+    """
+
+    input: float
+    output: float
+    cached_input: float | None = None
+
+
+@dataclass
+class CallStats:
+    calls: int = 0
+    errors: int = 0
+    retries: int = 0
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+    completion_tokens: int = 0
+    latency: float = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def mean_latency(self) -> float:
+        return self.latency / self.calls if self.calls else 0.0
+
+    def add(self, span: Span) -> None:
+        a = span.attributes
+        self.calls += 1
+        self.errors += 0 if a.get("ok", True) else 1
+        self.retries += a.get("retries", 0)
+        self.prompt_tokens += a.get("prompt_tokens", 0)
+        self.cached_tokens += a.get("cached_tokens", 0)
+        self.completion_tokens += a.get("completion_tokens", 0)
+        self.latency += span.duration
+
+
+class SpanExporter(Protocol):
+    """
+    Receives all spans of a run once it finishes, parents before children.
+    """
+
+    def export(self, spans: list[Span]) -> None: ...
+
+
+class RunTelemetry:
+    """
+    Spans of one run: the run itself, each step / expansion, the generate
+    and evaluate phases, and every LLM request ("llm.call", tagged with step,
+    role, model, tokens, latency and retries). Thread-safe.
+    """
+
+    def __init__(self, trace_id: str) -> None:
+        self.trace_id = trace_id
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def calls(self) -> list[Span]:
+        with self._lock:
+            return [s for s in self.spans if s.name == CALL_SPAN]
+
+    def total(self) -> CallStats:
+        stats = CallStats()
+        for span in self.calls():
+            stats.add(span)
+        return stats
+
+    def group(self, key: Callable[[Span], Hashable]) -> dict[Hashable, CallStats]:
+        out: dict[Hashable, CallStats] = {}
+        for span in self.calls():
+            out.setdefault(key(span), CallStats()).add(span)
+        return out
+
+    def by_step(self) -> dict[int, CallStats]:
+        return self.group(lambda s: s.attributes.get("step"))
+
+    def by_role(self) -> dict[str, CallStats]:
+        return self.group(lambda s: s.attributes.get("role"))
+
+    def by_model(self) -> dict[str, CallStats]:
+        return self.group(lambda s: s.attributes.get("model"))
+
+    def cost(self, prices: Mapping[str, Price]) -> float:
+        """
+        USD cost of every call whose model has a price; cached prompt tokens
+        are charged at the cached rate.
+        """
+        total = 0.0
+        for span in self.calls():
+            a = span.attributes
+            price = prices.get(a.get("model"))
+            if price is None:
+                continue
+            cached = a.get("cached_tokens", 0)
+            cached_rate = price.cached_input if price.cached_input is not None else price.input
+            total += (a.get("prompt_tokens", 0) - cached) * price.input
+            total += cached * cached_rate + a.get("completion_tokens", 0) * price.output
+        return total / 1e6
+
+
+_TRACE: contextvars.ContextVar[Trace | None] = contextvars.ContextVar("tot_trace", default=None)
+_TELEMETRY: contextvars.ContextVar[RunTelemetry | None] = contextvars.ContextVar("tot_telemetry", default=None)
+
+
+def _span_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def current_trace() -> Trace | None:
+    """
+    Trace of the span the caller runs in; `meta` carries step and role.
+    """
+    return _TRACE.get()
+
+
+def current_telemetry() -> RunTelemetry | None:
+    """
+    Telemetry of the run the caller is part of, e.g. to watch its spend live.
+    """
+    return _TELEMETRY.get()
+
+
+@contextmanager
+def run_scope(run_id: str, exporter: SpanExporter | None = None) -> Iterator[RunTelemetry]:
+    """
+    Collect the spans of one run. The run id becomes the trace id.
+    """
+    telemetry = RunTelemetry(run_id)
+    span = Span("tot.run", run_id, _span_id(), None, time.time())
+    trace_token = _TRACE.set(Trace(trace_id=run_id, span_id=span.span_id))
+    telemetry_token = _TELEMETRY.set(telemetry)
+    try:
+        yield telemetry
+    finally:
+        _TELEMETRY.reset(telemetry_token)
+        _TRACE.reset(trace_token)
+        span.end = time.time()
+        telemetry.add(span)
+        if exporter is not None:
+            exporter.export(_parents_first(telemetry.spans))
+
+
+@contextmanager
+def span_scope(name: str, **attributes: Any) -> Iterator[Trace | None]:
+    """
+    Child span of the current one. `attributes` are also added to the trace
+    meta, so calls made inside inherit them (e.g. step, role).
+    """
+    parent = _TRACE.get()
+    telemetry = _TELEMETRY.get()
+    if parent is None or telemetry is None:
+        yield parent
+        return
+    span = Span(name, parent.trace_id, _span_id(), parent.span_id, time.time(), attributes=dict(attributes))
+    trace = Trace(
+        trace_id=parent.trace_id,
+        parent_span_id=parent.span_id,
+        span_id=span.span_id,
+        meta={**parent.meta, **attributes},
+    )
+    token = _TRACE.set(trace)
+    try:
+        yield trace
+    finally:
+        _TRACE.reset(token)
+        span.end = time.time()
+        telemetry.add(span)
+
+
+def usage_counts(usage: Any) -> tuple[int, int, int]:
+    """
+    (prompt, completion, cached prompt) tokens of an OpenAI-style `usage`
+    object; cached tokens also come from DeepSeek's prompt_cache_hit_tokens.
+    """
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None)
+    if cached is None:
+        cached = getattr(usage, "prompt_cache_hit_tokens", None)
+    return getattr(usage, "prompt_tokens", 0) or 0, getattr(usage, "completion_tokens", 0) or 0, cached or 0
+
+
+def record_call(start: float, ok: bool = True, usage: Any = None, **attributes: Any) -> None:
+    """
+    Record one finished LLM request started at `start`. Token counts come
+    from an OpenAI-style `usage` object (see usage_counts). No-op outside a run.
+    """
+    parent = _TRACE.get()
+    telemetry = _TELEMETRY.get()
+    if parent is None or telemetry is None:
+        return
+    attrs = {**parent.meta, **attributes, "ok": ok}
+    if usage is not None:
+        attrs["prompt_tokens"], attrs["completion_tokens"], attrs["cached_tokens"] = usage_counts(usage)
+    telemetry.add(Span(CALL_SPAN, parent.trace_id, _span_id(), parent.span_id, start, time.time(), attrs))
+
+
+def bind_context(fn: Callable[..., T]) -> Callable[..., T]:
+    """
+    Run `fn` in the caller's context from worker threads, so calls made there
+    stay attached to the current span.
+    """
+    ctx = contextvars.copy_context()
+
+    def run(*args: Any, **kwargs: Any) -> T:
+        # one copy per call: a Context can't be entered by two threads at once
+        return ctx.copy().run(fn, *args, **kwargs)
+
+    return run
+
+
+def _parents_first(spans: list[Span]) -> list[Span]:
+    ids = {s.span_id for s in spans}
+    depth: dict[str, int] = {}
+    parent = {s.span_id: s.parent_span_id for s in spans}
+
+    def level(span_id: str) -> int:
+        if span_id not in depth:
+            p = parent.get(span_id)
+            depth[span_id] = 0 if p is None or p not in ids else level(p) + 1
+        return depth[span_id]
+
+    return sorted(spans, key=lambda s: (level(s.span_id), s.start))
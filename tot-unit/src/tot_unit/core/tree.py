@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import threading
+import weakref
+from array import array
+from collections import OrderedDict
+from typing import Any, TypeVar
+
+from .tracing import RunTelemetry, current_telemetry
+from .types import Candidate
+
+
+StateT = TypeVar("StateT")
+
+
+class CandidateStore:
+    """
+    Append-only tree of text deltas. Node i stores its parent id and only the
+    text it added; full texts are rebuilt on demand and kept in a bounded LRU,
+    so memory grows with the amount of generated text, not with depth x width.
+    """
+
+    def __init__(self, text_cache_size: int = 1024) -> None:
+        self._parents = array("q")
+        self._deltas: list[str] = []
+        self._cache: OrderedDict[int, str] = OrderedDict()
+        self._cache_size = text_cache_size
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._deltas)
+
+    def add(self, delta: str, parent_id: int = -1) -> int:
+        with self._lock:
+            if parent_id >= len(self._deltas):
+                raise IndexError(f"unknown parent node {parent_id}")
+            self._parents.append(parent_id)
+            self._deltas.append(delta)
+            return len(self._deltas) - 1
+
+    def parent(self, node_id: int) -> int:
+        return self._parents[node_id]
+
+    def delta(self, node_id: int) -> str:
+        return self._deltas[node_id]
+
+    def path(self, node_id: int) -> list[int]:
+        """
+        Node ids from the root down to `node_id`.
+        """
+        out: list[int] = []
+        while node_id >= 0:
+            out.append(node_id)
+            node_id = self._parents[node_id]
+        out.reverse()
+        return out
+
+    def text(self, node_id: int) -> str:
+        with self._lock:
+            cached = self._cache.get(node_id)
+            if cached is not None:
+                self._cache.move_to_end(node_id)
+                return cached
+            parts: list[str] = []
+            cur = node_id
+            base = ""
+            while cur >= 0:
+                hit = self._cache.get(cur)
+                if hit is not None:
+                    base = hit
+                    break
+                parts.append(self._deltas[cur])
+                cur = self._parents[cur]
+            parts.reverse()
+            text = base + "".join(parts)
+            if self._cache_size > 0:
+                self._cache[node_id] = text
+                if len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+            return text
+
+    def candidate(self, state: StateT, node_id: int, meta: dict[str, Any] | None = None) -> "TreeCandidate[StateT]":
+        return TreeCandidate(state=state, store=self, node_id=node_id, meta=meta)
+
+    def root(self, candidate: Candidate[StateT]) -> "TreeCandidate[StateT]":
+        """
+        Node for `candidate` in this store; plain candidates become new roots.
+        """
+        if isinstance(candidate, TreeCandidate) and candidate.store is self:
+            return candidate
+        node_id = self.add(candidate.text)
+        return self.candidate(candidate.state, node_id, candidate.meta)
+
+    def child(
+        self,
+        parent: Candidate[StateT],
+        delta: str,
+        state: StateT | None = None,
+        meta: dict[str, Any] | None = None,
+    ) -> "TreeCandidate[StateT]":
+        parent_node = self.root(parent)
+        node_id = self.add(delta, parent_node.node_id)
+        return self.candidate(parent.state if state is None else state, node_id, meta)
+
+
+class TreeCandidate(Candidate[StateT]):
+    """
+    Candidate backed by a CandidateStore node. `text` is built lazily from the
+    ancestor deltas; everything else behaves like a plain Candidate.
+    """
+
+    __slots__ = ("store", "node_id")
+
+    def __init__(
+        self,
+        state: StateT,
+        store: CandidateStore,
+        node_id: int,
+        meta: dict[str, Any] | None = None,
+    ) -> None:
+        object.__setattr__(self, "state", state)
+        object.__setattr__(self, "meta", meta if meta is not None else {})
+        object.__setattr__(self, "store", store)
+        object.__setattr__(self, "node_id", node_id)
+
+    @property
+    def text(self) -> str:
+        return self.store.text(self.node_id)
+
+    @property
+    def delta(self) -> str:
+        return self.store.delta(self.node_id)
+
+    @property
+    def parent_id(self) -> int:
+        return self.store.parent(self.node_id)
+
+    def path(self) -> list[str]:
+        """
+        Text deltas from the root down to this candidate.
+        """
+        return [self.store.delta(i) for i in self.store.path(self.node_id)]
+
+
+class RunStores:
+    """
+    One CandidateStore per run, for generators shared by many runs (e.g. a
+    batch): each call resolves the store of the run it is part of. Stores are
+    held weakly through the run's telemetry, so a run's tree goes away with
+    its result. Calls outside a run get a fresh store.
+    """
+
+    def __init__(self, text_cache_size: int = 1024) -> None:
+        self.text_cache_size = text_cache_size
+        self._stores: weakref.WeakKeyDictionary[RunTelemetry, CandidateStore] = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._stores)
+
+    def current(self) -> CandidateStore:
+        telemetry = current_telemetry()
+        if telemetry is None:
+            return CandidateStore(self.text_cache_size)
+        with self._lock:
+            store = self._stores.get(telemetry)
+            if store is None:
+                store = self._stores[telemetry] = CandidateStore(self.text_cache_size)
+            return store
@@ -1,7 +1,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Generic, TypeVar
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
+
+if TYPE_CHECKING:
+    from .search import SearchStats
+    from .tracing import RunTelemetry
 
 
 StateT = TypeVar("StateT")
@@ -28,11 +32,25 @@ class StepLog(Generic[StateT]):
     candidates: list[Candidate[StateT]]
     scores: list[float]
     selected: list[Candidate[StateT]]
+    # score summary (n/min/max/mean); kept even when candidates are dropped
+    stats: dict[str, float] = field(default_factory=dict)
 
 
 @dataclass(frozen=True)
 class RunResult(Generic[StateT]):
     final_candidates: list[Candidate[StateT]]
     logs: list[StepLog[StateT]]
+    # cost counters of the search that produced this result (see core.search)
+    search: "SearchStats | None" = None
+    # spans and token / latency aggregates of the run (see core.tracing)
+    telemetry: "RunTelemetry | None" = None
+
+    def path(self, candidate: Candidate[StateT]) -> list[str]:
+        """
+        Text segments from the root to `candidate`, one per step for tree-backed
+        candidates (see core.tree); a plain candidate is its own single segment.
+        """
+        path = getattr(candidate, "path", None)
+        return path() if callable(path) else [candidate.text]
 
 
@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from typing import AsyncIterator, Iterator, Protocol
+
+
+class RequestLimiter(Protocol):
+    """
+    Gate around a single API request. Both the sync and the async client
+    hold `slot()` / `aslot()` for the duration of each request and report the
+    outcome through `feedback`. `tokens` is the estimated prompt + completion
+    size of the request.
+    """
+
+    def slot(self, tokens: int = 0) -> Iterator[None]: ...
+
+    def aslot(self, tokens: int = 0) -> AsyncIterator[None]: ...
+
+    def feedback(self, ok: bool, retry_after: float | None = None, reserved: int = 0, used: int | None = None) -> None: ...
+
+
+class InFlightLimiter:
+    """
+    Caps the number of concurrent requests. Thread-safe and usable from any
+    event loop, so one instance can be shared by every client of a batch.
+    """
+
+    def __init__(self, max_in_flight: int) -> None:
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be >= 1")
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def _limit(self) -> int:
+        return self.max_in_flight
+
+    def try_acquire(self) -> bool:
+        with self._cond:
+            if self.in_flight >= self._limit():
+                return False
+            self.in_flight += 1
+            return True
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self.in_flight >= self._limit():
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, tokens: int = 0) -> Iterator[None]:
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def aslot(self, tokens: int = 0) -> AsyncIterator[None]:
+        # poll instead of blocking: the limiter may be shared across loops and threads
+        while not self.try_acquire():
+            await asyncio.sleep(0.005)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def feedback(self, ok: bool, retry_after: float | None = None, reserved: int = 0, used: int | None = None) -> None:
+        pass
+
+
+class AdaptiveConcurrency(InFlightLimiter):
+    """
+    AIMD concurrency window: +1 per window of successful requests, halved on
+    every throttled one, kept within [min_concurrency, max_concurrency].
+    """
+
+    def __init__(self, max_concurrency: int, min_concurrency: int = 1, backoff_factor: float = 0.5) -> None:
+        super().__init__(max_concurrency)
+        if not 1 <= min_concurrency <= max_concurrency:
+            raise ValueError("min_concurrency must be in [1, max_concurrency]")
+        self.min_concurrency = min_concurrency
+        self.backoff_factor = backoff_factor
+        self.window = float(max_concurrency)
+
+    def _limit(self) -> int:
+        return max(self.min_concurrency, int(self.window))
+
+    def feedback(self, ok: bool, retry_after: float | None = None, reserved: int = 0, used: int | None = None) -> None:
+        with self._cond:
+            if ok:
+                self.window = min(float(self.max_in_flight), self.window + 1.0 / self.window)
+            else:
+                self.window = max(float(self.min_concurrency), self.window * self.backoff_factor)
+            self._cond.notify_all()
+
+
+class TokenBucket:
+    """
+    `per_minute` units refilled continuously, holding at most `burst` units.
+    Reservations may drive the level negative; the caller then waits it out.
+    """
+
+    def __init__(self, per_minute: float, burst: float | None = None) -> None:
+        if per_minute <= 0:
+            raise ValueError("per_minute must be > 0")
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst if burst is not None else max(1.0, self.rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, cost: float = 1.0) -> float:
+        """
+        Take `cost` units and return how long the caller must wait before sending.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= cost
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def refund(self, amount: float) -> None:
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+
+class EndpointLimiter:
+    """
+    Everything one (api_base, model) quota needs: RPM and TPM token buckets,
+    an AIMD concurrency window, and a shared pause after a 429 so that every
+    caller honors the server's retry-after, not only the one that got it.
+    `burst` caps back-to-back requests (default: one second of `rpm`);
+    `max_concurrency=None` leaves concurrency unbounded.
+    """
+
+    def __init__(
+        self,
+        rpm: float | None = None,
+        tpm: float | None = None,
+        max_concurrency: int | None = 32,
+        min_concurrency: int = 1,
+        burst: float | None = None,
+    ) -> None:
+        self.requests = TokenBucket(rpm, burst if burst is not None else max(1.0, rpm / 60.0)) if rpm else None
+        # allow one minute of tokens as burst so a single large request can pass
+        self.tokens = TokenBucket(tpm, tpm) if tpm else None
+        self.concurrency = AdaptiveConcurrency(max_concurrency, min_concurrency) if max_concurrency is not None else None
+        self._pause_until = 0.0
+        self._lock = threading.Lock()
+
+    def _delay(self, tokens: int) -> float:
+        with self._lock:
+            delay = max(0.0, self._pause_until - time.monotonic())
+        if self.requests is not None:
+            delay = max(delay, self.requests.reserve(1))
+        if self.tokens is not None and tokens > 0:
+            delay = max(delay, self.tokens.reserve(min(tokens, self.tokens.capacity)))
+        return delay
+
+    @contextmanager
+    def slot(self, tokens: int = 0) -> Iterator[None]:
+        # pace before taking a concurrency slot, so waiting callers don't hold one
+        delay = self._delay(tokens)
+        if delay > 0:
+            time.sleep(delay)
+        with self.concurrency.slot() if self.concurrency is not None else nullcontext():
+            yield
+
+    @asynccontextmanager
+    async def aslot(self, tokens: int = 0) -> AsyncIterator[None]:
+        delay = self._delay(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        async with self.concurrency.aslot() if self.concurrency is not None else nullcontext():
+            yield
+
+    def feedback(self, ok: bool, retry_after: float | None = None, reserved: int = 0, used: int | None = None) -> None:
+        if self.concurrency is not None:
+            self.concurrency.feedback(ok)
+        if self.tokens is not None and used is not None and reserved > used:
+            self.tokens.refund(reserved - used)
+        if not ok and retry_after:
+            with self._lock:
+                self._pause_until = max(self._pause_until, time.monotonic() + retry_after)
+
+
+class RateLimiter(EndpointLimiter):
+    """
+    Requests-per-minute limit alone: an EndpointLimiter with `rpm` sustained
+    requests per minute, bursts of up to `burst` requests, and no token or
+    concurrency limit.
+    """
+
+    def __init__(self, rpm: float, burst: int | None = None) -> None:
+        super().__init__(rpm=rpm, max_concurrency=None, burst=burst)
+
+
+# (api_base, model, rpm, tpm, max_concurrency) -> limiter
+_ENDPOINT_LIMITERS: dict[tuple[str, str, float | None, float | None, int | None], EndpointLimiter] = {}
+_ENDPOINT_LOCK = threading.Lock()
+
+
+def endpoint_limiter(
+    api_base: str,
+    model: str,
+    rpm: float | None = None,
+    tpm: float | None = None,
+    max_concurrency: int = 32,
+) -> EndpointLimiter:
+    """
+    Process-wide limiter for (api_base, model) under a given quota: every
+    client pointing at the same endpoint with the same rpm / tpm /
+    max_concurrency shares the returned instance. A different quota gets
+    its own limiter rather than silently reusing the first one.
+    """
+    key = (api_base.rstrip("/"), model, rpm, tpm, max_concurrency)
+    with _ENDPOINT_LOCK:
+        limiter = _ENDPOINT_LIMITERS.get(key)
+        if limiter is None:
+            limiter = EndpointLimiter(rpm=rpm, tpm=tpm, max_concurrency=max_concurrency)
+            _ENDPOINT_LIMITERS[key] = limiter
+        return limiter
+
+
+def backoff_delay(attempt: int, base: float, retry_after: float | None = None) -> float:
+    """
+    Server-provided retry-after plus jitter, otherwise exponential backoff with full jitter.
+    """
+    if retry_after is not None:
+        return retry_after + random.uniform(0.0, base)
+    return random.uniform(0.0, base * (2**attempt))
+
+
+class EndpointLimits:
+    """
+    Limits a batch adds to every endpoint's own quota: one in-flight budget
+    shared by every request, and an `rpm` cap per (api_base, model) that
+    tightens the endpoint's own rpm. Both go through the same shared
+    EndpointLimiter as the endpoint's quota, so a request is paced once.
+    """
+
+    def __init__(self, max_in_flight: int | None = None, rpm: float | None = None) -> None:
+        self.in_flight = InFlightLimiter(max_in_flight) if max_in_flight is not None else None
+        self.rpm = rpm
+
+    def for_endpoint(
+        self,
+        api_base: str,
+        model: str,
+        rpm: float | None = None,
+        tpm: float | None = None,
+        max_concurrency: int = 32,
+    ) -> tuple[RequestLimiter, ...]:
+        """
+        Limiters for a client of (api_base, model) whose own quota is `rpm`,
+        `tpm` and `max_concurrency`.
+        """
+        if self.rpm is not None:
+            rpm = self.rpm if rpm is None else min(rpm, self.rpm)
+        limiters: list[RequestLimiter] = [endpoint_limiter(api_base, model, rpm=rpm, tpm=tpm, max_concurrency=max_concurrency)]
+        if self.in_flight is not None:
+            limiters.append(self.in_flight)
+        return tuple(limiters)
@@ -1,18 +1,74 @@
 from __future__ import annotations
 
+import asyncio
 import os
-from dataclasses import dataclass
-from typing import Callable, Optional, Protocol
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack, ExitStack
+from dataclasses import dataclass, field
+from typing import Any, Callable, Mapping, Optional, Protocol
 
-from openai import OpenAI
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError,
+)
 
-from .core.interfaces import Evaluator, Generator
+from .cache import CompletionCache, completion_key
+from .clients import ClientRegistry, default_registry
+from .core.interfaces import AsyncEvaluator, AsyncGenerator, Evaluator, Generator
+from .core.tracing import bind_context, record_call, usage_counts
+from .core.tree import CandidateStore, RunStores
 from .core.types import Candidate
+from .limits import RequestLimiter, backoff_delay
+from .adaptive import AdaptiveGeneration, AdaptiveVoting, sample_rounds
+from .prompts import Prompt, PromptLike, as_prompt, group_by_prefix
+from .voting import Tournament, VoteChunking
+from .vote_parsing import VoteParser, count_votes
 
 
 StateT = type("StateT", (), {})
 
 
+@dataclass
+class UsageStats:
+    """
+    Token counters from the `usage` field of responses. `cached_prompt_tokens`
+    is the part of the prompt served from the provider's prefix cache.
+    """
+
+    requests: int = 0
+    prompt_tokens: int = 0
+    cached_prompt_tokens: int = 0
+    completion_tokens: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    @property
+    def uncached_prompt_tokens(self) -> int:
+        return self.prompt_tokens - self.cached_prompt_tokens
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def cache_hit_rate(self) -> float:
+        return self.cached_prompt_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+
+    def record(self, usage) -> None:
+        if usage is None:
+            return
+        prompt, completion, cached = usage_counts(usage)
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += prompt
+            self.cached_prompt_tokens += cached
+            self.completion_tokens += completion
+
+
 @dataclass(frozen=True)
 class LLMConfig:
     api_key: str
@@ -20,116 +76,849 @@ class LLMConfig:
     model: str
     temperature: float = 0.7
     max_tokens: int = 800
+    # when n exceeds the per-request limit, chunks are sent concurrently
+    max_parallel_chunks: int = 4
+    # retries per chunk on transient errors (connection, timeout, 5xx)
+    max_retries: int = 2
+    retry_backoff: float = 0.5
+    # 429s are expected under load and get their own, larger retry budget
+    max_rate_limit_retries: int = 6
+    # overrides TOT_MAX_N_PER_REQUEST and the per-provider defaults
+    max_n_per_request: int | None = None
+    # per-(api_base, model) quota, shared by every client built by LLMToT
+    rpm: float | None = None
+    tpm: float | None = None
+    max_concurrency: int = 32
+    # HTTP transport; clients with equal key/base/settings share one pool
+    timeout: float | None = 600.0
+    connect_timeout: float = 5.0
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    # used when the optional `h2` package is installed
+    http2: bool = True
+    # token usage sink shared by the clients built from this config
+    usage: UsageStats | None = field(default=None, compare=False, repr=False)
+    # return samples of the chunks that succeeded instead of raising
+    allow_partial: bool = False
+    # opt-in completion cache, keyed per sample (see tot_unit.cache)
+    cache: CompletionCache | None = field(default=None, compare=False, repr=False)
+    # shared gates (in-flight budget, rate limits) entered around every request
+    limiters: tuple[RequestLimiter, ...] = field(default=(), compare=False, repr=False)
+    # extra request fields, e.g. response_format or tools/tool_choice
+    # (see vote_parsing.structured_vote_options); part of the cache key
+    request_options: Mapping[str, Any] | None = field(default=None, compare=False, repr=False)
+
+
+def _message_text(message) -> str:
+    # forced function calls carry the answer in the arguments, not the content
+    if message.content:
+        return message.content
+    for call in getattr(message, "tool_calls", None) or ():
+        return call.function.arguments or ""
+    return ""
+
+
+_RETRYABLE_ERRORS = (APIConnectionError, APITimeoutError, InternalServerError)
+
+# known server-side caps on `n`, matched against api_base
+_N_LIMITS = {"dashscope.aliyuncs.com": 4}
+
+
+def _retry_after(err: RateLimitError) -> float | None:
+    headers = getattr(getattr(err, "response", None), "headers", None) or {}
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return max(0.0, float(value) * scale)
+        except ValueError:
+            continue
+    return None
+
+
+@dataclass
+class _Attempts:
+    errors: int = 0
+    throttled: int = 0
+
+
+@dataclass
+class _StreamOptions:
+    # client-side predicate on a sample's text so far; True ends that sample
+    early_stop: Optional[Callable[[str], bool]] = None
+    # called with (sample index, text so far) after every delta
+    on_delta: Optional[Callable[[int, str], None]] = None
+
+
+class _StreamCollector:
+    """
+    Accumulates streamed deltas of one request (samples `offset` ..
+    `offset + n - 1`) and tracks which samples are finished.
+    """
+
+    def __init__(self, n: int, offset: int, opts: _StreamOptions) -> None:
+        self.texts = ["" for _ in range(n)]
+        self.done = [False for _ in range(n)]
+        self.offset = offset
+        self.opts = opts
+        # sent in a trailing chunk when the request asks for stream usage
+        self.usage = None
+        # some sample was ended by early_stop, so the stream is cut short
+        self.stopped = False
+
+    def feed(self, chunk) -> bool:
+        """
+        Take one chunk; True once every sample has ended and one of them was
+        stopped client-side, i.e. the rest of the stream is not needed.
+        Naturally finished streams are read to the end for their usage.
+        """
+        if getattr(chunk, "usage", None) is not None:
+            self.usage = chunk.usage
+        for choice in chunk.choices:
+            i = choice.index
+            if not 0 <= i < len(self.texts) or self.done[i]:
+                continue
+            delta = getattr(choice.delta, "content", None) or ""
+            if delta:
+                self.texts[i] += delta
+                if self.opts.on_delta is not None:
+                    self.opts.on_delta(self.offset + i, self.texts[i])
+                if self.opts.early_stop is not None and self.opts.early_stop(self.texts[i]):
+                    self.done[i] = True
+                    self.stopped = True
+            if choice.finish_reason is not None:
+                self.done[i] = True
+        return self.stopped and all(self.done)
+
+    def estimate_usage(self, prompt_tokens: int) -> None:
+        """
+        Fill in `usage` from the collected text (~4 chars per token) when the
+        provider sent none, e.g. because the stream was cut short.
+        """
+        if self.usage is None:
+            completion = sum(len(t) for t in self.texts) // 4
+            self.usage = _EstimatedUsage(prompt_tokens, completion, prompt_tokens + completion)
+
+
+@dataclass(frozen=True)
+class _EstimatedUsage:
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
 
 
 class PromptBuilder(Protocol):
-    def __call__(self, step: int, candidate: Candidate) -> str: ...
+    """
+    Returns plain text or a `Prompt` with a stable prefix (see tot_unit.prompts).
+    """
+
+    def __call__(self, step: int, candidate: Candidate) -> PromptLike: ...
 
 
 class VotePromptBuilder(Protocol):
-    def __call__(self, step: int, candidates: list[Candidate]) -> str: ...
+    def __call__(self, step: int, candidates: list[Candidate]) -> PromptLike: ...
 
 
 class StopProvider(Protocol):
     def __call__(self, step: int, candidate: Candidate) -> Optional[str]: ...
 
 
-class OpenAICompatibleClient:
-    def __init__(self, cfg: LLMConfig):
-        self.cfg = cfg
-        self.client = OpenAI(api_key=cfg.api_key, base_url=cfg.api_base)
+class EarlyStop(Protocol):
+    """
+    Client-side stop rule for streamed samples: called with the text
+    generated so far for `candidate`; returning True ends that sample.
+    """
+
+    def __call__(self, step: int, candidate: Candidate, text: str) -> bool: ...
+
+
+class PartialCallback(Protocol):
+    def __call__(self, step: int, candidate: Candidate) -> None: ...
+
+
+def stop_on_regex(pattern: str, flags: int = 0) -> EarlyStop:
+    compiled = re.compile(pattern, flags)
+    return lambda step, candidate, text: compiled.search(text) is not None
+
+
+def stop_at_length(max_chars: int) -> EarlyStop:
+    return lambda step, candidate, text: len(text) >= max_chars
+
+
+class _BaseClient:
+    cfg: LLMConfig
 
     def _max_n_per_request(self) -> int:
+        if self.cfg.max_n_per_request is not None:
+            return max(1, self.cfg.max_n_per_request)
         env_limit = os.getenv("TOT_MAX_N_PER_REQUEST")
         if env_limit:
             try:
                 return max(1, int(env_limit))
             except ValueError:
                 pass
-        if "dashscope.aliyuncs.com" in self.cfg.api_base:
-            return 4
+        for host, limit in _N_LIMITS.items():
+            if host in self.cfg.api_base:
+                return limit
         return 20
 
-    def chat(self, prompt: str, n: int, stop: Optional[str]) -> list[str]:
-        outputs: list[str] = []
-        remaining = n
+    def _chunk_sizes(self, n: int) -> list[int]:
         max_n = self._max_n_per_request()
+        sizes: list[int] = []
+        remaining = n
         while remaining > 0:
             cnt = min(remaining, max_n)
+            sizes.append(cnt)
             remaining -= cnt
-            response = self.client.chat.completions.create(
-                model=self.cfg.model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=self.cfg.temperature,
-                max_tokens=self.cfg.max_tokens,
-                n=cnt,
-                stop=stop,
+        return sizes
+
+    def _request_kwargs(self, prompt: PromptLike, n: int, stop: Optional[str]) -> dict:
+        return {
+            "model": self.cfg.model,
+            "messages": as_prompt(prompt).messages(),
+            "temperature": self.cfg.temperature,
+            "max_tokens": self.cfg.max_tokens,
+            "n": n,
+            "stop": stop,
+            **(self.cfg.request_options or {}),
+        }
+
+    def _estimate_tokens(self, prompt: PromptLike, n: int) -> int:
+        # rough: ~4 chars per token, and assume every sample uses max_tokens
+        return len(as_prompt(prompt).text()) // 4 + self.cfg.max_tokens * n
+
+    def _feedback(
+        self, ok: bool, reserved: int, response=None, retry_after: float | None = None, used: int | None = None
+    ) -> None:
+        usage = getattr(response, "usage", None)
+        if ok:
+            self.usage.record(usage)
+        if used is None:
+            used = getattr(usage, "total_tokens", None)
+        for limiter in self.cfg.limiters:
+            limiter.feedback(ok, retry_after=retry_after, reserved=reserved, used=used)
+
+    def _record(self, started: float, attempts: _Attempts, n: int, response=None, ok: bool = True) -> None:
+        record_call(
+            started,
+            ok=ok,
+            usage=getattr(response, "usage", None),
+            model=self.cfg.model,
+            api_base=self.cfg.api_base,
+            n=n,
+            retries=attempts.errors + attempts.throttled,
+        )
+
+    def _retry_delay(self, err: Exception, attempts: _Attempts, reserved: int) -> float:
+        """
+        Delay before retrying after `err`; re-raises once the budget for that kind of error is spent.
+        """
+        if isinstance(err, RateLimitError):
+            retry_after = _retry_after(err)
+            # a rejected request used nothing: refund the whole reservation before the retry reserves again
+            self._feedback(False, reserved, retry_after=retry_after, used=0)
+            if attempts.throttled >= self.cfg.max_rate_limit_retries:
+                raise err
+            attempts.throttled += 1
+            return backoff_delay(attempts.throttled - 1, self.cfg.retry_backoff, retry_after)
+        if isinstance(err, _RETRYABLE_ERRORS) and attempts.errors < self.cfg.max_retries:
+            attempts.errors += 1
+            return backoff_delay(attempts.errors - 1, self.cfg.retry_backoff)
+        raise err
+
+    def _cache_keys(self, prompt: PromptLike, n: int, stop: Optional[str], start: int = 0) -> list[str]:
+        # plain strings keep their historical key; structured prompts key on messages
+        content = prompt.messages() if isinstance(prompt, Prompt) else prompt
+        if self.cfg.request_options:
+            content = [content, dict(self.cfg.request_options)]
+        return [
+            completion_key(
+                self.cfg.model,
+                self.cfg.api_base,
+                content,
+                self.cfg.temperature,
+                self.cfg.max_tokens,
+                stop,
+                i,
             )
-            outputs.extend([c.message.content or "" for c in response.choices])
+            for i in range(start, start + n)
+        ]
+
+    def _cache_lookup(
+        self, prompt: PromptLike, n: int, stop: Optional[str], start: int = 0
+    ) -> tuple[list[str], list[Optional[str]]]:
+        keys = self._cache_keys(prompt, n, stop, start)
+        return keys, [self.cfg.cache.get(k) for k in keys]
+
+    def _cache_fill(self, keys: list[str], cached: list[Optional[str]], fetched: list[str]) -> list[str]:
+        # fetched samples fill the missing indices in order
+        it = iter(fetched)
+        outputs: list[str] = []
+        for key, value in zip(keys, cached):
+            if value is None:
+                value = next(it, None)
+                if value is None:
+                    continue
+                self.cfg.cache.put(key, value)
+            outputs.append(value)
         return outputs
 
+    def _merge_chunks(self, results: list[list[str] | BaseException]) -> list[str]:
+        outputs: list[str] = []
+        errors: list[BaseException] = []
+        for res in results:
+            if isinstance(res, BaseException):
+                errors.append(res)
+            else:
+                outputs.extend(res)
+        if errors and not (self.cfg.allow_partial and outputs):
+            raise errors[0]
+        return outputs
+
+
+class OpenAICompatibleClient(_BaseClient):
+    def __init__(self, cfg: LLMConfig, registry: ClientRegistry | None = None):
+        self.cfg = cfg
+        self.registry = registry or default_registry
+        self.usage = cfg.usage if cfg.usage is not None else UsageStats()
+        self.client = self.registry.sync_client(cfg)
+
+    def _consume(self, kwargs: dict, n: int, offset: int, stream: _StreamOptions):
+        collector = _StreamCollector(n, offset, stream)
+        response = self.client.chat.completions.create(**kwargs, stream=True, stream_options={"include_usage": True})
+        try:
+            for chunk in response:
+                if collector.feed(chunk):
+                    break
+        finally:
+            # closing early drops the connection, so the server stops generating
+            response.close()
+        return collector
+
+    def _request_chunk(
+        self,
+        prompt: PromptLike,
+        n: int,
+        stop: Optional[str],
+        stream: Optional[_StreamOptions] = None,
+        offset: int = 0,
+    ) -> list[str]:
+        attempts = _Attempts()
+        tokens = self._estimate_tokens(prompt, n)
+        kwargs = self._request_kwargs(prompt, n, stop)
+        started = time.time()
+        try:
+            while True:
+                try:
+                    with ExitStack() as stack:
+                        for limiter in self.cfg.limiters:
+                            stack.enter_context(limiter.slot(tokens))
+                        if stream is not None:
+                            response = self._consume(kwargs, n, offset, stream)
+                            response.estimate_usage(len(as_prompt(prompt).text()) // 4)
+                        else:
+                            response = self.client.chat.completions.create(**kwargs)
+                except (RateLimitError, *_RETRYABLE_ERRORS) as e:
+                    time.sleep(self._retry_delay(e, attempts, tokens))
+                    continue
+                break
+        except Exception:
+            self._record(started, attempts, n, ok=False)
+            raise
+        self._feedback(True, tokens, response)
+        self._record(started, attempts, n, response)
+        if stream is not None:
+            return response.texts
+        return [_message_text(c.message) for c in response.choices]
+
+    def _try_chunk(
+        self,
+        prompt: PromptLike,
+        n: int,
+        stop: Optional[str],
+        stream: Optional[_StreamOptions],
+        offset: int,
+    ) -> list[str] | BaseException:
+        try:
+            return self._request_chunk(prompt, n, stop, stream, offset)
+        except Exception as e:
+            return e
+
+    def chat(self, prompt: PromptLike, n: int, stop: Optional[str], start: int = 0) -> list[str]:
+        """
+        `n` samples for `prompt`. `start` numbers them from there, so drawing
+        samples incrementally hits the same cache entries as one large request.
+        """
+        if self.cfg.cache is None:
+            return self._fetch(prompt, n, stop, start=start)
+        keys, cached = self._cache_lookup(prompt, n, stop, start)
+        missing = sum(1 for v in cached if v is None)
+        fetched = self._fetch(prompt, missing, stop, start=start) if missing else []
+        return self._cache_fill(keys, cached, fetched)
+
+    def chat_stream(
+        self,
+        prompt: PromptLike,
+        n: int,
+        stop: Optional[str],
+        early_stop: Optional[Callable[[str], bool]] = None,
+        on_delta: Optional[Callable[[int, str], None]] = None,
+        start: int = 0,
+    ) -> list[str]:
+        """
+        Like `chat`, but streams the samples. `early_stop(text)` ends a sample
+        client-side; the request is closed once every sample has ended.
+        Early-stopped samples are truncated, so they bypass the cache.
+        """
+        opts = _StreamOptions(early_stop=early_stop, on_delta=on_delta)
+        if self.cfg.cache is None or early_stop is not None:
+            return self._fetch(prompt, n, stop, opts, start)
+        keys, cached = self._cache_lookup(prompt, n, stop, start)
+        missing = sum(1 for v in cached if v is None)
+        fetched = self._fetch(prompt, missing, stop, opts, start) if missing else []
+        return self._cache_fill(keys, cached, fetched)
+
+    def _fetch(
+        self,
+        prompt: PromptLike,
+        n: int,
+        stop: Optional[str],
+        stream: Optional[_StreamOptions] = None,
+        start: int = 0,
+    ) -> list[str]:
+        sizes = self._chunk_sizes(n)
+        offsets = [start + sum(sizes[:i]) for i in range(len(sizes))]
+        if len(sizes) <= 1 or self.cfg.max_parallel_chunks <= 1:
+            results = [self._try_chunk(prompt, cnt, stop, stream, off) for cnt, off in zip(sizes, offsets)]
+        else:
+            workers = min(len(sizes), self.cfg.max_parallel_chunks)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                # map keeps chunk order, so samples are merged in request order
+                run_chunk = bind_context(lambda cnt, off: self._try_chunk(prompt, cnt, stop, stream, off))
+                results = list(pool.map(run_chunk, sizes, offsets))
+        return self._merge_chunks(results)
+
+
+class AsyncOpenAICompatibleClient(_BaseClient):
+    def __init__(self, cfg: LLMConfig, registry: ClientRegistry | None = None):
+        self.cfg = cfg
+        self.registry = registry or default_registry
+        self.usage = cfg.usage if cfg.usage is not None else UsageStats()
+
+    @property
+    def client(self):
+        # resolved per call: the pooled SDK client is bound to the running loop
+        return self.registry.async_client(self.cfg)
+
+    async def _consume(self, kwargs: dict, n: int, offset: int, stream: _StreamOptions):
+        collector = _StreamCollector(n, offset, stream)
+        response = await self.client.chat.completions.create(
+            **kwargs, stream=True, stream_options={"include_usage": True}
+        )
+        try:
+            async for chunk in response:
+                if collector.feed(chunk):
+                    break
+        finally:
+            await response.close()
+        return collector
+
+    async def _request_chunk(
+        self,
+        prompt: PromptLike,
+        n: int,
+        stop: Optional[str],
+        stream: Optional[_StreamOptions] = None,
+        offset: int = 0,
+    ) -> list[str]:
+        attempts = _Attempts()
+        tokens = self._estimate_tokens(prompt, n)
+        kwargs = self._request_kwargs(prompt, n, stop)
+        started = time.time()
+        try:
+            while True:
+                try:
+                    async with AsyncExitStack() as stack:
+                        for limiter in self.cfg.limiters:
+                            await stack.enter_async_context(limiter.aslot(tokens))
+                        if stream is not None:
+                            response = await self._consume(kwargs, n, offset, stream)
+                            response.estimate_usage(len(as_prompt(prompt).text()) // 4)
+                        else:
+                            response = await self.client.chat.completions.create(**kwargs)
+                except (RateLimitError, *_RETRYABLE_ERRORS) as e:
+                    await asyncio.sleep(self._retry_delay(e, attempts, tokens))
+                    continue
+                break
+        except Exception:
+            self._record(started, attempts, n, ok=False)
+            raise
+        self._feedback(True, tokens, response)
+        self._record(started, attempts, n, response)
+        if stream is not None:
+            return response.texts
+        return [_message_text(c.message) for c in response.choices]
+
+    async def chat(self, prompt: PromptLike, n: int, stop: Optional[str], start: int = 0) -> list[str]:
+        if self.cfg.cache is None:
+            return await self._fetch(prompt, n, stop, start=start)
+        keys, cached = self._cache_lookup(prompt, n, stop, start)
+        missing = sum(1 for v in cached if v is None)
+        fetched = await self._fetch(prompt, missing, stop, start=start) if missing else []
+        return self._cache_fill(keys, cached, fetched)
+
+    async def chat_stream(
+        self,
+        prompt: PromptLike,
+        n: int,
+        stop: Optional[str],
+        early_stop: Optional[Callable[[str], bool]] = None,
+        on_delta: Optional[Callable[[int, str], None]] = None,
+        start: int = 0,
+    ) -> list[str]:
+        opts = _StreamOptions(early_stop=early_stop, on_delta=on_delta)
+        if self.cfg.cache is None or early_stop is not None:
+            return await self._fetch(prompt, n, stop, opts, start)
+        keys, cached = self._cache_lookup(prompt, n, stop, start)
+        missing = sum(1 for v in cached if v is None)
+        fetched = await self._fetch(prompt, missing, stop, opts, start) if missing else []
+        return self._cache_fill(keys, cached, fetched)
+
+    async def _fetch(
+        self,
+        prompt: PromptLike,
+        n: int,
+        stop: Optional[str],
+        stream: Optional[_StreamOptions] = None,
+        start: int = 0,
+    ) -> list[str]:
+        sem = asyncio.Semaphore(max(1, self.cfg.max_parallel_chunks))
+        sizes = self._chunk_sizes(n)
+        offsets = [start + sum(sizes[:i]) for i in range(len(sizes))]
+
+        async def run_chunk(cnt: int, off: int) -> list[str]:
+            async with sem:
+                return await self._request_chunk(prompt, cnt, stop, stream, off)
+
+        results = await asyncio.gather(*(run_chunk(c, o) for c, o in zip(sizes, offsets)), return_exceptions=True)
+        for res in results:
+            if isinstance(res, asyncio.CancelledError):
+                raise res
+        return self._merge_chunks(list(results))
+
+
+def _run_store(store: CandidateStore | RunStores | None) -> Optional[CandidateStore]:
+    return store.current() if isinstance(store, RunStores) else store
+
+
+def _expand(step: int, cand: Candidate, samples: list[str], store: Optional[CandidateStore] = None) -> list[Candidate]:
+    if store is not None:
+        parent = store.root(cand)
+        return [store.child(parent, sample, meta={"step": step}) for sample in samples]
+    # parent_len lets dedup compare only the text added at this step
+    meta = {"step": step, "parent_len": len(cand.text)}
+    return [Candidate(state=cand.state, text=cand.text + sample, meta=dict(meta)) for sample in samples]
+
 
 class StepRouter:
-    def __init__(self, clients: list[OpenAICompatibleClient]):
+    def __init__(self, clients: list[OpenAICompatibleClient] | list[AsyncOpenAICompatibleClient]):
         if not clients:
             raise ValueError("clients must not be empty")
         self.clients = clients
 
-    def __call__(self, step: int) -> OpenAICompatibleClient:
+    def __call__(self, step: int):
         if step < len(self.clients):
             return self.clients[step]
         return self.clients[-1]
 
 
-class LLMGenerator(Generator):
+class _StreamingMixin:
+    stream: bool
+    early_stop: Optional[EarlyStop]
+    on_partial: Optional[PartialCallback]
+
+    def _streaming(self) -> bool:
+        return self.stream or self.early_stop is not None or self.on_partial is not None
+
+    def _stream_args(self, step: int, cand: Candidate) -> dict:
+        rule = self.early_stop
+        callback = self.on_partial
+
+        def early_stop(text: str) -> bool:
+            return rule(step, cand, text)
+
+        def on_delta(index: int, text: str) -> None:
+            meta = {"step": step, "sample": index, "partial": True}
+            callback(step, Candidate(state=cand.state, text=cand.text + text, meta=meta))
+
+        return {
+            "early_stop": early_stop if rule is not None else None,
+            "on_delta": on_delta if callback is not None else None,
+        }
+
+
+class LLMGenerator(_StreamingMixin, Generator):
+    """
+    With `stream=True` (implied by `early_stop` / `on_partial`) samples are
+    streamed: `early_stop` can end a sample client-side, and `on_partial`
+    receives partial candidates as text arrives.
+
+    With a `store`, children are TreeCandidates holding only their new text
+    and a parent pointer instead of a full copy of the ancestor text; pass
+    RunStores to keep one store per run when the generator serves many runs.
+
+    With `adaptive`, each parent's samples are drawn a few at a time and
+    sampling stops once new samples stop being novel (see AdaptiveGeneration).
+    """
+
     def __init__(
         self,
         client_for_step: Callable[[int], OpenAICompatibleClient],
         prompt_builder: PromptBuilder,
         stop_provider: Optional[StopProvider] = None,
+        stream: bool = False,
+        early_stop: Optional[EarlyStop] = None,
+        on_partial: Optional[PartialCallback] = None,
+        store: CandidateStore | RunStores | None = None,
+        adaptive: Optional[AdaptiveGeneration] = None,
     ):
         self.client_for_step = client_for_step
         self.prompt_builder = prompt_builder
         self.stop_provider = stop_provider
+        self.stream = stream
+        self.early_stop = early_stop
+        self.on_partial = on_partial
+        self.store = store
+        self.adaptive = adaptive
+
+    def _draw(self, client, step: int, cand: Candidate, prompt: PromptLike, n: int, stop, start: int = 0) -> list[str]:
+        if self._streaming():
+            return client.chat_stream(prompt=prompt, n=n, stop=stop, start=start, **self._stream_args(step, cand))
+        return client.chat(prompt=prompt, n=n, stop=stop, start=start)
+
+    def _samples(self, client, step: int, cand: Candidate, prompt: PromptLike, n: int, stop) -> list[str]:
+        if self.adaptive is None:
+            return self._draw(client, step, cand, prompt, n, stop)
+        tracker = self.adaptive.tracker()
+        samples: list[str] = []
+        drawn = 0
+        for size in sample_rounds(n, self.adaptive.batch):
+            batch = self._draw(client, step, cand, prompt, size, stop, start=drawn)
+            drawn += size
+            samples.extend(batch)
+            tracker.add(batch)
+            if tracker.done:
+                break
+        return samples
 
     def generate(self, step: int, current: list[Candidate], n_generate: int) -> list[Candidate]:
-        out: list[Candidate] = []
         client = self.client_for_step(step)
-        for cand in current:
-            prompt = self.prompt_builder(step, cand)
-            stop = self.stop_provider(step, cand) if self.stop_provider else None
-            samples = client.chat(prompt=prompt, n=n_generate, stop=stop)
-            for sample in samples:
-                out.append(Candidate(state=cand.state, text=cand.text + sample, meta={"step": step}))
-        return out
+        prompts = [self.prompt_builder(step, cand) for cand in current]
+        store = _run_store(self.store)
+        children: list[list[Candidate]] = [[] for _ in current]
+        # requests sharing a prefix go back to back so the provider's prefix cache stays warm;
+        # output keeps the parent order
+        for group in group_by_prefix(prompts):
+            for i in group:
+                cand = current[i]
+                stop = self.stop_provider(step, cand) if self.stop_provider else None
+                samples = self._samples(client, step, cand, prompts[i], n_generate, stop)
+                children[i] = _expand(step, cand, samples, store)
+        return [child for group in children for child in group]
 
 
 class LLMVoteEvaluator(Evaluator):
+    """
+    One vote prompt over all candidates, or with `chunking` concurrent
+    sub-votes over chunks of them (see VoteChunking).
+
+    With `adaptive`, the single vote prompt is sampled a few votes at a time
+    until the selection is decided (see AdaptiveVoting).
+
+    `parser` reads each vote sample (default: vote_parsing.RegexVoteParser);
+    a ranking or JSON parser gets more signal out of every judge call.
+    """
+
     def __init__(
         self,
         client_for_step: Callable[[int], OpenAICompatibleClient],
         vote_prompt_builder: VotePromptBuilder,
+        chunking: Optional[VoteChunking] = None,
+        adaptive: Optional[AdaptiveVoting] = None,
+        parser: Optional[VoteParser] = None,
     ):
         self.client_for_step = client_for_step
         self.vote_prompt_builder = vote_prompt_builder
+        self.chunking = chunking
+        self.adaptive = adaptive
+        self.parser = parser
 
     def evaluate(self, step: int, candidates: list[Candidate], n_evaluate: int) -> list[float]:
         if not candidates:
             return []
         client = self.client_for_step(step)
-        prompt = self.vote_prompt_builder(step, candidates)
-        outputs = client.chat(prompt=prompt, n=n_evaluate, stop=None)
-        votes = [0 for _ in candidates]
-        for out in outputs:
-            # caller decides how to parse; default: use last integer in text
-            import re
-
-            match = re.findall(r"(\d+)", out)
-            if not match:
-                continue
-            pick = int(match[-1]) - 1
-            if 0 <= pick < len(votes):
-                votes[pick] += 1
-        return [float(v) for v in votes]
+        if self.chunking is None:
+            prompt = self.vote_prompt_builder(step, candidates)
+            if self.adaptive is not None:
+                return self._adaptive_votes(client, prompt, len(candidates), n_evaluate)
+            outputs = client.chat(prompt=prompt, n=n_evaluate, stop=None)
+            return count_votes(outputs, len(candidates), self.parser)
+
+        tournament = Tournament(self.chunking, step, candidates, self.vote_prompt_builder, n_evaluate)
+        while chunks := tournament.next_round():
+
+            def vote(item: tuple[list[int], PromptLike]) -> list[float]:
+                return count_votes(client.chat(prompt=item[1], n=n_evaluate, stop=None), len(item[0]), self.parser)
+
+            with ThreadPoolExecutor(max_workers=min(self.chunking.max_concurrency, len(chunks))) as pool:
+                votes = list(pool.map(bind_context(vote), chunks))
+            tournament.record([c for c, _ in chunks], votes)
+        return tournament.scores()
+
+    def _adaptive_votes(self, client, prompt: PromptLike, n_candidates: int, n_evaluate: int) -> list[float]:
+        votes = [0.0] * n_candidates
+        drawn = 0
+        for size in sample_rounds(n_evaluate, self.adaptive.batch):
+            outputs = client.chat(prompt=prompt, n=size, stop=None, start=drawn)
+            drawn += size
+            votes = [a + b for a, b in zip(votes, count_votes(outputs, n_candidates, self.parser))]
+            if self.adaptive.decided(votes, n_evaluate - drawn):
+                break
+        return AdaptiveVoting.rescale(votes, drawn, n_evaluate)
+
+
+class AsyncLLMGenerator(_StreamingMixin, AsyncGenerator):
+    """
+    Expands all parents of a step concurrently, at most `max_concurrency`
+    requests in flight at once. Streaming and `store` options as in LLMGenerator.
+
+    With `warm_prefix_cache`, parents whose prompts share a `Prompt` prefix
+    send one request first and the rest of the group only after it returned,
+    so siblings hit the provider's prefix cache instead of all missing it.
+    """
+
+    def __init__(
+        self,
+        client_for_step: Callable[[int], AsyncOpenAICompatibleClient],
+        prompt_builder: PromptBuilder,
+        stop_provider: Optional[StopProvider] = None,
+        max_concurrency: int = 8,
+        stream: bool = False,
+        early_stop: Optional[EarlyStop] = None,
+        on_partial: Optional[PartialCallback] = None,
+        warm_prefix_cache: bool = False,
+        store: CandidateStore | RunStores | None = None,
+        adaptive: Optional[AdaptiveGeneration] = None,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+        self.client_for_step = client_for_step
+        self.prompt_builder = prompt_builder
+        self.stop_provider = stop_provider
+        self.max_concurrency = max_concurrency
+        self.stream = stream
+        self.early_stop = early_stop
+        self.on_partial = on_partial
+        self.warm_prefix_cache = warm_prefix_cache
+        self.store = store
+        self.adaptive = adaptive
+
+    async def _draw(self, client, step: int, cand: Candidate, prompt: PromptLike, n: int, stop, start: int = 0) -> list[str]:
+        if self._streaming():
+            return await client.chat_stream(prompt=prompt, n=n, stop=stop, start=start, **self._stream_args(step, cand))
+        return await client.chat(prompt=prompt, n=n, stop=stop, start=start)
+
+    async def _samples(self, client, step: int, cand: Candidate, prompt: PromptLike, n: int, stop) -> list[str]:
+        if self.adaptive is None:
+            return await self._draw(client, step, cand, prompt, n, stop)
+        tracker = self.adaptive.tracker()
+        samples: list[str] = []
+        drawn = 0
+        for size in sample_rounds(n, self.adaptive.batch):
+            batch = await self._draw(client, step, cand, prompt, size, stop, start=drawn)
+            drawn += size
+            samples.extend(batch)
+            tracker.add(batch)
+            if tracker.done:
+                break
+        return samples
+
+    async def generate(self, step: int, current: list[Candidate], n_generate: int) -> list[Candidate]:
+        client = self.client_for_step(step)
+        # created per call: asyncio primitives are bound to the running loop
+        sem = asyncio.Semaphore(self.max_concurrency)
+
+        prompts = [self.prompt_builder(step, cand) for cand in current]
+        store = _run_store(self.store)
+        children: list[list[Candidate]] = [[] for _ in current]
+
+        async def expand(i: int) -> None:
+            cand = current[i]
+            stop = self.stop_provider(step, cand) if self.stop_provider else None
+            async with sem:
+                samples = await self._samples(client, step, cand, prompts[i], n_generate, stop)
+            children[i] = _expand(step, cand, samples, store)
+
+        async def expand_group(group: list[int]) -> None:
+            if self.warm_prefix_cache and len(group) > 1:
+                await expand(group[0])
+                group = group[1:]
+            await asyncio.gather(*(expand(i) for i in group))
+
+        await asyncio.gather(*(expand_group(group) for group in group_by_prefix(prompts)))
+        return [child for group in children for child in group]
+
+
+class AsyncLLMVoteEvaluator(AsyncEvaluator):
+    def __init__(
+        self,
+        client_for_step: Callable[[int], AsyncOpenAICompatibleClient],
+        vote_prompt_builder: VotePromptBuilder,
+        chunking: Optional[VoteChunking] = None,
+        adaptive: Optional[AdaptiveVoting] = None,
+        parser: Optional[VoteParser] = None,
+    ):
+        self.client_for_step = client_for_step
+        self.vote_prompt_builder = vote_prompt_builder
+        self.chunking = chunking
+        self.adaptive = adaptive
+        self.parser = parser
+
+    async def _adaptive_votes(self, client, prompt: PromptLike, n_candidates: int, n_evaluate: int) -> list[float]:
+        votes = [0.0] * n_candidates
+        drawn = 0
+        for size in sample_rounds(n_evaluate, self.adaptive.batch):
+            outputs = await client.chat(prompt=prompt, n=size, stop=None, start=drawn)
+            drawn += size
+            votes = [a + b for a, b in zip(votes, count_votes(outputs, n_candidates, self.parser))]
+            if self.adaptive.decided(votes, n_evaluate - drawn):
+                break
+        return AdaptiveVoting.rescale(votes, drawn, n_evaluate)
+
+    async def evaluate(self, step: int, candidates: list[Candidate], n_evaluate: int) -> list[float]:
+        if not candidates:
+            return []
+        client = self.client_for_step(step)
+        if self.chunking is None:
+            prompt = self.vote_prompt_builder(step, candidates)
+            if self.adaptive is not None:
+                return await self._adaptive_votes(client, prompt, len(candidates), n_evaluate)
+            outputs = await client.chat(prompt=prompt, n=n_evaluate, stop=None)
+            return count_votes(outputs, len(candidates), self.parser)
+
+        sem = asyncio.Semaphore(self.chunking.max_concurrency)
+
+        async def vote(item: tuple[list[int], PromptLike]) -> list[float]:
+            async with sem:
+                outputs = await client.chat(prompt=item[1], n=n_evaluate, stop=None)
+            return count_votes(outputs, len(item[0]), self.parser)
+
+        tournament = Tournament(self.chunking, step, candidates, self.vote_prompt_builder, n_evaluate)
+        while chunks := tournament.next_round():
+            votes = await asyncio.gather(*(vote(item) for item in chunks))
+            tournament.record([c for c, _ in chunks], list(votes))
+        return tournament.scores()
 
 
@@ -1,20 +1,50 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, replace
-from typing import Callable, Optional, Protocol
+from dataclasses import dataclass, field, replace
+from typing import AsyncIterator, Callable, Iterable, Iterator, Optional, Protocol
 
-from .core.interfaces import Evaluator, Generator, Selector, Stopper
+from .adaptive import AdaptiveGeneration, AdaptiveVoting
+from .cache import CompletionCache, MemoryCache
+from .clients import ClientRegistry
+from .core.async_runner import AsyncToTRunner
+from .core.batch import BatchCheckpoint
+from .core.budget import RunBudget
+from .core.checkpoint import RunCheckpoint
+from .core.hooks import Hook
+from .core.interfaces import AsyncEvaluator, AsyncGenerator, Deduplicator, Evaluator, Generator, Selector, Stopper
+from .core.logs import StepLogSink
 from .core.runner import ToTConfig, ToTRunner
+from .core.search import SearchStrategy
+from .core.tracing import SpanExporter
+from .core.tree import RunStores
 from .core.types import Candidate, RunResult
-from .llm import LLMConfig, LLMGenerator, LLMVoteEvaluator, OpenAICompatibleClient, StepRouter
+from .limits import EndpointLimits, endpoint_limiter
+from .llm import (
+    AsyncLLMGenerator,
+    EarlyStop,
+    PartialCallback,
+    AsyncLLMVoteEvaluator,
+    AsyncOpenAICompatibleClient,
+    LLMConfig,
+    LLMGenerator,
+    LLMVoteEvaluator,
+    OpenAICompatibleClient,
+    StepRouter,
+    UsageStats,
+)
+from .prompts import PromptLike
+from .routing import AsyncRoutedClient, ProviderHealth, RoutedClient, RoutingPolicy
+from .value import AsyncLLMValueEvaluator, LLMValueEvaluator, ValuePromptBuilder
+from .voting import VoteChunking
+from .vote_parsing import VoteParser
 
 
 class PromptBuilder(Protocol):
-    def __call__(self, step: int, candidate: Candidate) -> str: ...
+    def __call__(self, step: int, candidate: Candidate) -> PromptLike: ...
 
 
 class VotePromptBuilder(Protocol):
-    def __call__(self, step: int, candidates: list[Candidate]) -> str: ...
+    def __call__(self, step: int, candidates: list[Candidate]) -> PromptLike: ...
 
 
 class StopProvider(Protocol):
@@ -25,6 +55,10 @@ class StopProvider(Protocol):
 class LLMToTStepConfig:
     gen: LLMConfig
     judge: LLMConfig
+    # more endpoints/models for the same role; with any, requests are routed
+    # across all of them by LLMToTConfig.routing (see tot_unit.routing)
+    gen_alternates: tuple[LLMConfig, ...] = ()
+    judge_alternates: tuple[LLMConfig, ...] = ()
 
 
 @dataclass(frozen=True)
@@ -37,10 +71,59 @@ class LLMToTConfig:
     prompt_builder: PromptBuilder
     vote_prompt_builder: VotePromptBuilder
     stop_provider: Optional[StopProvider] = None
+    # max in-flight generation requests per step on the async path
+    max_concurrency: int = 8
+    # completion cache applied to every step LLM that doesn't set its own
+    cache: CompletionCache | None = None
+    # streamed generation; early_stop / on_partial imply stream
+    stream: bool = False
+    early_stop: Optional[EarlyStop] = None
+    on_partial: Optional[PartialCallback] = None
+    # async path: send one request per shared prompt prefix before its siblings
+    warm_prefix_cache: bool = False
+    # store children as parent pointer + delta text (one CandidateStore per run)
+    compact_tree: bool = False
+    # how much of each StepLog RunResult keeps, and where full logs are streamed
+    log_retention: str = "full"
+    log_sink: Optional[StepLogSink] = None
+    # search strategy of both runners (default BFS beam); token budgets without
+    # their own counter are charged with the tokens of the run's own LLM calls
+    strategy: Optional[SearchStrategy] = None
+    # collapse duplicate samples before they reach the vote prompt
+    dedup: Optional[Deduplicator] = None
+    # split large vote prompts into concurrent sub-votes / knockout rounds
+    vote_chunking: Optional[VoteChunking] = None
+    # reads vote samples (default: vote_parsing.RegexVoteParser); pair a
+    # JSONVoteParser with structured_vote_options in the judge's request_options
+    vote_parser: Optional[VoteParser] = None
+    # score candidates one by one instead of voting; scores are memoized in
+    # value_cache (default: in memory, per LLMToT instance)
+    value_prompt_builder: Optional[ValuePromptBuilder] = None
+    value_batch_size: int = 1
+    value_cache: CompletionCache | None = None
+    # draw votes / children incrementally and stop once the outcome is settled;
+    # adaptive_voting.top_k is set to n_select
+    adaptive_voting: Optional[AdaptiveVoting] = None
+    adaptive_generation: Optional[AdaptiveGeneration] = None
+    # receives the spans of every run (RunResult.telemetry has them regardless)
+    span_exporter: Optional[SpanExporter] = None
+    # called around every run phase, e.g. a core.hooks.Profiler
+    hooks: tuple[Hook, ...] = ()
+    # save every run after each step (RunCheckpoint or its directory), see LLMToT.resume
+    run_checkpoint: RunCheckpoint | str | None = None
+    # latency-aware routing, hedging and failover over the step alternates
+    routing: Optional[RoutingPolicy] = None
+    # per-run caps on tokens, calls, cost and wall time; steps shrink as spend
+    # outruns them and the run returns its best so far at a hard cap
+    budget: Optional[RunBudget] = None
 
     def __post_init__(self) -> None:
         if self.steps != len(self.step_llms):
             raise ValueError("steps must match len(step_llms)")
+        if self.max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+        if self.value_batch_size < 1:
+            raise ValueError("value_batch_size must be >= 1")
 
 
 @dataclass
@@ -50,31 +133,126 @@ class LLMToT:
     """
 
     cfg: LLMToTConfig
-    generator: Generator | None = None
-    evaluator: Evaluator | None = None
+    generator: Generator | AsyncGenerator | None = None
+    evaluator: Evaluator | AsyncEvaluator | None = None
     selector: Selector | None = None
     stopper: Stopper | None = None
+    # token usage of every client this instance builds, incl. cached prompt tokens
+    usage: UsageStats = field(default_factory=UsageStats)
+    # candidate value scores, shared by every run of this instance
+    value_memo: CompletionCache = field(default_factory=MemoryCache)
+    # where clients get their SDK clients; e.g. tot_unit.mock.MockRegistry for offline runs
+    registry: ClientRegistry | None = None
+    # live latency / error stats of the routed endpoints, shared by every run
+    health: ProviderHealth = field(default_factory=ProviderHealth)
 
-    def _build_generator(self) -> Generator:
-        gen_clients = [OpenAICompatibleClient(s.gen) for s in self.cfg.step_llms]
-        gen_router = StepRouter(gen_clients)
+    def _llm_cfg(self, cfg: LLMConfig, limits: EndpointLimits | None = None) -> LLMConfig:
+        if self.cfg.cache is not None and cfg.cache is None:
+            cfg = replace(cfg, cache=self.cfg.cache)
+        if cfg.usage is None:
+            cfg = replace(cfg, usage=self.usage)
+        quota = {"rpm": cfg.rpm, "tpm": cfg.tpm, "max_concurrency": cfg.max_concurrency}
+        if limits is not None:
+            # batch limits tighten the endpoint's own quota on the same shared limiter
+            shared = limits.for_endpoint(cfg.api_base, cfg.model, **quota)
+        else:
+            shared = (endpoint_limiter(cfg.api_base, cfg.model, **quota),)
+        return replace(cfg, limiters=cfg.limiters + shared)
+
+    def _step_clients(self, role: str, limits: EndpointLimits | None = None, asynchronous: bool = False) -> list:
+        """
+        One client per step for `role` ("gen" / "judge"); steps with
+        alternates get a routed client over all their endpoints.
+        """
+        client_cls = AsyncOpenAICompatibleClient if asynchronous else OpenAICompatibleClient
+        routed_cls = AsyncRoutedClient if asynchronous else RoutedClient
+        clients = []
+        for s in self.cfg.step_llms:
+            cfgs = (getattr(s, role), *getattr(s, f"{role}_alternates"))
+            endpoints = [client_cls(self._llm_cfg(c, limits), self.registry) for c in cfgs]
+            if len(endpoints) == 1:
+                clients.append(endpoints[0])
+            else:
+                clients.append(routed_cls(endpoints, self.cfg.routing, self.health))
+        return clients
+
+    def _build_generator(self, limits: EndpointLimits | None = None) -> Generator:
+        gen_router = StepRouter(self._step_clients("gen", limits))
         return LLMGenerator(
             client_for_step=gen_router,
             prompt_builder=self.cfg.prompt_builder,
             stop_provider=self.cfg.stop_provider,
+            stream=self.cfg.stream,
+            early_stop=self.cfg.early_stop,
+            on_partial=self.cfg.on_partial,
+            store=RunStores() if self.cfg.compact_tree else None,
+            adaptive=self.cfg.adaptive_generation,
         )
 
-    def _build_evaluator(self) -> Evaluator:
-        judge_clients = [OpenAICompatibleClient(s.judge) for s in self.cfg.step_llms]
-        judge_router = StepRouter(judge_clients)
+    def _adaptive_voting(self) -> AdaptiveVoting | None:
+        if self.cfg.adaptive_voting is None:
+            return None
+        return replace(self.cfg.adaptive_voting, top_k=self.cfg.n_select)
+
+    def _value_kwargs(self) -> dict:
+        return {
+            "value_prompt_builder": self.cfg.value_prompt_builder,
+            "batch_size": self.cfg.value_batch_size,
+            "max_concurrency": self.cfg.max_concurrency,
+            "memo": self.cfg.value_cache if self.cfg.value_cache is not None else self.value_memo,
+        }
+
+    def _build_evaluator(self, limits: EndpointLimits | None = None) -> Evaluator:
+        judge_router = StepRouter(self._step_clients("judge", limits))
+        if self.cfg.value_prompt_builder is not None:
+            return LLMValueEvaluator(judge_router, **self._value_kwargs())
         return LLMVoteEvaluator(
             client_for_step=judge_router,
             vote_prompt_builder=self.cfg.vote_prompt_builder,
+            chunking=self.cfg.vote_chunking,
+            adaptive=self._adaptive_voting(),
+            parser=self.cfg.vote_parser,
+        )
+
+    def _build_async_generator(self, limits: EndpointLimits | None = None) -> AsyncGenerator:
+        gen_router = StepRouter(self._step_clients("gen", limits, asynchronous=True))
+        return AsyncLLMGenerator(
+            client_for_step=gen_router,
+            prompt_builder=self.cfg.prompt_builder,
+            stop_provider=self.cfg.stop_provider,
+            max_concurrency=self.cfg.max_concurrency,
+            stream=self.cfg.stream,
+            early_stop=self.cfg.early_stop,
+            on_partial=self.cfg.on_partial,
+            warm_prefix_cache=self.cfg.warm_prefix_cache,
+            store=RunStores() if self.cfg.compact_tree else None,
+            adaptive=self.cfg.adaptive_generation,
+        )
+
+    def _build_async_evaluator(self, limits: EndpointLimits | None = None) -> AsyncEvaluator:
+        judge_router = StepRouter(self._step_clients("judge", limits, asynchronous=True))
+        if self.cfg.value_prompt_builder is not None:
+            return AsyncLLMValueEvaluator(judge_router, **self._value_kwargs())
+        return AsyncLLMVoteEvaluator(
+            client_for_step=judge_router,
+            vote_prompt_builder=self.cfg.vote_prompt_builder,
+            chunking=self.cfg.vote_chunking,
+            adaptive=self._adaptive_voting(),
+            parser=self.cfg.vote_parser,
+        )
+
+    def _tot_config(self) -> ToTConfig:
+        return ToTConfig(
+            steps=self.cfg.steps,
+            n_generate=self.cfg.n_generate,
+            n_select=self.cfg.n_select,
+            n_evaluate=self.cfg.n_evaluate,
+            log_retention=self.cfg.log_retention,
         )
 
-    def build_runner(self) -> ToTRunner:
-        generator = self.generator or self._build_generator()
-        evaluator = self.evaluator or self._build_evaluator()
+    def build_runner(self, limits: EndpointLimits | None = None) -> ToTRunner:
+        generator = self.generator or self._build_generator(limits)
+        evaluator = self.evaluator or self._build_evaluator(limits)
         if self.selector is None or self.stopper is None:
             raise ValueError("selector and stopper must be provided")
 
@@ -83,17 +261,83 @@ class LLMToT:
             evaluator=evaluator,
             selector=self.selector,
             stopper=self.stopper,
-            cfg=ToTConfig(
-                steps=self.cfg.steps,
-                n_generate=self.cfg.n_generate,
-                n_select=self.cfg.n_select,
-                n_evaluate=self.cfg.n_evaluate,
-            ),
+            cfg=self._tot_config(),
+            sink=self.cfg.log_sink,
+            strategy=self.cfg.strategy,
+            dedup=self.cfg.dedup,
+            exporter=self.cfg.span_exporter,
+            hooks=self.cfg.hooks,
+            checkpoint=self.cfg.run_checkpoint,
+            budget=self.cfg.budget,
         )
 
-    def run(self, initial_candidates: list[Candidate]) -> RunResult:
+    def build_async_runner(self, limits: EndpointLimits | None = None) -> AsyncToTRunner:
+        generator = self.generator or self._build_async_generator(limits)
+        evaluator = self.evaluator or self._build_async_evaluator(limits)
+        if self.selector is None or self.stopper is None:
+            raise ValueError("selector and stopper must be provided")
+
+        return AsyncToTRunner(
+            generator=generator,
+            evaluator=evaluator,
+            selector=self.selector,
+            stopper=self.stopper,
+            cfg=self._tot_config(),
+            sink=self.cfg.log_sink,
+            dedup=self.cfg.dedup,
+            exporter=self.cfg.span_exporter,
+            hooks=self.cfg.hooks,
+            checkpoint=self.cfg.run_checkpoint,
+            budget=self.cfg.budget,
+            strategy=self.cfg.strategy,
+        )
+
+    def run(self, initial_candidates: list[Candidate], run_id: str | None = None) -> RunResult:
         runner = self.build_runner()
-        return runner.run(initial_candidates=initial_candidates)
+        return runner.run(initial_candidates=initial_candidates, run_id=run_id)
+
+    async def arun(self, initial_candidates: list[Candidate], run_id: str | None = None) -> RunResult:
+        runner = self.build_async_runner()
+        return await runner.run(initial_candidates=initial_candidates, run_id=run_id)
+
+    def resume(self, run_id: str | None = None) -> RunResult:
+        """
+        Continue a run saved to `cfg.run_checkpoint` (the latest unfinished
+        one by default); steps already paid for are not re-run.
+        """
+        return self.build_runner().resume(run_id)
+
+    async def aresume(self, run_id: str | None = None) -> RunResult:
+        return await self.build_async_runner().resume(run_id)
+
+    def run_many(
+        self,
+        problems: Iterable[list[Candidate]],
+        max_workers: int = 8,
+        max_in_flight: int | None = None,
+        rpm: float | None = None,
+        checkpoint: BatchCheckpoint | str | None = None,
+    ) -> Iterator[tuple[int, RunResult]]:
+        """
+        Run one tree per problem, `max_workers` trees at a time. All trees share
+        a global budget of `max_in_flight` requests and an `rpm` limit per
+        (api_base, model). Yields (problem index, result) as trees finish;
+        with `checkpoint`, finished problems survive a crash and are skipped.
+        """
+        runner = self.build_runner(EndpointLimits(max_in_flight=max_in_flight, rpm=rpm))
+        return runner.run_batch(problems, max_workers=max_workers, checkpoint=checkpoint)
+
+    async def arun_many(
+        self,
+        problems: Iterable[list[Candidate]],
+        max_concurrent: int = 32,
+        max_in_flight: int | None = None,
+        rpm: float | None = None,
+        checkpoint: BatchCheckpoint | str | None = None,
+    ) -> AsyncIterator[tuple[int, RunResult]]:
+        runner = self.build_async_runner(EndpointLimits(max_in_flight=max_in_flight, rpm=rpm))
+        async for item in runner.run_batch(problems, max_concurrent=max_concurrent, checkpoint=checkpoint):
+            yield item
 
     def override(
         self,
@@ -109,6 +353,10 @@ class LLMToT:
             evaluator=evaluator if evaluator is not None else self.evaluator,
             selector=selector if selector is not None else self.selector,
             stopper=stopper if stopper is not None else self.stopper,
+            usage=self.usage,
+            value_memo=self.value_memo,
+            registry=self.registry,
+            health=self.health,
         )
 
 
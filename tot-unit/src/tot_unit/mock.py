@@ -0,0 +1,417 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import Any, Callable, Iterator, Optional
+
+import httpx
+from openai import BadRequestError, InternalServerError, RateLimitError
+
+from .clients import ClientRegistry
+
+
+LATENCY_DISTRIBUTIONS = ("constant", "uniform", "exponential", "lognormal")
+
+_WORDS = (
+    "plan", "step", "idea", "check", "then", "so", "result", "value", "next", "try",
+    "left", "right", "sum", "keep", "drop", "add", "path", "node", "goal", "good",
+)
+_CHOICE = re.compile(r"^\s*choice\s+(\d+)\s*:", re.IGNORECASE | re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class MockLLMConfig:
+    """
+    Behaviour of the offline stand-in for an OpenAI-compatible endpoint.
+
+    Latency is drawn per request from `latency_dist` around `latency` seconds
+    ("uniform": +/- `latency_spread` of the mean, "lognormal": sigma
+    `latency_spread`), plus `token_latency` per completion token. Requests
+    with `n > max_n` are rejected with 400, a `rate_limit_rate` share of
+    requests gets a 429 (with `retry_after` seconds as header) and an
+    `error_rate` share a 500 (1.0: the endpoint is down). Text is a
+    deterministic function of seed, model, prompt and draw number: the k-th
+    sample drawn for a (model, prompt) over all requests, so a request split
+    into chunks, or repeated, gets fresh samples like a real sampling model.
+    Prompts listing "Choice k:" lines get a final "The best choice is k"
+    line. `responder(prompt, index)` (index = draw number) replaces the
+    generated text entirely.
+    """
+
+    latency: float = 0.0
+    latency_dist: str = "constant"
+    latency_spread: float = 0.5
+    token_latency: float = 0.0
+    max_n: int | None = None
+    rate_limit_rate: float = 0.0
+    error_rate: float = 0.0
+    retry_after: float | None = 0.0
+    words: int = 12
+    seed: int = 0
+    responder: Optional[Callable[[str, int], str]] = field(default=None, compare=False)
+
+    def __post_init__(self) -> None:
+        if self.latency_dist not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"latency_dist must be one of {LATENCY_DISTRIBUTIONS}")
+        if self.latency < 0 or self.token_latency < 0:
+            raise ValueError("latencies must be >= 0")
+        if not 0.0 <= self.rate_limit_rate < 1.0:
+            raise ValueError("rate_limit_rate must be in [0, 1)")
+        if not 0.0 <= self.error_rate <= 1.0:
+            raise ValueError("error_rate must be in [0, 1]")
+        if self.max_n is not None and self.max_n < 1:
+            raise ValueError("max_n must be >= 1")
+
+
+@dataclass
+class MockStats:
+    requests: int = 0
+    completions: int = 0
+    rate_limited: int = 0
+    rejected: int = 0
+    server_errors: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+class MockError(Exception):
+    def __init__(self, status: int, message: str, headers: dict[str, str] | None = None) -> None:
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+def _prompt_text(messages: list[dict]) -> str:
+    parts = []
+    for m in messages:
+        content = m.get("content")
+        if isinstance(content, list):
+            # OpenAI content parts
+            content = "".join(p.get("text", "") for p in content if isinstance(p, dict))
+        parts.append(content or "")
+    return "\n".join(parts)
+
+
+class MockLLM:
+    """
+    Transport-free core shared by MockOpenAI, AsyncMockOpenAI and MockServer:
+    `reply(body)` turns a chat-completions request body into a response dict
+    and the seconds to wait before sending it, or raises MockError.
+    Thread-safe; `stats` counts what it served.
+    """
+
+    def __init__(self, cfg: MockLLMConfig | None = None) -> None:
+        self.cfg = cfg or MockLLMConfig()
+        self.stats = MockStats()
+        self._rng = random.Random(self.cfg.seed)
+        self._lock = threading.Lock()
+        self._ids = 0
+        # samples drawn so far per (model, prompt)
+        self._draws: dict[tuple[str, str], int] = {}
+
+    def _latency(self) -> float:
+        cfg = self.cfg
+        if cfg.latency <= 0:
+            return 0.0
+        if cfg.latency_dist == "constant":
+            return cfg.latency
+        if cfg.latency_dist == "uniform":
+            return max(0.0, self._rng.uniform(cfg.latency * (1 - cfg.latency_spread), cfg.latency * (1 + cfg.latency_spread)))
+        if cfg.latency_dist == "exponential":
+            return self._rng.expovariate(1.0 / cfg.latency)
+        # lognormal scaled to the configured mean
+        sigma = cfg.latency_spread
+        return self._rng.lognormvariate(0.0, sigma) * cfg.latency / math.exp(sigma * sigma / 2)
+
+    def text(self, model: str, prompt: str, index: int) -> str:
+        if self.cfg.responder is not None:
+            return self.cfg.responder(prompt, index)
+        digest = hashlib.sha256(f"{self.cfg.seed}|{model}|{index}|{prompt}".encode("utf-8")).digest()
+        words = [_WORDS[b % len(_WORDS)] for b in digest[: self.cfg.words]]
+        text = " ".join(words)
+        choices = _CHOICE.findall(prompt)
+        if choices:
+            text += f"\nThe best choice is {choices[digest[-1] % len(choices)]}"
+        return text
+
+    def reply(self, body: dict[str, Any]) -> tuple[dict[str, Any], float]:
+        n = int(body.get("n") or 1)
+        model = str(body.get("model", "mock"))
+        with self._lock:
+            self.stats.requests += 1
+            if self.cfg.max_n is not None and n > self.cfg.max_n:
+                self.stats.rejected += 1
+                raise MockError(400, f"n must be <= {self.cfg.max_n}")
+            if self.cfg.rate_limit_rate and self._rng.random() < self.cfg.rate_limit_rate:
+                self.stats.rate_limited += 1
+                headers = {} if self.cfg.retry_after is None else {"retry-after": str(self.cfg.retry_after)}
+                raise MockError(429, "rate limited", headers)
+            if self.cfg.error_rate and self._rng.random() < self.cfg.error_rate:
+                self.stats.server_errors += 1
+                raise MockError(500, "internal server error")
+            latency = self._latency()
+            self._ids += 1
+            request_id = self._ids
+        prompt = _prompt_text(body.get("messages", []))
+        with self._lock:
+            first = self._draws.get((model, prompt), 0)
+            self._draws[(model, prompt)] = first + n
+        texts = [self.text(model, prompt, first + i) for i in range(n)]
+        stop = body.get("stop")
+        if stop:
+            for s in [stop] if isinstance(stop, str) else stop:
+                texts = [t.split(s, 1)[0] for t in texts]
+        prompt_tokens = max(1, len(prompt) // 4)
+        completion_tokens = sum(len(t.split()) for t in texts)
+        with self._lock:
+            self.stats.completions += n
+            self.stats.prompt_tokens += prompt_tokens
+            self.stats.completion_tokens += completion_tokens
+        latency += self.cfg.token_latency * completion_tokens / n
+        response = {
+            "id": f"mock-{request_id}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [
+                {"index": i, "message": {"role": "assistant", "content": t}, "finish_reason": "stop"}
+                for i, t in enumerate(texts)
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": 0},
+            },
+        }
+        return response, latency
+
+
+def stream_chunks(response: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    """
+    The response as chat.completion.chunk dicts: one word per delta, then a
+    finish chunk per choice and a final usage chunk.
+    """
+    base = {"id": response["id"], "object": "chat.completion.chunk", "created": response["created"], "model": response["model"]}
+    pieces = [re.findall(r"\S+\s*", c["message"]["content"]) for c in response["choices"]]
+    for k in range(max((len(p) for p in pieces), default=0)):
+        yield {
+            **base,
+            "choices": [
+                {"index": i, "delta": {"content": p[k]}, "finish_reason": None} for i, p in enumerate(pieces) if k < len(p)
+            ],
+        }
+    yield {**base, "choices": [{"index": i, "delta": {}, "finish_reason": "stop"} for i in range(len(pieces))]}
+    yield {**base, "choices": [], "usage": response["usage"]}
+
+
+def _ns(value: Any) -> Any:
+    if isinstance(value, dict):
+        return SimpleNamespace(**{k: _ns(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [_ns(v) for v in value]
+    return value
+
+
+def _api_error(err: MockError) -> Exception:
+    request = httpx.Request("POST", "http://mock/v1/chat/completions")
+    response = httpx.Response(err.status, headers=err.headers, request=request)
+    if err.status == 429:
+        return RateLimitError(err.message, response=response, body=None)
+    if err.status >= 500:
+        return InternalServerError(err.message, response=response, body=None)
+    return BadRequestError(err.message, response=response, body=None)
+
+
+class _Stream:
+    def __init__(self, chunks: list[Any]) -> None:
+        self._chunks = chunks
+        self.closed = False
+
+    def __iter__(self) -> Iterator[Any]:
+        for chunk in self._chunks:
+            if self.closed:
+                return
+            yield chunk
+
+    async def __aiter__(self):
+        for chunk in self._chunks:
+            if self.closed:
+                return
+            yield chunk
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class _AsyncStream(_Stream):
+    async def close(self) -> None:
+        self.closed = True
+
+
+class _Completions:
+    def __init__(self, llm: MockLLM) -> None:
+        self.llm = llm
+
+    def _reply(self, kwargs: dict[str, Any]) -> tuple[dict[str, Any], float]:
+        try:
+            return self.llm.reply(kwargs)
+        except MockError as e:
+            raise _api_error(e) from None
+
+    def create(self, stream: bool = False, **kwargs: Any) -> Any:
+        response, latency = self._reply(kwargs)
+        time.sleep(latency)
+        if stream:
+            return _Stream([_ns(c) for c in stream_chunks(response)])
+        return _ns(response)
+
+
+class _AsyncCompletions(_Completions):
+    async def create(self, stream: bool = False, **kwargs: Any) -> Any:
+        response, latency = self._reply(kwargs)
+        await asyncio.sleep(latency)
+        if stream:
+            return _AsyncStream([_ns(c) for c in stream_chunks(response)])
+        return _ns(response)
+
+
+class MockOpenAI:
+    """
+    In-process stand-in for `openai.OpenAI`: `chat.completions.create`
+    answers from a MockLLM and raises the SDK's own error types.
+    """
+
+    def __init__(self, llm: MockLLM) -> None:
+        self.llm = llm
+        self.chat = SimpleNamespace(completions=_Completions(llm))
+
+    def close(self) -> None:
+        pass
+
+
+class AsyncMockOpenAI:
+    def __init__(self, llm: MockLLM) -> None:
+        self.llm = llm
+        self.chat = SimpleNamespace(completions=_AsyncCompletions(llm))
+
+    async def close(self) -> None:
+        pass
+
+
+class MockRegistry(ClientRegistry):
+    """
+    ClientRegistry handing out in-process mock clients, for
+    `OpenAICompatibleClient(cfg, registry=MockRegistry(llm))` or
+    `LLMToT(..., registry=MockRegistry(llm))`. No sockets are opened.
+    """
+
+    def __init__(self, llm: MockLLM | None = None) -> None:
+        super().__init__()
+        self.llm = llm or MockLLM()
+
+    def sync_client(self, cfg: Any) -> Any:
+        return MockOpenAI(self.llm)
+
+    def async_client(self, cfg: Any) -> Any:
+        return AsyncMockOpenAI(self.llm)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_HTTPServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send_json(self, status: int, payload: dict[str, Any], headers: dict[str, str] | None = None) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+            return
+        try:
+            response, latency = self.server.llm.reply(body)
+        except MockError as e:
+            kind = {429: "rate_limit_error", 500: "server_error"}.get(e.status, "invalid_request_error")
+            error = {"error": {"message": e.message, "type": kind}}
+            self._send_json(e.status, error, e.headers)
+            return
+        time.sleep(latency)
+        if not body.get("stream"):
+            self._send_json(200, response)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        try:
+            for chunk in stream_chunks(response):
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # the client closed the stream early
+            pass
+        self.close_connection = True
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    llm: MockLLM
+
+
+class MockServer:
+    """
+    OpenAI-compatible HTTP server backed by a MockLLM, on a background thread.
+    Point `LLMConfig(api_base=server.url, ...)` at it to exercise the real
+    SDK and HTTP transport offline. Port 0 picks a free port.
+    """
+
+    def __init__(self, llm: MockLLM | None = None, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.llm = llm or MockLLM()
+        self._server = _HTTPServer((host, port), _Handler)
+        self._server.llm = self.llm
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "MockServer":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, name="tot-mock-llm", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> "MockServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from typing import Any
+
+from .core.tracing import CALL_SPAN, Span
+
+
+# OpenTelemetry GenAI semantic-convention names for the call attributes
+_GEN_AI = {
+    "model": "gen_ai.request.model",
+    "prompt_tokens": "gen_ai.usage.input_tokens",
+    "completion_tokens": "gen_ai.usage.output_tokens",
+    "cached_tokens": "gen_ai.usage.cached_input_tokens",
+    "n": "gen_ai.request.choice.count",
+    "api_base": "server.address",
+}
+
+
+def _attributes(span: Span) -> dict[str, Any]:
+    out: dict[str, Any] = {"tot.trace_id": span.trace_id, "tot.span_id": span.span_id}
+    for k, v in span.attributes.items():
+        if v is None or not isinstance(v, (str, bool, int, float)):
+            continue
+        name = _GEN_AI.get(k, f"tot.{k}") if span.name == CALL_SPAN else f"tot.{k}"
+        out[name] = v
+    return out
+
+
+class OpenTelemetryExporter:
+    """
+    Replays the spans of a finished run through an OpenTelemetry tracer,
+    keeping their timing and nesting. Needs the opentelemetry-api package and
+    a configured TracerProvider (e.g. from opentelemetry-sdk).
+    """
+
+    def __init__(self, tracer: Any = None, tracer_provider: Any = None) -> None:
+        try:
+            from opentelemetry import trace
+        except ImportError as e:  # pragma: no cover - optional dependency
+            raise ImportError('OpenTelemetryExporter needs opentelemetry-api: pip install "tot-unit[otel]"') from e
+        self._trace = trace
+        self.tracer = tracer or trace.get_tracer("tot_unit", tracer_provider=tracer_provider)
+
+    def export(self, spans: list[Span]) -> None:
+        # spans arrive parents first, so every parent is started before its children
+        started: dict[str, Any] = {}
+        for span in spans:
+            parent = started.get(span.parent_span_id) if span.parent_span_id else None
+            context = self._trace.set_span_in_context(parent) if parent is not None else None
+            otel_span = self.tracer.start_span(
+                span.name,
+                context=context,
+                start_time=int(span.start * 1e9),
+                attributes=_attributes(span),
+            )
+            if span.attributes.get("ok") is False:
+                otel_span.set_status(self._trace.Status(self._trace.StatusCode.ERROR))
+            started[span.span_id] = otel_span
+        # end children before parents
+        for span in reversed(spans):
+            started[span.span_id].end(end_time=int(span.end * 1e9))
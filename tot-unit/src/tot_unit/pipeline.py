@@ -1,6 +1,12 @@
 from __future__ import annotations
 
-from typing import Generic, Protocol, TypeVar
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, AsyncIterator, Generic, Iterable, Iterator, Protocol, Sequence, TypeVar
+
+from .core.hooks import Hook, phase
 
 
 InputT = TypeVar("InputT")
@@ -10,19 +16,303 @@ OutputT = TypeVar("OutputT")
 class Stage(Protocol[InputT, OutputT]):
     """
     Pipeline stage. Implementation decides how to interpret input/output.
+
+    In streaming mode `run` may also be a coroutine function, and a stage may
+    define `run_batch(inputs, trace=None) -> outputs` to take whole batches.
     """
 
     def run(self, input_data: InputT, trace: dict | None = None) -> OutputT: ...
 
 
+@dataclass(frozen=True)
+class StageOptions:
+    """
+    Streaming settings of one stage: `workers` concurrent calls, up to
+    `batch_size` queued inputs per call (waiting at most `batch_wait` seconds
+    to fill a batch), and an input queue of `queue_size` items; a full queue
+    blocks the stage before it. Sync stages run in worker threads.
+    """
+
+    workers: int = 1
+    batch_size: int = 1
+    batch_wait: float = 0.0
+    queue_size: int = 16
+
+    def __post_init__(self) -> None:
+        if self.workers < 1:
+            raise ValueError("workers must be >= 1")
+        if self.batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        if self.batch_wait < 0:
+            raise ValueError("batch_wait must be >= 0")
+        if self.queue_size < 1:
+            raise ValueError("queue_size must be >= 1")
+
+
+@dataclass
+class StageStats:
+    """
+    Throughput of one stage in a streaming run. `busy` is the summed time
+    spent inside stage calls, so `utilization` near 1 marks the bottleneck.
+    """
+
+    name: str
+    workers: int
+    items: int = 0
+    batches: int = 0
+    busy: float = 0.0
+    started: float | None = None
+    finished: float | None = None
+
+    @property
+    def wall(self) -> float:
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+    @property
+    def throughput(self) -> float:
+        return self.items / self.wall if self.wall > 0 else 0.0
+
+    @property
+    def utilization(self) -> float:
+        return self.busy / (self.wall * self.workers) if self.wall > 0 else 0.0
+
+
+def _stage_name(stage: Stage) -> str:
+    return getattr(stage, "name", type(stage).__name__)
+
+
+class _End:
+    pass
+
+
+_END = _End()
+
+
+class _Failed:
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+class PipelineStream(Generic[OutputT]):
+    """
+    One streaming run of a Pipeline. Iterate it (sync, on a private event
+    loop) or `async for` it; `stats` holds per-stage StageStats and is final
+    once iteration ends. Leaving the loop early cancels the stage workers.
+    """
+
+    def __init__(
+        self,
+        pipeline: "Pipeline[Any, OutputT]",
+        inputs: Iterable[Any] | AsyncIterable[Any],
+        options: list[StageOptions],
+        ordered: bool,
+        trace: dict | None,
+    ) -> None:
+        self.pipeline = pipeline
+        self.inputs = inputs
+        self.options = options
+        self.ordered = ordered
+        self.trace = trace
+        self.stats = [StageStats(_stage_name(s), o.workers) for s, o in zip(pipeline.stages, options)]
+
+    def __iter__(self) -> Iterator[OutputT]:
+        loop = asyncio.new_event_loop()
+        agen = self.__aiter__()
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(agen.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            loop.run_until_complete(agen.aclose())
+            loop.run_until_complete(loop.shutdown_default_executor())
+            loop.close()
+
+    async def _feed(self, queue: asyncio.Queue) -> None:
+        seq = 0
+        if isinstance(self.inputs, AsyncIterable):
+            async for item in self.inputs:
+                await queue.put((seq, item))
+                seq += 1
+            return
+        it = iter(self.inputs)
+        while True:
+            # inputs may be lazy (files, generators); don't block the loop on them
+            item = await asyncio.to_thread(next, it, _END)
+            if item is _END:
+                return
+            await queue.put((seq, item))
+            seq += 1
+
+    async def _batch(self, queue: asyncio.Queue, opts: StageOptions) -> list:
+        batch = [await queue.get()]
+        if batch[0] is _END:
+            return batch
+        deadline = time.perf_counter() + opts.batch_wait
+        while len(batch) < opts.batch_size:
+            try:
+                if opts.batch_wait <= 0:
+                    item = queue.get_nowait()
+                else:
+                    item = await asyncio.wait_for(queue.get(), max(0.0, deadline - time.perf_counter()))
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+            batch.append(item)
+            if item is _END:
+                break
+        return batch
+
+    async def _call(self, stage: Stage, inputs: list) -> list:
+        run_batch = getattr(stage, "run_batch", None)
+        if run_batch is not None and len(inputs) > 1:
+            if inspect.iscoroutinefunction(run_batch):
+                outputs = await run_batch(inputs, trace=self.trace)
+            else:
+                outputs = await asyncio.to_thread(run_batch, inputs, trace=self.trace)
+            outputs = list(outputs)
+            if len(outputs) != len(inputs):
+                raise ValueError(f"{_stage_name(stage)}.run_batch must return one output per input")
+            return outputs
+        if inspect.iscoroutinefunction(stage.run):
+            return [await stage.run(x, trace=self.trace) for x in inputs]
+        return await asyncio.to_thread(lambda: [stage.run(x, trace=self.trace) for x in inputs])
+
+    async def _work(self, index: int, inbox: asyncio.Queue, outbox: asyncio.Queue) -> bool:
+        """
+        Process batches until the end marker; returns True once it saw it, so
+        the stage can forward it after all its workers are done.
+        """
+        stage, opts, stats = self.pipeline.stages[index], self.options[index], self.stats[index]
+        while True:
+            batch = await self._batch(inbox, opts)
+            end = batch[-1] is _END
+            if end:
+                # the other workers of this stage need to see the end too
+                batch.pop()
+                inbox.put_nowait(_END)
+            if batch:
+                if stats.started is None:
+                    stats.started = time.perf_counter()
+                seqs = [seq for seq, _ in batch]
+                inputs = [x for _, x in batch]
+                t0 = time.perf_counter()
+                with phase(self.pipeline.hooks, "stage", index=index, stage=stats.name, input=inputs) as p:
+                    outputs = p["output"] = await self._call(stage, inputs)
+                stats.busy += time.perf_counter() - t0
+                stats.items += len(inputs)
+                stats.batches += 1
+                for seq, out in zip(seqs, outputs):
+                    await outbox.put((seq, out))
+                stats.finished = time.perf_counter()
+            if end:
+                return True
+
+    async def __aiter__(self) -> AsyncIterator[OutputT]:
+        stages = self.pipeline.stages
+        queues = [asyncio.Queue(maxsize=o.queue_size) for o in self.options]
+        out: asyncio.Queue = asyncio.Queue(maxsize=max(1, self.options[-1].queue_size) if self.options else 1)
+        tasks: list[asyncio.Task] = []
+
+        async def guard(coro) -> None:
+            try:
+                await coro
+            except asyncio.CancelledError:
+                raise
+            except BaseException as e:
+                for t in tasks:
+                    if t is not asyncio.current_task():
+                        t.cancel()
+                # nothing else runs between draining and the put, so it can't block
+                while not out.empty():
+                    out.get_nowait()
+                out.put_nowait(_Failed(e))
+
+        async def source() -> None:
+            first = queues[0] if queues else out
+            await self._feed(first)
+            await first.put(_END)
+
+        async def stage(index: int) -> None:
+            outbox = queues[index + 1] if index + 1 < len(queues) else out
+            n = self.options[index].workers
+            workers = [asyncio.create_task(self._work(index, queues[index], outbox)) for _ in range(n)]
+            try:
+                await asyncio.gather(*workers)
+            except BaseException:
+                # gather leaves the other workers running
+                for w in workers:
+                    w.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                raise
+            await outbox.put(_END)
+
+        tasks.append(asyncio.create_task(guard(source())))
+        tasks.extend(asyncio.create_task(guard(stage(i))) for i in range(len(stages)))
+
+        pending: dict[int, Any] = {}
+        next_seq = 0
+        try:
+            while True:
+                item = await out.get()
+                if item is _END:
+                    break
+                if isinstance(item, _Failed):
+                    raise item.error
+                seq, value = item
+                if not self.ordered:
+                    yield value
+                    continue
+                pending[seq] = value
+                while next_seq in pending:
+                    yield pending.pop(next_seq)
+                    next_seq += 1
+        finally:
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
 class Pipeline(Generic[InputT, OutputT]):
-    def __init__(self, stages: list[Stage]):
+    """
+    Runs stages in order. `hooks` see a "stage" phase around each stage, with
+    its index and name (the stage's `name` attribute or class name).
+
+    `stream` runs the stages concurrently over many inputs instead: each
+    stage is a pool of workers joined to the next by a bounded queue.
+    """
+
+    def __init__(self, stages: list[Stage], hooks: Sequence[Hook] = ()):
         self.stages = stages
+        self.hooks = tuple(hooks)
 
     def run(self, input_data: InputT, trace: dict | None = None):
         data = input_data
-        for stage in self.stages:
-            data = stage.run(data, trace=trace)
+        for i, stage in enumerate(self.stages):
+            name = _stage_name(stage)
+            with phase(self.hooks, "stage", index=i, stage=name, input=data) as p:
+                data = p["output"] = stage.run(data, trace=trace)
         return data
 
-
+    def stream(
+        self,
+        inputs: Iterable[InputT] | AsyncIterable[InputT],
+        options: StageOptions | Sequence[StageOptions | None] | None = None,
+        ordered: bool = True,
+        trace: dict | None = None,
+    ) -> PipelineStream[OutputT]:
+        """
+        Push every input through all stages concurrently. `options` is one
+        StageOptions for every stage or one per stage (None = defaults).
+        Outputs come in input order, or as they complete with `ordered=False`.
+        `trace` is passed to every stage call.
+        """
+        if options is None or isinstance(options, StageOptions):
+            per_stage = [options or StageOptions()] * len(self.stages)
+        else:
+            if len(options) != len(self.stages):
+                raise ValueError("options must have one entry per stage")
+            per_stage = [o or StageOptions() for o in options]
+        return PipelineStream(self, inputs, per_stage, ordered, trace)
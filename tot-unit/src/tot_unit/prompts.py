@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from typing import Union
+
+
+@dataclass(frozen=True)
+class Prompt:
+    """
+    Prompt split into a stable part and a per-candidate tail.
+
+    Providers cache prompt prefixes (KV / prompt caching) only when the leading
+    tokens are byte-identical. Keep instructions and anything shared by
+    siblings in `system` / `prefix`, and put only what differs per candidate in
+    `suffix`. Across steps, a child's prompt can extend its parent's prefix:
+    `Prompt(prefix=parent.prefix + (parent_delta,), suffix=...)`.
+    """
+
+    system: str | None = None
+    prefix: tuple[str, ...] = ()
+    suffix: str = ""
+
+    def messages(self) -> list[dict]:
+        out: list[dict] = []
+        if self.system:
+            out.append({"role": "system", "content": self.system})
+        out.append({"role": "user", "content": "".join(self.prefix) + self.suffix})
+        return out
+
+    def text(self) -> str:
+        return (self.system or "") + "".join(self.prefix) + self.suffix
+
+    def prefix_key(self) -> str:
+        h = hashlib.sha1()
+        h.update((self.system or "").encode("utf-8"))
+        for seg in self.prefix:
+            h.update(b"\x00")
+            h.update(seg.encode("utf-8"))
+        return h.hexdigest()
+
+
+PromptLike = Union[str, Prompt]
+
+
+def as_prompt(prompt: PromptLike) -> Prompt:
+    return prompt if isinstance(prompt, Prompt) else Prompt(suffix=prompt)
+
+
+def group_by_prefix(prompts: list[PromptLike]) -> list[list[int]]:
+    """
+    Indices of `prompts` grouped by shared prefix, groups in first-seen order.
+    Plain strings have no declared prefix and form singleton groups.
+    """
+    groups: dict[str, list[int]] = {}
+    out: list[list[int]] = []
+    for i, prompt in enumerate(prompts):
+        if not isinstance(prompt, Prompt) or not (prompt.system or prompt.prefix):
+            out.append([i])
+            continue
+        key = prompt.prefix_key()
+        if key not in groups:
+            groups[key] = []
+            out.append(groups[key])
+        groups[key].append(i)
+    return out
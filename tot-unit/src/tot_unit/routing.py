@@ -0,0 +1,447 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Optional, Sequence
+
+from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+
+from .core.tracing import bind_context
+
+if TYPE_CHECKING:
+    from .llm import AsyncOpenAICompatibleClient, LLMConfig, OpenAICompatibleClient
+    from .prompts import PromptLike
+
+
+# errors that say the endpoint, not the request, is at fault (a 429 reaching the
+# router has exhausted the client's own retries); anything else is re-raised as is
+_ENDPOINT_ERRORS = (APIConnectionError, APITimeoutError, InternalServerError, RateLimitError)
+
+
+@dataclass(frozen=True)
+class RoutingPolicy:
+    """
+    How a RoutedClient spreads requests over its endpoints.
+
+    Each request goes to the endpoint with the lowest latency EWMA, inflated
+    by its error rate (endpoints without samples yet are tried first). An
+    endpoint that fails rests for `cooldown` seconds, doubling with every
+    consecutive failure up to `max_cooldown`; resting endpoints are only
+    used once every other one failed. With `hedge`, a request still running
+    after the `hedge_quantile` of its endpoint's recent latencies (known once
+    it has `min_samples`) gets a duplicate on the next endpoint, up to
+    `max_hedges` times; the first reply wins. Only transport errors, 5xx
+    and exhausted 429s count against an endpoint and fail over; other
+    errors (e.g. a 400) are raised at once. Sync clients run hedged
+    requests on a pool of `hedge_workers` threads; a request finding it
+    full is sent without hedging.
+    """
+
+    latency_alpha: float = 0.2
+    error_alpha: float = 0.1
+    cooldown: float = 5.0
+    max_cooldown: float = 60.0
+    hedge: bool = True
+    hedge_quantile: float = 0.95
+    min_hedge_delay: float = 0.05
+    max_hedges: int = 1
+    hedge_workers: int = 16
+    min_samples: int = 10
+    window: int = 200
+
+    def __post_init__(self) -> None:
+        if not 0.0 < self.latency_alpha <= 1.0 or not 0.0 < self.error_alpha <= 1.0:
+            raise ValueError("latency_alpha and error_alpha must be in (0, 1]")
+        if not 0.0 < self.hedge_quantile < 1.0:
+            raise ValueError("hedge_quantile must be in (0, 1)")
+        if self.max_hedges < 0:
+            raise ValueError("max_hedges must be >= 0")
+        if self.hedge_workers < 1:
+            raise ValueError("hedge_workers must be >= 1")
+        if self.min_samples < 1 or self.window < self.min_samples:
+            raise ValueError("need 1 <= min_samples <= window")
+
+
+class EndpointHealth:
+    """
+    Live latency and error statistics of one (api_base, model). Thread-safe;
+    successful latencies feed the EWMA and the window used for quantiles.
+    """
+
+    def __init__(self, name: str, policy: RoutingPolicy) -> None:
+        self.name = name
+        self.policy = policy
+        self.latency: float | None = None
+        self.error_rate = 0.0
+        self.calls = 0
+        self.errors = 0
+        self.consecutive_failures = 0
+        self.down_until = 0.0
+        self._recent: deque[float] = deque(maxlen=policy.window)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, ok: bool) -> None:
+        p = self.policy
+        with self._lock:
+            self.calls += 1
+            self.error_rate += p.error_alpha * ((0.0 if ok else 1.0) - self.error_rate)
+            if ok:
+                self.consecutive_failures = 0
+                self.latency = latency if self.latency is None else self.latency + p.latency_alpha * (latency - self.latency)
+                self._recent.append(latency)
+                return
+            self.errors += 1
+            self.consecutive_failures += 1
+            rest = min(p.max_cooldown, p.cooldown * 2 ** (self.consecutive_failures - 1))
+            self.down_until = time.perf_counter() + rest
+
+    def censored(self, elapsed: float) -> None:
+        """
+        A request abandoned after `elapsed` seconds (a cancelled losing
+        hedge): its latency is at least that, so it may only raise the
+        estimates, never pull them down.
+        """
+        p = self.policy
+        with self._lock:
+            if self.latency is not None and elapsed > self.latency:
+                self.latency += p.latency_alpha * (elapsed - self.latency)
+            if len(self._recent) >= p.min_samples:
+                ordered = sorted(self._recent)
+                if elapsed >= ordered[min(len(ordered) - 1, int(p.hedge_quantile * len(ordered)))]:
+                    self._recent.append(elapsed)
+
+    def available(self, now: float | None = None) -> bool:
+        return (now if now is not None else time.perf_counter()) >= self.down_until
+
+    def cost(self) -> float:
+        """
+        Expected latency of a request, counting failed attempts.
+        """
+        if self.latency is None:
+            return 0.0
+        return self.latency / max(1e-3, 1.0 - self.error_rate)
+
+    def quantile(self, q: float) -> float | None:
+        with self._lock:
+            if len(self._recent) < self.policy.min_samples:
+                return None
+            ordered = sorted(self._recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "latency": self.latency,
+            "p95": self.quantile(0.95),
+            "error_rate": self.error_rate,
+            "calls": self.calls,
+            "errors": self.errors,
+            "available": self.available(),
+        }
+
+
+class ProviderHealth:
+    """
+    EndpointHealth per (api_base, model), shared by every RoutedClient built
+    with it, so what one step or role learns about a provider routes the
+    others too. The first policy to ask for an endpoint fixes its settings.
+    """
+
+    def __init__(self) -> None:
+        self._endpoints: dict[tuple[str, str], EndpointHealth] = {}
+        self._lock = threading.Lock()
+
+    def get(self, cfg: LLMConfig, policy: RoutingPolicy) -> EndpointHealth:
+        key = (cfg.api_base.rstrip("/"), cfg.model)
+        with self._lock:
+            health = self._endpoints.get(key)
+            if health is None:
+                health = self._endpoints[key] = EndpointHealth(f"{cfg.model}@{key[0]}", policy)
+            return health
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            endpoints = list(self._endpoints.values())
+        return {h.name: h.snapshot() for h in endpoints}
+
+
+@dataclass
+class RoutingStats:
+    requests: int = 0
+    hedges: int = 0
+    # requests answered by a hedge rather than the endpoint tried first
+    hedge_wins: int = 0
+    failovers: int = 0
+    # losing sync hedges that had started: left to finish in the background,
+    # their calls and tokens are still recorded
+    abandoned: int = 0
+
+
+class _Routing:
+    """
+    Endpoint choice shared by the sync and async routed clients.
+    """
+
+    def __init__(self, clients: Sequence[Any], policy: RoutingPolicy | None, health: ProviderHealth | None) -> None:
+        if not clients:
+            raise ValueError("clients must not be empty")
+        self.clients = list(clients)
+        # settings of the primary endpoint, for code that reads `client.cfg`
+        self.cfg = self.clients[0].cfg
+        self.policy = policy or RoutingPolicy()
+        self.health = [(health or ProviderHealth()).get(c.cfg, self.policy) for c in self.clients]
+        self.stats = RoutingStats()
+        self._lock = threading.Lock()
+
+    def order(self) -> list[int]:
+        """
+        Endpoint indices, best first: available ones by expected latency
+        (ties keep the configured order), then resting ones by wake-up time.
+        """
+        now = time.perf_counter()
+        up = [i for i, h in enumerate(self.health) if h.available(now)]
+        down = [i for i, h in enumerate(self.health) if not h.available(now)]
+        up.sort(key=lambda i: self.health[i].cost())
+        down.sort(key=lambda i: self.health[i].down_until)
+        return up + down
+
+    def hedge_delay(self, index: int, hedges: int, remaining: int) -> float | None:
+        if not self.policy.hedge or hedges >= self.policy.max_hedges or not remaining:
+            return None
+        q = self.health[index].quantile(self.policy.hedge_quantile)
+        return None if q is None else max(self.policy.min_hedge_delay, q)
+
+    def count(self, **deltas: int) -> None:
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self.stats, name, getattr(self.stats, name) + delta)
+
+    def endpoints(self) -> dict[str, dict[str, Any]]:
+        return {h.name: h.snapshot() for h in self.health}
+
+    @property
+    def namespace(self) -> str:
+        """
+        Stable id of the endpoint pool (e.g. for memoized judge scores):
+        every endpoint with its sampling settings, in configured order.
+        """
+        return "routed:" + ",".join(
+            f"{c.cfg.api_base.rstrip('/')}|{c.cfg.model}|{c.cfg.temperature}|{c.cfg.max_tokens}" for c in self.clients
+        )
+
+
+class RoutedClient(_Routing):
+    """
+    Drop-in for OpenAICompatibleClient over several endpoints of one role
+    (see RoutingPolicy): routes by live latency and error rate, hedges slow
+    requests and fails over to the next endpoint when one fails. Hedges run
+    on one thread pool per client, reused by every request. A losing hedge
+    that hasn't started is cancelled; one already sending can't be
+    interrupted in a thread, so it finishes in the background, still updates
+    the endpoint's statistics and is counted in `stats.abandoned`. Streaming
+    requests fail over but are never hedged, so deltas come from one sample set.
+    """
+
+    def __init__(
+        self,
+        clients: Sequence[OpenAICompatibleClient],
+        policy: RoutingPolicy | None = None,
+        health: ProviderHealth | None = None,
+    ) -> None:
+        super().__init__(clients, policy, health)
+        self._pool = ThreadPoolExecutor(max_workers=self.policy.hedge_workers, thread_name_prefix="tot-hedge")
+        # free workers; a request never queues behind abandoned hedges
+        self._slots = threading.Semaphore(self.policy.hedge_workers)
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _attempt(self, index: int, call: Callable[[Any], list[str]]) -> list[str]:
+        t0 = time.perf_counter()
+        try:
+            result = call(self.clients[index])
+        except _ENDPOINT_ERRORS:
+            self.health[index].record(time.perf_counter() - t0, ok=False)
+            raise
+        self.health[index].record(time.perf_counter() - t0, ok=True)
+        return result
+
+    def _submit(self, attempt: Callable[..., list[str]], index: int, call: Callable[[Any], list[str]]) -> Future | None:
+        """
+        Start `attempt` on a free pool worker, or return None if all are busy.
+        """
+        if not self._slots.acquire(blocking=False):
+            return None
+        try:
+            future = self._pool.submit(attempt, index, call)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _route(self, call: Callable[[Any], list[str]], hedge: bool = True) -> list[str]:
+        self.count(requests=1)
+        queue = self.order()
+        first = queue[0]
+        if not hedge or self.hedge_delay(first, 0, len(queue) - 1) is None:
+            return self._failover(queue, call)
+        attempt = bind_context(self._attempt)
+        index = queue.pop(0)
+        future = self._submit(attempt, index, call)
+        if future is None:
+            return self._failover([index, *queue], call)
+        pending: dict[Future, int] = {future: index}
+        errors: list[Exception] = []
+        hedges = 0
+        can_hedge = True
+        try:
+            while pending:
+                delay = self.hedge_delay(index, hedges, len(queue)) if can_hedge else None
+                done, _ = wait(pending, timeout=delay, return_when=FIRST_COMPLETED)
+                if not done:
+                    future = self._submit(attempt, queue[0], call)
+                    if future is None:
+                        # no free worker: keep waiting on what is running
+                        can_hedge = False
+                        continue
+                    hedges += 1
+                    self.count(hedges=1)
+                    index = queue.pop(0)
+                    pending[future] = index
+                    continue
+                for future in done:
+                    winner = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except _ENDPOINT_ERRORS as e:
+                        errors.append(e)
+                        continue
+                    if winner != first and hedges:
+                        self.count(hedge_wins=1)
+                    return result
+                if not pending and queue:
+                    self.count(failovers=1)
+                    index = queue.pop(0)
+                    future = self._submit(attempt, index, call)
+                    if future is None:
+                        return self._failover([index, *queue], call)
+                    pending[future] = index
+            raise errors[-1]
+        finally:
+            for future in pending:
+                if not future.cancel():
+                    self.count(abandoned=1)
+
+    def _failover(self, queue: list[int], call: Callable[[Any], list[str]]) -> list[str]:
+        for k, index in enumerate(queue):
+            try:
+                return self._attempt(index, call)
+            except _ENDPOINT_ERRORS:
+                if k == len(queue) - 1:
+                    raise
+                self.count(failovers=1)
+        raise AssertionError("unreachable")
+
+    def chat(self, prompt: PromptLike, n: int, stop: Optional[str], start: int = 0) -> list[str]:
+        return self._route(lambda c: c.chat(prompt=prompt, n=n, stop=stop, start=start))
+
+    def chat_stream(
+        self,
+        prompt: PromptLike,
+        n: int,
+        stop: Optional[str],
+        early_stop: Optional[Callable[[str], bool]] = None,
+        on_delta: Optional[Callable[[int, str], None]] = None,
+        start: int = 0,
+    ) -> list[str]:
+        return self._route(
+            lambda c: c.chat_stream(prompt=prompt, n=n, stop=stop, early_stop=early_stop, on_delta=on_delta, start=start),
+            hedge=False,
+        )
+
+
+class AsyncRoutedClient(_Routing):
+    """
+    Async RoutedClient. Losing hedges are cancelled, which closes their
+    connection so the provider stops generating.
+    """
+
+    def __init__(
+        self,
+        clients: Sequence[AsyncOpenAICompatibleClient],
+        policy: RoutingPolicy | None = None,
+        health: ProviderHealth | None = None,
+    ) -> None:
+        super().__init__(clients, policy, health)
+
+    async def _attempt(self, index: int, call: Callable[[Any], Awaitable[list[str]]]) -> list[str]:
+        t0 = time.perf_counter()
+        try:
+            result = await call(self.clients[index])
+        except asyncio.CancelledError:
+            self.health[index].censored(time.perf_counter() - t0)
+            raise
+        except _ENDPOINT_ERRORS:
+            self.health[index].record(time.perf_counter() - t0, ok=False)
+            raise
+        self.health[index].record(time.perf_counter() - t0, ok=True)
+        return result
+
+    async def _route(self, call: Callable[[Any], Awaitable[list[str]]], hedge: bool = True) -> list[str]:
+        self.count(requests=1)
+        queue = self.order()
+        first = index = queue.pop(0)
+        pending: dict[asyncio.Task, int] = {asyncio.ensure_future(self._attempt(index, call)): index}
+        errors: list[Exception] = []
+        hedges = 0
+        try:
+            while pending:
+                delay = self.hedge_delay(index, hedges, len(queue)) if hedge else None
+                done, _ = await asyncio.wait(pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedges += 1
+                    self.count(hedges=1)
+                    index = queue.pop(0)
+                    pending[asyncio.ensure_future(self._attempt(index, call))] = index
+                    continue
+                for task in done:
+                    winner = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except _ENDPOINT_ERRORS as e:
+                        errors.append(e)
+                        continue
+                    if winner != first and hedges:
+                        self.count(hedge_wins=1)
+                    return result
+                if not pending and queue:
+                    self.count(failovers=1)
+                    index = queue.pop(0)
+                    pending[asyncio.ensure_future(self._attempt(index, call))] = index
+            raise errors[-1]
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def chat(self, prompt: PromptLike, n: int, stop: Optional[str], start: int = 0) -> list[str]:
+        return await self._route(lambda c: c.chat(prompt=prompt, n=n, stop=stop, start=start))
+
+    async def chat_stream(
+        self,
+        prompt: PromptLike,
+        n: int,
+        stop: Optional[str],
+        early_stop: Optional[Callable[[str], bool]] = None,
+        on_delta: Optional[Callable[[int, str], None]] = None,
+        start: int = 0,
+    ) -> list[str]:
+        return await self._route(
+            lambda c: c.chat_stream(prompt=prompt, n=n, stop=stop, early_stop=early_stop, on_delta=on_delta, start=start),
+            hedge=False,
+        )
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Protocol, Union
+
+from .cache import CompletionCache, MemoryCache
+from .core.interfaces import AsyncEvaluator, Evaluator
+from .core.tracing import bind_context
+from .core.types import Candidate
+from .llm import AsyncOpenAICompatibleClient, OpenAICompatibleClient
+from .prompts import Prompt, PromptLike
+
+
+# value labels of the original ToT value prompt
+VALUE_LABELS = {"sure": 20.0, "likely": 1.0, "impossible": 0.001}
+
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+_ITEM = re.compile(r"^\s*(?:candidate\s*)?[\[(#]?(\d+)[\])]?\s*[:.)\-]\s*(.*)$", re.IGNORECASE)
+
+
+class ValuePromptBuilder(Protocol):
+    """
+    Builds one value prompt for a batch of candidates. With batches of more
+    than one, ask for one "<k>: <value>" line per candidate, numbered from 1.
+    """
+
+    def __call__(self, step: int, candidates: list[Candidate]) -> PromptLike: ...
+
+
+class ValueParser(Protocol):
+    def __call__(self, output: str, n_candidates: int) -> list[Optional[float]]: ...
+
+
+def _label_pattern(labels: dict[str, float]) -> re.Pattern:
+    return re.compile(r"\b(" + "|".join(re.escape(k) for k in sorted(labels, key=len, reverse=True)) + r")\b", re.IGNORECASE)
+
+
+_LABELS = _label_pattern(VALUE_LABELS)
+
+
+def parse_value(text: str) -> Optional[float]:
+    """
+    Last value label (sure/likely/impossible) in `text`, else its last number.
+    """
+    labels = _LABELS.findall(text)
+    if labels:
+        return VALUE_LABELS[labels[-1].lower()]
+    numbers = _NUMBER.findall(text)
+    return float(numbers[-1]) if numbers else None
+
+
+def parse_values(output: str, n_candidates: int) -> list[Optional[float]]:
+    """
+    Default ValueParser: one value for a single candidate, otherwise one
+    numbered "<k>: <value>" line per candidate. Unparsed entries are None.
+    """
+    if n_candidates == 1:
+        return [parse_value(output)]
+    values: list[Optional[float]] = [None] * n_candidates
+    for line in output.splitlines():
+        match = _ITEM.match(line)
+        if match is None:
+            continue
+        k = int(match.group(1)) - 1
+        if 0 <= k < n_candidates:
+            value = parse_value(match.group(2))
+            if value is not None:
+                values[k] = value
+    return values
+
+
+def value_key(namespace: str, prompt: PromptLike, n_evaluate: int) -> str:
+    """
+    Memo key of one candidate's score: its rendered single-candidate value
+    prompt (so the problem in `state` and prompt changes are part of it)
+    under a judge namespace, for `n_evaluate` samples.
+    """
+    content = prompt.messages() if isinstance(prompt, Prompt) else prompt
+    payload = json.dumps([namespace, content, n_evaluate], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+Client = Union[OpenAICompatibleClient, AsyncOpenAICompatibleClient]
+
+
+class _ValueScoring:
+    """
+    Memo lookup, batching and parsing shared by the sync and async value
+    evaluators. Scores are memoized by the candidate's own value prompt (plus
+    judge model, sampling settings and sample count), so a candidate is
+    scored once per judge as long as its prompt doesn't change with the step.
+    """
+
+    def __init__(
+        self,
+        client_for_step: Callable[[int], Client],
+        value_prompt_builder: ValuePromptBuilder,
+        batch_size: int = 1,
+        max_concurrency: int = 8,
+        memo: Optional[CompletionCache] = None,
+        parse: ValueParser = parse_values,
+        missing_value: float = 0.0,
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+        self.client_for_step = client_for_step
+        self.value_prompt_builder = value_prompt_builder
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.memo = memo if memo is not None else MemoryCache()
+        self.parse = parse
+        self.missing_value = missing_value
+
+    @staticmethod
+    def _namespace(client: Client) -> str:
+        namespace = getattr(client, "namespace", None)
+        if namespace is not None:
+            # a routed pool scores as one judge
+            return namespace
+        cfg = getattr(client, "cfg", None)
+        if cfg is None:
+            return type(client).__name__
+        return f"{cfg.api_base.rstrip('/')}|{cfg.model}|{cfg.temperature}|{cfg.max_tokens}"
+
+    def _plan(
+        self, client: Client, step: int, candidates: list[Candidate], n_evaluate: int
+    ) -> tuple[list[Optional[float]], list[str], list[list[int]]]:
+        """
+        Memoized scores (None where unknown), the key of every candidate, and
+        batches of indices still to score; repeated texts are scored once.
+        """
+        ns = self._namespace(client)
+        keys = [value_key(ns, self.value_prompt_builder(step, [c]), n_evaluate) for c in candidates]
+        scores: list[Optional[float]] = [None] * len(candidates)
+        todo: dict[str, int] = {}
+        for i, key in enumerate(keys):
+            if key in todo:
+                continue
+            hit = self.memo.get(key)
+            if hit is not None:
+                scores[i] = float(hit)
+            else:
+                todo[key] = i
+        pending = list(todo.values())
+        batches = [pending[i : i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+        return scores, keys, batches
+
+    def _score(self, outputs: list[str], n_candidates: int) -> list[Optional[float]]:
+        totals = [0.0] * n_candidates
+        counts = [0] * n_candidates
+        for out in outputs:
+            for k, value in enumerate(self.parse(out, n_candidates)):
+                if value is not None:
+                    totals[k] += value
+                    counts[k] += 1
+        return [totals[k] / counts[k] if counts[k] else None for k in range(n_candidates)]
+
+    def _finish(
+        self,
+        scores: list[Optional[float]],
+        keys: list[str],
+        batches: list[list[int]],
+        results: list[list[Optional[float]]],
+    ) -> list[float]:
+        by_key: dict[str, float] = {}
+        for batch, values in zip(batches, results):
+            for i, value in zip(batch, values):
+                if value is not None:
+                    # only parsed values are memoized; a failed parse is retried next time
+                    self.memo.put(keys[i], repr(value))
+                    by_key[keys[i]] = value
+        out = []
+        for i, score in enumerate(scores):
+            if score is None:
+                score = by_key.get(keys[i], self.missing_value)
+            out.append(score)
+        return out
+
+
+class LLMValueEvaluator(_ValueScoring, Evaluator):
+    """
+    Scores every candidate on its own: `batch_size` candidates per request,
+    up to `max_concurrency` requests at once, averaged over `n_evaluate`
+    samples. Scores are memoized in `memo` (any CompletionCache, e.g. a
+    SQLiteCache to share them across processes); candidates already scored
+    by the same judge model are never sent again.
+    """
+
+    def evaluate(self, step: int, candidates: list[Candidate], n_evaluate: int) -> list[float]:
+        if not candidates:
+            return []
+        client = self.client_for_step(step)
+        scores, keys, batches = self._plan(client, step, candidates, n_evaluate)
+
+        def run(batch: list[int]) -> list[Optional[float]]:
+            prompt = self.value_prompt_builder(step, [candidates[i] for i in batch])
+            return self._score(client.chat(prompt=prompt, n=n_evaluate, stop=None), len(batch))
+
+        if len(batches) <= 1:
+            results = [run(b) for b in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as pool:
+                results = list(pool.map(bind_context(run), batches))
+        return self._finish(scores, keys, batches, results)
+
+
+class AsyncLLMValueEvaluator(_ValueScoring, AsyncEvaluator):
+    """
+    Async counterpart of LLMValueEvaluator.
+    """
+
+    async def evaluate(self, step: int, candidates: list[Candidate], n_evaluate: int) -> list[float]:
+        if not candidates:
+            return []
+        client = self.client_for_step(step)
+        scores, keys, batches = self._plan(client, step, candidates, n_evaluate)
+        sem = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(batch: list[int]) -> list[Optional[float]]:
+            prompt = self.value_prompt_builder(step, [candidates[i] for i in batch])
+            async with sem:
+                outputs = await client.chat(prompt=prompt, n=n_evaluate, stop=None)
+            return self._score(outputs, len(batch))
+
+        results = await asyncio.gather(*(run(b) for b in batches))
+        return self._finish(scores, keys, batches, list(results))
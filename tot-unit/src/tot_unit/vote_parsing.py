@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Optional, Protocol, Sequence
+
+
+class VoteParser(Protocol):
+    """
+    Turns one judge sample into per-candidate vote weights: one entry per
+    candidate, summing to at most 1 (0 everywhere when nothing parsed).
+    """
+
+    def __call__(self, output: str, n_candidates: int) -> list[float]: ...
+
+
+_PATTERNS: dict[str, re.Pattern] = {}
+
+_CANDIDATE = r"(?:choice|option|candidate|answer|passage)?\s*[#(\[]?\s*(\d+)"
+
+
+def register_vote_pattern(name: str, pattern: str | re.Pattern, flags: int = re.IGNORECASE) -> None:
+    """
+    Add (or replace) a named pattern whose first group is the 1-based id of
+    the chosen candidate. Patterns are tried in registration order.
+    """
+    _PATTERNS[name] = pattern if isinstance(pattern, re.Pattern) else re.compile(pattern, flags)
+
+
+def vote_patterns() -> dict[str, re.Pattern]:
+    return dict(_PATTERNS)
+
+
+register_vote_pattern("best_choice", r"\bbest\s+(?:choice|option|candidate|answer|passage)\s+is\s*:?\s*" + _CANDIDATE)
+register_vote_pattern("label", r"\b(?:final\s+)?(?:answer|choice|vote|selection|pick)\s*[:=]\s*" + _CANDIDATE)
+register_vote_pattern("verb", r"\b(?:choose|chose|pick|select|vote\s+for|prefer)\s+" + _CANDIDATE)
+
+# "2 of 5", "3/4", "out of 10": denominators are never the vote
+_DENOMINATOR = re.compile(r"(\d+)\s*(?:\bout\s+of|\bof|/)\s*\d+", re.IGNORECASE)
+# integers that aren't part of a decimal or a percentage; "3." ending a sentence counts
+_INTEGER = re.compile(r"(?<![\d.])(\d+)(?!\.\d|\d|%)")
+_CONFIDENCE = re.compile(r"\bconfidence(?:\s+level)?\s*(?:is|[:=])?\s*(\d+(?:\.\d+)?)\s*(%)?", re.IGNORECASE)
+_RANKING = re.compile(r"\branking\s*(?:is|[:=])\s*((?:[#(\[]?\s*\d+\s*[)\]]?\s*(?:>|,|;|\s)\s*)*[#(\[]?\s*\d+)", re.IGNORECASE)
+_FENCED = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.DOTALL)
+
+
+def parse_confidence(text: str) -> Optional[float]:
+    """
+    Last "confidence: 0.8" / "confidence 80%" in `text`, in [0, 1].
+    """
+    matches = _CONFIDENCE.findall(text)
+    if not matches:
+        return None
+    value, percent = matches[-1]
+    conf = float(value)
+    if percent or conf > 1.0:
+        conf /= 100.0
+    return min(1.0, max(0.0, conf))
+
+
+def ranking_scores(ranking: Sequence[int], n_candidates: int) -> list[float]:
+    """
+    Borda weights of a best-first ranking of 1-based ids, normalized to sum
+    to 1 so a ranked sample weighs as much as a single vote. Invalid and
+    repeated ids are skipped; unranked candidates get 0.
+    """
+    order: list[int] = []
+    for k in ranking:
+        if 1 <= k <= n_candidates and k - 1 not in order:
+            order.append(k - 1)
+    scores = [0.0] * n_candidates
+    if not order:
+        return scores
+    for pos, i in enumerate(order):
+        scores[i] = float(n_candidates - pos)
+    total = sum(scores)
+    return [s / total for s in scores]
+
+
+@dataclass(frozen=True)
+class RegexVoteParser:
+    """
+    Free-text votes. `patterns` names registered patterns to try, in order
+    (default: all, see register_vote_pattern); the last in-range match of
+    the first pattern that has one wins. Otherwise, with `fallback`, the last
+    integer that isn't a denominator ("2 of 5"), decimal or percentage.
+    With `confidence`, a vote weighs its stated confidence (1 when absent).
+    """
+
+    patterns: Optional[tuple[str, ...]] = None
+    fallback: bool = True
+    confidence: bool = False
+    _compiled: tuple[re.Pattern, ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        names = self.patterns if self.patterns is not None else tuple(_PATTERNS)
+        unknown = [n for n in names if n not in _PATTERNS]
+        if unknown:
+            raise ValueError(f"unknown vote patterns: {unknown}")
+        object.__setattr__(self, "_compiled", tuple(_PATTERNS[n] for n in names))
+
+    def pick(self, output: str, n_candidates: int) -> Optional[int]:
+        """
+        0-based index of the chosen candidate, or None.
+        """
+        for pattern in self._compiled:
+            for match in reversed(pattern.findall(output)):
+                k = int(match if isinstance(match, str) else match[0])
+                if 1 <= k <= n_candidates:
+                    return k - 1
+        if self.fallback:
+            for match in reversed(_INTEGER.findall(_DENOMINATOR.sub(r"\1 ", output))):
+                k = int(match)
+                if 1 <= k <= n_candidates:
+                    return k - 1
+        return None
+
+    def __call__(self, output: str, n_candidates: int) -> list[float]:
+        votes = [0.0] * n_candidates
+        pick = self.pick(output, n_candidates)
+        if pick is not None:
+            conf = parse_confidence(output) if self.confidence else None
+            votes[pick] = 1.0 if conf is None else conf
+        return votes
+
+
+@dataclass(frozen=True)
+class RankingVoteParser:
+    """
+    Full rankings ("Ranking: 3 > 1 > 2"), scored with ranking_scores, so one
+    sample says something about every candidate. Samples without a ranking
+    go to `fallback`.
+    """
+
+    fallback: Optional[VoteParser] = field(default_factory=RegexVoteParser)
+
+    def __call__(self, output: str, n_candidates: int) -> list[float]:
+        matches = _RANKING.findall(output)
+        if matches:
+            scores = ranking_scores([int(k) for k in re.findall(r"\d+", matches[-1])], n_candidates)
+            if any(scores):
+                return scores
+        if self.fallback is not None:
+            return self.fallback(output, n_candidates)
+        return [0.0] * n_candidates
+
+
+def _json_object(output: str) -> Optional[dict]:
+    text = output.strip()
+    candidates = [text]
+    fenced = _FENCED.search(output)
+    if fenced:
+        candidates.append(fenced.group(1))
+    start, end = output.find("{"), output.rfind("}")
+    if 0 <= start < end:
+        candidates.append(output[start : end + 1])
+    for c in candidates:
+        try:
+            data = json.loads(c)
+        except (json.JSONDecodeError, ValueError):
+            continue
+        if isinstance(data, dict):
+            return data
+    return None
+
+
+def _as_id(value: Any) -> Optional[int]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        match = _INTEGER.search(value)
+        return int(match.group(1)) if match else None
+    return None
+
+
+@dataclass(frozen=True)
+class JSONVoteParser:
+    """
+    Structured votes: a JSON object (bare, fenced or embedded in text, or
+    function-call arguments) with `choice` and optional `confidence`, or a
+    best-first `ranking` list. See structured_vote_options for requesting
+    them. Samples that aren't valid JSON go to `fallback`.
+    """
+
+    choice_keys: tuple[str, ...] = ("choice", "best", "answer", "vote")
+    ranking_key: str = "ranking"
+    confidence: bool = True
+    fallback: Optional[VoteParser] = field(default_factory=RegexVoteParser)
+
+    def __call__(self, output: str, n_candidates: int) -> list[float]:
+        data = _json_object(output)
+        if data is not None:
+            ranking = data.get(self.ranking_key)
+            if isinstance(ranking, list):
+                ids = [k for k in (_as_id(v) for v in ranking) if k is not None]
+                scores = ranking_scores(ids, n_candidates)
+                if any(scores):
+                    return scores
+            for key in self.choice_keys:
+                k = _as_id(data.get(key))
+                if k is not None and 1 <= k <= n_candidates:
+                    votes = [0.0] * n_candidates
+                    conf = data.get("confidence") if self.confidence else None
+                    weight = 1.0
+                    if isinstance(conf, (int, float)) and not isinstance(conf, bool):
+                        weight = min(1.0, max(0.0, conf / 100.0 if conf > 1.0 else float(conf)))
+                    votes[k - 1] = weight
+                    return votes
+        if self.fallback is not None:
+            return self.fallback(output, n_candidates)
+        return [0.0] * n_candidates
+
+
+default_vote_parser: VoteParser = RegexVoteParser()
+
+
+def count_votes(outputs: list[str], n_candidates: int, parser: VoteParser | None = None) -> list[float]:
+    """
+    Summed vote weights of every sample.
+    """
+    parser = parser or default_vote_parser
+    votes = [0.0] * n_candidates
+    for out in outputs:
+        for i, v in enumerate(parser(out, n_candidates)):
+            votes[i] += v
+    return votes
+
+
+VOTE_FORMATS = ("json_object", "json_schema", "tool")
+
+
+def vote_schema(ranking: bool = False, confidence: bool = False) -> dict[str, Any]:
+    if ranking:
+        return {
+            "type": "object",
+            "properties": {"ranking": {"type": "array", "items": {"type": "integer", "minimum": 1}}},
+            "required": ["ranking"],
+            "additionalProperties": False,
+        }
+    props: dict[str, Any] = {"choice": {"type": "integer", "minimum": 1}}
+    if confidence:
+        props["confidence"] = {"type": "number", "minimum": 0, "maximum": 1}
+    return {"type": "object", "properties": props, "required": list(props), "additionalProperties": False}
+
+
+def structured_vote_options(fmt: str = "json_schema", ranking: bool = False, confidence: bool = False) -> dict[str, Any]:
+    """
+    Request options (LLMConfig.request_options of the judge) asking for
+    votes JSONVoteParser reads: `response_format` JSON mode ("json_object",
+    the prompt must describe the keys), a strict JSON schema ("json_schema"),
+    or a forced `vote` function call ("tool").
+    """
+    if fmt not in VOTE_FORMATS:
+        raise ValueError(f"fmt must be one of {VOTE_FORMATS}")
+    if fmt == "json_object":
+        return {"response_format": {"type": "json_object"}}
+    schema = vote_schema(ranking, confidence)
+    if fmt == "json_schema":
+        return {"response_format": {"type": "json_schema", "json_schema": {"name": "vote", "schema": schema, "strict": True}}}
+    return {
+        "tools": [
+            {
+                "type": "function",
+                "function": {"name": "vote", "description": "Cast a vote for the most promising choice.", "parameters": schema},
+            }
+        ],
+        "tool_choice": {"type": "function", "function": {"name": "vote"}},
+    }
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import math
+import random
+from dataclasses import dataclass
+from typing import Callable
+
+from .core.types import Candidate
+from .prompts import PromptLike, as_prompt
+
+
+VOTE_AGGREGATIONS = ("votes", "borda", "bradley_terry")
+
+
+@dataclass(frozen=True)
+class VoteChunking:
+    """
+    Split large vote prompts into concurrent sub-votes.
+
+    Candidates are packed into chunks of at most `chunk_size` candidates and
+    `max_prompt_tokens` estimated prompt tokens (~4 chars per token). With
+    `knockout`, the best `advance` of every chunk go on to another round until
+    the survivors fit in one prompt. Chunk results are combined with
+    `aggregate`: "votes" (vote share), "borda" (rank within the chunk) or
+    "bradley_terry" (strengths fitted on every pairwise outcome of every round).
+    Candidates that fit in a single prompt are voted on exactly as without
+    chunking.
+    """
+
+    chunk_size: int | None = 8
+    max_prompt_tokens: int | None = None
+    knockout: bool = False
+    advance: int = 2
+    aggregate: str = "borda"
+    max_concurrency: int = 8
+    # shuffle before chunking so the generator's sample order doesn't decide pairings
+    shuffle: bool = True
+    seed: int = 0
+
+    def __post_init__(self) -> None:
+        if self.chunk_size is None and self.max_prompt_tokens is None:
+            raise ValueError("set chunk_size or max_prompt_tokens")
+        if self.chunk_size is not None and self.chunk_size < 2:
+            raise ValueError("chunk_size must be >= 2")
+        if self.advance < 1:
+            raise ValueError("advance must be >= 1")
+        if self.aggregate not in VOTE_AGGREGATIONS:
+            raise ValueError(f"aggregate must be one of {VOTE_AGGREGATIONS}")
+        if self.max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+
+
+def _prompt_tokens(prompt: PromptLike) -> int:
+    return len(as_prompt(prompt).text()) // 4
+
+
+def plan_chunks(
+    indices: list[int],
+    chunking: VoteChunking,
+    size_of: Callable[[list[int]], int],
+) -> list[list[int]]:
+    """
+    Greedily pack `indices` into chunks within the size and token limits;
+    `size_of(chunk)` estimates the prompt tokens of a chunk. A trailing
+    single candidate joins the previous chunk, since a one-way vote says nothing.
+    """
+    chunks: list[list[int]] = []
+    current: list[int] = []
+    for i in indices:
+        trial = current + [i]
+        too_many = chunking.chunk_size is not None and len(trial) > chunking.chunk_size
+        too_long = chunking.max_prompt_tokens is not None and len(current) >= 2 and size_of(trial) > chunking.max_prompt_tokens
+        if current and (too_many or too_long):
+            chunks.append(current)
+            current = [i]
+        else:
+            current = trial
+    if current:
+        chunks.append(current)
+    if len(chunks) > 1 and len(chunks[-1]) == 1:
+        chunks[-2].extend(chunks.pop())
+    return chunks
+
+
+def borda(votes: list[float]) -> list[float]:
+    """
+    Share of the other chunk members each candidate out-voted (ties count half), in [0, 1].
+    """
+    n = len(votes)
+    if n < 2:
+        return [1.0] * n
+    return [
+        sum(1.0 if v > w else 0.5 if v == w else 0.0 for j, w in enumerate(votes) if j != i) / (n - 1)
+        for i, v in enumerate(votes)
+    ]
+
+
+def bradley_terry(
+    n: int,
+    wins: dict[tuple[int, int], float],
+    prior: float = 0.1,
+    iterations: int = 200,
+    tol: float = 1e-8,
+) -> list[float]:
+    """
+    Bradley-Terry strengths from `wins[(i, j)]` (how often i beat j), fitted
+    with the MM algorithm. Every compared pair gets `prior` pseudo-wins each
+    way so unbeaten or winless candidates stay finite. Returns strengths
+    scaled to max 1.
+    """
+    pairs: dict[tuple[int, int], float] = {}
+    won = [0.0] * n
+    for (i, j), w in wins.items():
+        key = (min(i, j), max(i, j))
+        pairs[key] = pairs.get(key, 2 * prior) + w
+        won[i] += w
+    for i, j in pairs:
+        won[i] += prior
+        won[j] += prior
+    p = [1.0] * n
+    for _ in range(iterations):
+        denom = [0.0] * n
+        for (i, j), games in pairs.items():
+            d = games / (p[i] + p[j])
+            denom[i] += d
+            denom[j] += d
+        new = [won[i] / denom[i] if denom[i] > 0 else p[i] for i in range(n)]
+        # fix the scale with the geometric mean
+        norm = math.exp(sum(math.log(x) for x in new) / n)
+        new = [x / norm for x in new]
+        delta = max(abs(a - b) for a, b in zip(new, p))
+        p = new
+        if delta < tol:
+            break
+    top = max(p)
+    return [x / top for x in p]
+
+
+class Tournament:
+    """
+    Drives chunked voting for one evaluate() call. `next_round()` returns the
+    chunks to vote on (candidate indices and their prompt), `record()` takes
+    the vote counts per chunk, and `scores()` aggregates once no round is left.
+    Transport-free so the sync and async evaluators share it.
+    """
+
+    def __init__(
+        self,
+        chunking: VoteChunking,
+        step: int,
+        candidates: list[Candidate],
+        vote_prompt_builder: Callable[[int, list[Candidate]], PromptLike],
+        n_evaluate: int,
+    ) -> None:
+        self.chunking = chunking
+        self.step = step
+        self.candidates = candidates
+        self.build = vote_prompt_builder
+        self.n_evaluate = max(1, n_evaluate)
+        order = list(range(len(candidates)))
+        if chunking.shuffle:
+            random.Random(chunking.seed + step).shuffle(order)
+        self.alive = order
+        self.round = 0
+        self.done = False
+        self.single = False
+        self.reached = [0] * len(candidates)
+        # latest per-round score in [0, 1], and raw votes when there was only one prompt
+        self.last = [0.0] * len(candidates)
+        self.raw: list[float] = []
+        self.wins: dict[tuple[int, int], float] = {}
+
+    def _prompt(self, chunk: list[int]) -> PromptLike:
+        return self.build(self.step, [self.candidates[i] for i in chunk])
+
+    def next_round(self) -> list[tuple[list[int], PromptLike]]:
+        if self.done:
+            return []
+        chunks = plan_chunks(self.alive, self.chunking, lambda c: _prompt_tokens(self._prompt(c)))
+        if self.round == 0 and len(chunks) == 1:
+            self.single = True
+        return [(chunk, self._prompt(chunk)) for chunk in chunks]
+
+    def record(self, chunks: list[list[int]], votes: list[list[float]]) -> None:
+        advancing: list[int] = []
+        for chunk, counts in zip(chunks, votes):
+            if self.single:
+                self.raw = [0.0] * len(self.candidates)
+                for pos, i in enumerate(chunk):
+                    self.raw[i] = counts[pos]
+            ranks = borda(counts)
+            for pos, i in enumerate(chunk):
+                self.reached[i] = self.round
+                if self.chunking.aggregate == "votes":
+                    self.last[i] = counts[pos] / self.n_evaluate
+                else:
+                    self.last[i] = ranks[pos]
+                for j in chunk:
+                    if j != i and counts[pos] > 0:
+                        self.wins[(i, j)] = self.wins.get((i, j), 0.0) + counts[pos]
+            ranked = sorted(range(len(chunk)), key=lambda p: -counts[p])
+            advancing.extend(chunk[p] for p in ranked[: self.chunking.advance])
+
+        self.round += 1
+        if not self.chunking.knockout or len(chunks) == 1 or len(advancing) >= len(self.alive):
+            self.done = True
+        else:
+            self.alive = advancing
+
+    def scores(self) -> list[float]:
+        if self.single:
+            return [float(v) for v in self.raw]
+        if self.chunking.aggregate == "bradley_terry":
+            strength = bradley_terry(len(self.candidates), self.wins)
+            return [self.reached[i] + strength[i] for i in range(len(self.candidates))]
+        return [self.reached[i] + self.last[i] for i in range(len(self.candidates))]
@@ -0,0 +1,40 @@
+import pytest
+
+from tot_unit import LLMConfig, LLMToT, LLMToTConfig, LLMToTStepConfig, MockLLM, MockRegistry
+from tot_unit.core import GreedySelector, MaxStepStopper
+
+
+def vote_prompt(step, candidates):
+    return "Pick the most promising passage.\n" + "\n".join(f"Choice {i + 1}: {c.text}" for i, c in enumerate(candidates))
+
+
+def continue_prompt(step, candidate):
+    return f"Continue the passage: {candidate.text}"
+
+
+@pytest.fixture
+def mock_tot():
+    """
+    Builds an LLMToT whose every request is answered by a MockLLM, no sockets.
+    """
+
+    def build(llm=None, steps=2, n_generate=3, n_select=2, n_evaluate=3, **overrides):
+        llm_cfg = overrides.pop("llm_cfg", None) or LLMConfig(api_key="test", api_base="http://mock.test/v1", model="mock")
+        cfg = LLMToTConfig(
+            steps=steps,
+            n_generate=n_generate,
+            n_select=n_select,
+            n_evaluate=n_evaluate,
+            step_llms=[LLMToTStepConfig(gen=llm_cfg, judge=llm_cfg)] * steps,
+            prompt_builder=continue_prompt,
+            vote_prompt_builder=vote_prompt,
+            **overrides,
+        )
+        return LLMToT(
+            cfg=cfg,
+            registry=MockRegistry(llm if llm is not None else MockLLM()),
+            selector=GreedySelector(),
+            stopper=MaxStepStopper(max_step=steps),
+        )
+
+    return build
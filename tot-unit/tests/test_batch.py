@@ -0,0 +1,109 @@
+import json
+import threading
+import time
+
+from tot_unit import MockLLM
+from tot_unit.core import BatchCheckpoint, Candidate, GreedySelector, MaxStepStopper, ToTConfig, ToTRunner
+from tot_unit.core.codec import PickleCodec
+
+
+class SlowFirstGenerator:
+    """
+    Problem i sleeps less the larger i is, so trees finish in reverse order.
+    """
+
+    def __init__(self, n_problems):
+        self.n_problems = n_problems
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def generate(self, step, current, n_generate):
+        problem = current[0].state
+        with self._lock:
+            self.calls.append(problem)
+        time.sleep(0.01 * (self.n_problems - problem))
+        return [Candidate(state=c.state, text=f"{c.text}{k}") for c in current for k in range(n_generate)]
+
+
+class LengthEvaluator:
+    def evaluate(self, step, candidates, n_evaluate):
+        return [float(c.text[-1]) for c in candidates]
+
+
+CFG = ToTConfig(steps=2, n_generate=2, n_select=1, n_evaluate=1)
+
+
+def _problems(n):
+    return [[Candidate(state=i, text=f"p{i}:")] for i in range(n)]
+
+
+def _runner(generator):
+    return ToTRunner(generator, LengthEvaluator(), GreedySelector(), MaxStepStopper(max_step=99), CFG)
+
+
+def test_run_batch_yields_each_problem_as_it_finishes():
+    gen = SlowFirstGenerator(4)
+    out = list(_runner(gen).run_batch(_problems(4), max_workers=4))
+
+    assert sorted(i for i, _ in out) == [0, 1, 2, 3]
+    # completion order, not submission order
+    assert [i for i, _ in out] != [0, 1, 2, 3]
+    for index, result in out:
+        assert result.final_candidates[0].text.startswith(f"p{index}:")
+
+
+def test_run_batch_skips_checkpointed_problems(tmp_path):
+    path = str(tmp_path / "batch.jsonl")
+    first = dict(_runner(SlowFirstGenerator(3)).run_batch(_problems(3), max_workers=2, checkpoint=path))
+
+    gen = SlowFirstGenerator(5)
+    out = list(_runner(gen).run_batch(_problems(5), max_workers=2, checkpoint=path))
+
+    # recorded problems come first, in index order, without calling any component for them
+    assert [i for i, _ in out[:3]] == [0, 1, 2]
+    assert sorted(set(gen.calls)) == [3, 4]
+    for index in range(3):
+        assert [c.text for c in out[index][1].final_candidates] == [c.text for c in first[index].final_candidates]
+    assert sorted(i for i, _ in out) == [0, 1, 2, 3, 4]
+
+
+class CountingCodec(PickleCodec):
+    def __init__(self):
+        self.decoded = 0
+
+    def decode(self, data):
+        self.decoded += 1
+        return super().decode(data)
+
+
+def test_checkpoint_load_indexes_ids_and_decodes_lazily(tmp_path):
+    path = str(tmp_path / "batch.jsonl")
+    list(_runner(SlowFirstGenerator(3)).run_batch(_problems(3), checkpoint=path))
+    with open(path, "a", encoding="utf-8") as f:
+        # torn record from a crash mid-write
+        f.write(json.dumps({"index": 7, "result": {}})[:10])
+
+    codec = CountingCodec()
+    done = BatchCheckpoint(path, codec=codec).load()
+
+    assert sorted(done) == [0, 1, 2]
+    assert 7 not in done
+    assert codec.decoded == 0
+    assert done[1].final_candidates[0].state == 1
+    assert codec.decoded > 0
+
+
+def test_run_many_with_checkpoint_sends_no_requests_for_finished_problems(mock_tot, tmp_path):
+    llm = MockLLM()
+    tot = mock_tot(llm)
+    path = str(tmp_path / "batch.jsonl")
+    problems = [[Candidate(state=None, text=f"Story {i}.")] for i in range(3)]
+
+    first = dict(tot.run_many(problems, max_workers=3, checkpoint=path))
+    requests = llm.stats.requests
+    again = dict(tot.run_many(problems, max_workers=3, checkpoint=path))
+
+    assert llm.stats.requests == requests
+    assert {i: [c.text for c in r.final_candidates] for i, r in again.items()} == {
+        i: [c.text for c in r.final_candidates] for i, r in first.items()
+    }
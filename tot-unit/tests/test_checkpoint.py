@@ -0,0 +1,111 @@
+import json
+import random
+from dataclasses import dataclass, field
+
+import pytest
+
+from tot_unit.core import Candidate, MaxStepStopper, RunCheckpoint, ToTConfig, ToTRunner
+
+
+class DigitGenerator:
+    """
+    Child k of "12" is "12k"; with `fail_at`, raises at that step instead.
+    """
+
+    def __init__(self, fail_at=None):
+        self.fail_at = fail_at
+
+    def generate(self, step, current, n_generate):
+        if step == self.fail_at:
+            raise RuntimeError("crashed")
+        return [Candidate(state={"depth": step}, text=f"{c.text}{k}") for c in current for k in range(n_generate)]
+
+
+class DigitSumEvaluator:
+    def evaluate(self, step, candidates, n_evaluate):
+        return [1.0 + sum(int(d) for d in c.text) for c in candidates]
+
+
+@dataclass(frozen=True)
+class ShuffleSelector:
+    """
+    Draws from its own persistent `_rng`, so resuming must restore it.
+    """
+
+    seed: int = 3
+    _rng: random.Random = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "_rng", random.Random(self.seed))
+
+    def select(self, candidates, scores, n_select):
+        return self._rng.sample(candidates, min(n_select, len(candidates)))
+
+
+CFG = ToTConfig(steps=5, n_generate=3, n_select=2, n_evaluate=1)
+INITIAL = [Candidate(state=None, text="1")]
+
+
+def _runner(directory, fail_at=None):
+    return ToTRunner(DigitGenerator(fail_at), DigitSumEvaluator(), ShuffleSelector(), MaxStepStopper(99), CFG, checkpoint=str(directory))
+
+
+def _summary(result):
+    return [c.text for c in result.final_candidates], [(log.step, log.scores) for log in result.logs], result.search
+
+
+def test_resumed_run_matches_an_uninterrupted_one(tmp_path):
+    expected = _runner(tmp_path / "a").run(INITIAL, run_id="job")
+
+    with pytest.raises(RuntimeError):
+        _runner(tmp_path / "b", fail_at=3).run(INITIAL, run_id="job")
+    # a fresh runner, as after a restart: the selector RNG comes from the checkpoint
+    resumed = _runner(tmp_path / "b").resume("job")
+
+    assert _summary(resumed) == _summary(expected)
+    assert RunCheckpoint(str(tmp_path / "b")).load("job").done
+
+
+def test_checkpoints_leave_the_global_random_state_alone(tmp_path):
+    random.seed(1234)
+    before = random.getstate()
+    with pytest.raises(RuntimeError):
+        _runner(tmp_path, fail_at=2).run(INITIAL, run_id="job")
+    _runner(tmp_path).resume("job")
+
+    assert random.getstate() == before
+
+
+def test_each_step_appends_only_its_own_logs(tmp_path):
+    with pytest.raises(RuntimeError):
+        _runner(tmp_path, fail_at=2).run(INITIAL, run_id="job")
+    _runner(tmp_path).resume("job")
+
+    ckpt = RunCheckpoint(str(tmp_path))
+    records = [json.loads(line) for line in open(ckpt.path("job"), encoding="utf-8")]
+    assert [r["step"] for r in records] == [1, 2, 3, 4, 5]
+    assert all(len(r["logs"]) == 1 for r in records)
+    assert [log.step for log in ckpt.load("job").logs] == [0, 1, 2, 3, 4]
+
+
+def test_torn_record_falls_back_to_the_previous_step(tmp_path):
+    with pytest.raises(RuntimeError):
+        _runner(tmp_path, fail_at=3).run(INITIAL, run_id="job")
+    ckpt = RunCheckpoint(str(tmp_path))
+    with open(ckpt.path("job"), "ab") as f:
+        f.write(b'{"version": 2, "run_id": "job", "step": 4, "fron')
+
+    state = RunCheckpoint(str(tmp_path)).load("job")
+    assert state.step == 3
+    assert len(state.logs) == 3
+    assert RunCheckpoint(str(tmp_path)).latest() == "job"
+
+
+def test_rerunning_a_run_id_starts_its_file_over(tmp_path):
+    runner = _runner(tmp_path)
+    runner.run(INITIAL, run_id="job")
+    runner.run([Candidate(state=None, text="2")], run_id="job")
+
+    state = runner.checkpoint.load("job")
+    assert len(state.logs) == CFG.steps
+    assert state.frontier[0].text.startswith("2")
@@ -0,0 +1,49 @@
+import time
+
+from tot_unit import EndpointLimiter, EndpointLimits, LLMConfig, RateLimiter, endpoint_limiter
+
+
+def _endpoint_limiters(client):
+    return [lim for lim in client.cfg.limiters if isinstance(lim, EndpointLimiter)]
+
+
+def test_endpoint_limiter_is_shared_per_quota():
+    a = endpoint_limiter("http://quota.test/v1/", "m", rpm=60)
+    assert endpoint_limiter("http://quota.test/v1", "m", rpm=60) is a
+    # a different quota must not silently reuse the first one
+    b = endpoint_limiter("http://quota.test/v1", "m", rpm=120)
+    assert b is not a
+    assert b.requests.rate == 2.0
+
+
+def test_batch_rpm_tightens_the_endpoint_quota_on_one_limiter(mock_tot):
+    llm_cfg = LLMConfig(api_key="test", api_base="http://batch.test/v1", model="mock", rpm=600)
+    tot = mock_tot(llm_cfg=llm_cfg)
+
+    runner = tot.build_runner(EndpointLimits(max_in_flight=4, rpm=120))
+    limiters = _endpoint_limiters(runner.generator.client_for_step(0))
+    assert len(limiters) == 1
+    assert limiters[0].requests.rate == 2.0
+
+    # a looser batch rpm keeps the endpoint's own
+    runner = tot.build_runner(EndpointLimits(rpm=6000))
+    (limiter,) = _endpoint_limiters(runner.generator.client_for_step(0))
+    assert limiter.requests.rate == 10.0
+
+
+def test_rate_limiter_paces_without_a_concurrency_window():
+    limiter = RateLimiter(rpm=600, burst=1)
+    assert limiter.concurrency is None
+    start = time.monotonic()
+    for _ in range(3):
+        with limiter.slot():
+            pass
+    assert time.monotonic() - start >= 0.15
+
+
+def test_rejected_request_refunds_reserved_tokens():
+    limiter = EndpointLimiter(tpm=1000, max_concurrency=None)
+    with limiter.slot(tokens=800):
+        pass
+    limiter.feedback(False, reserved=800, used=0)
+    assert limiter.tokens.reserve(900) == 0.0
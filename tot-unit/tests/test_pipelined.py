@@ -0,0 +1,73 @@
+import asyncio
+
+from tot_unit.core import AsyncToTRunner, Candidate, GreedySelector, MaxStepStopper, PipelinedToTRunner, ToTConfig
+
+
+class ShortGenerator:
+    """
+    Returns fewer children than asked for (as dedup, adaptive sampling or a
+    failed chunk would), with parent-dependent delays so steps overlap.
+    """
+
+    async def generate(self, step, current, n_generate):
+        out = []
+        for c in current:
+            await asyncio.sleep(0.001 * (len(c.text) % 3))
+            keep = 1 + len(c.text) % 2
+            out.extend(Candidate(state=None, text=f"{c.text}{k}") for k in range(min(keep, n_generate)))
+        return out
+
+
+class DigitEvaluator:
+    async def evaluate(self, step, candidates, n_evaluate):
+        await asyncio.sleep(0)
+        return [float(sum(int(d) for d in c.text)) for c in candidates]
+
+
+class RecordingSelector:
+    """
+    GreedySelector that remembers every commit call: the live score list of
+    the step, how many candidates it held, and the announced bound.
+    """
+
+    def __init__(self, threshold=None):
+        self.inner = GreedySelector(threshold=threshold)
+        self.calls = []
+
+    def select(self, candidates, scores, n_select):
+        return self.inner.select(candidates, scores, n_select)
+
+    def commit(self, scores, n_select, committed, n_pending):
+        self.calls.append((scores, len(scores), n_pending))
+        return self.inner.commit(scores, n_select, committed, n_pending)
+
+
+CFG = ToTConfig(steps=3, n_generate=3, n_select=2, n_evaluate=1)
+INITIAL = [Candidate(state=None, text=t) for t in ("1", "22", "303")]
+
+
+def test_pending_bound_holds_for_short_generations():
+    selector = RecordingSelector()
+    asyncio.run(PipelinedToTRunner(ShortGenerator(), DigitEvaluator(), selector, MaxStepStopper(99), CFG).run(INITIAL))
+
+    bounded = [(scores, n, pending) for scores, n, pending in selector.calls if pending is not None]
+    assert bounded
+    for scores, n_at_call, n_pending in bounded:
+        # `scores` is the step's live list: everything that arrived after the call
+        assert len(scores) - n_at_call <= n_pending
+
+
+def test_short_generations_select_like_the_barrier_runner():
+    pipelined = PipelinedToTRunner(ShortGenerator(), DigitEvaluator(), RecordingSelector(), MaxStepStopper(99), CFG)
+    barrier = AsyncToTRunner(ShortGenerator(), DigitEvaluator(), GreedySelector(), MaxStepStopper(99), CFG)
+    got = asyncio.run(pipelined.run(INITIAL))
+    expected = asyncio.run(barrier.run(INITIAL))
+
+    def digit_sum(c):
+        return sum(int(d) for d in c.text)
+
+    # only certain top-k picks are committed early, so every step keeps the barrier's scores
+    # (arrival order differs, so equal scores may pick different candidates)
+    for a, b in zip(got.logs, expected.logs):
+        assert len(a.candidates) == len(b.candidates)
+        assert sorted(map(digit_sum, a.selected)) == sorted(map(digit_sum, b.selected))
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+from openai import BadRequestError
+
+from tot_unit import LLMConfig, MockLLM, MockLLMConfig, MockRegistry
+from tot_unit.llm import AsyncOpenAICompatibleClient, OpenAICompatibleClient
+from tot_unit.routing import AsyncRoutedClient, ProviderHealth, RoutedClient, RoutingPolicy
+
+
+def _endpoints(*mocks, asynchronous=False):
+    client_cls = AsyncOpenAICompatibleClient if asynchronous else OpenAICompatibleClient
+    return [
+        client_cls(
+            LLMConfig(api_key="test", api_base=f"http://endpoint{i}.test/v1", model="mock", max_retries=0, max_rate_limit_retries=0),
+            MockRegistry(mock),
+        )
+        for i, mock in enumerate(mocks)
+    ]
+
+
+NO_HEDGE = RoutingPolicy(hedge=False)
+# hedge after min_hedge_delay once an endpoint has a single latency sample
+EAGER_HEDGE = RoutingPolicy(min_samples=1, min_hedge_delay=0.02)
+
+
+@pytest.mark.parametrize(
+    "failing",
+    [MockLLMConfig(error_rate=1.0), MockLLMConfig(rate_limit_rate=0.99, seed=1)],
+    ids=["5xx", "exhausted-429"],
+)
+def test_endpoint_failures_fail_over(failing):
+    down, up = MockLLM(failing), MockLLM()
+    client = RoutedClient(_endpoints(down, up), NO_HEDGE, ProviderHealth())
+
+    assert len(client.chat("hello", n=2, stop=None)) == 2
+    assert client.stats.failovers == 1
+    assert client.health[0].errors == 1
+    assert up.stats.requests == 1
+
+
+@pytest.mark.parametrize("policy", [NO_HEDGE, EAGER_HEDGE], ids=["failover", "hedged"])
+def test_client_errors_are_raised_without_failover(policy):
+    strict, other = MockLLM(MockLLMConfig(max_n=1)), MockLLM()
+    client = RoutedClient(_endpoints(strict, other), policy, ProviderHealth())
+    client.health[0].record(0.001, ok=True)
+    client.health[1].record(1.0, ok=True)
+
+    with pytest.raises(BadRequestError):
+        client.chat("hello", n=2, stop=None)
+    assert client.stats.failovers == 0
+    assert client.health[0].errors == 0
+    assert other.stats.requests == 0
+
+
+def test_losing_sync_hedges_are_accounted_and_the_pool_is_reused():
+    slow, fast = MockLLM(MockLLMConfig(latency=0.3)), MockLLM()
+    client = RoutedClient(_endpoints(slow, fast), EAGER_HEDGE, ProviderHealth())
+    client.health[0].record(0.001, ok=True)
+    client.health[1].record(1.0, ok=True)
+    pool = client._pool
+
+    for _ in range(3):
+        assert client.chat("hello", n=1, stop=None)
+
+    assert client._pool is pool
+    assert len(pool._threads) <= EAGER_HEDGE.hedge_workers
+    assert client.stats.hedges >= 1
+    assert client.stats.abandoned == client.stats.hedge_wins >= 1
+    client.close()
+
+
+def test_async_losing_hedge_is_censored_not_failed():
+    slow, fast = MockLLM(MockLLMConfig(latency=0.3)), MockLLM()
+    client = AsyncRoutedClient(_endpoints(slow, fast, asynchronous=True), EAGER_HEDGE, ProviderHealth())
+    client.health[0].record(0.01, ok=True)
+    client.health[1].record(1.0, ok=True)
+
+    assert asyncio.run(client.chat("hello", n=1, stop=None))
+    slow_health = client.health[0]
+    assert client.stats.hedge_wins == 1
+    # the cancelled attempt only raised the latency estimate: no call, no error
+    assert (slow_health.calls, slow_health.errors) == (1, 0)
+    assert slow_health.latency > 0.01
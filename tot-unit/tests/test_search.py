@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+from tot_unit.core import (
+    AsyncToTRunner,
+    BeamSearch,
+    BestFirstSearch,
+    Candidate,
+    DFSSearch,
+    GreedySelector,
+    MaxStepStopper,
+    MCTSSearch,
+    ScoreThresholdStopper,
+    SearchBudget,
+    ToTConfig,
+    ToTRunner,
+)
+
+
+class DigitGenerator:
+    """
+    Child k of "1.2" is "1.2.k"; deterministic, so sync and async runs match.
+    """
+
+    def generate(self, step, current, n_generate):
+        return [Candidate(state=None, text=f"{c.text}.{k}") for c in current for k in range(n_generate)]
+
+
+class AsyncDigitGenerator(DigitGenerator):
+    async def generate(self, step, current, n_generate):
+        await asyncio.sleep(0)
+        return DigitGenerator.generate(self, step, current, n_generate)
+
+
+class DigitSumEvaluator:
+    def evaluate(self, step, candidates, n_evaluate):
+        return [float(sum(int(d) for d in c.text.split("."))) for c in candidates]
+
+
+CFG = ToTConfig(steps=3, n_generate=3, n_select=2, n_evaluate=1)
+STRATEGIES = [
+    BeamSearch(),
+    BestFirstSearch(budget=SearchBudget(max_expansions=6)),
+    BestFirstSearch(cost_per_step=0.5, pop_size=2),
+    DFSSearch(prune_below=3.0),
+    MCTSSearch(max_iterations=8),
+]
+
+
+def _texts(result):
+    return [c.text for c in result.final_candidates]
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES, ids=lambda s: type(s).__name__)
+def test_async_runner_drives_the_same_strategies(strategy):
+    stopper = ScoreThresholdStopper(threshold=6.0)
+    sync = ToTRunner(DigitGenerator(), DigitSumEvaluator(), GreedySelector(), stopper, CFG, strategy=strategy)
+    aio = AsyncToTRunner(AsyncDigitGenerator(), DigitSumEvaluator(), GreedySelector(), stopper, CFG, strategy=strategy)
+
+    expected = sync.run([Candidate(state=None, text="0")], run_id="r")
+    got = asyncio.run(aio.run([Candidate(state=None, text="0")], run_id="r"))
+
+    assert _texts(got) == _texts(expected)
+    assert got.search == expected.search
+    assert [log.scores for log in got.logs] == [log.scores for log in expected.logs]
+
+
+def test_async_resume_of_finished_run_keeps_search_stats(tmp_path):
+    runner = AsyncToTRunner(
+        AsyncDigitGenerator(),
+        DigitSumEvaluator(),
+        GreedySelector(),
+        ScoreThresholdStopper(threshold=100.0),
+        CFG,
+        checkpoint=str(tmp_path),
+    )
+    result = asyncio.run(runner.run([Candidate(state=None, text="0")], run_id="done"))
+    resumed = asyncio.run(runner.resume("done"))
+
+    assert resumed.search is not None
+    assert resumed.search.expansions == result.search.expansions
+    assert _texts(resumed) == _texts(result)
+
+
+def test_async_runner_rejects_strategies_it_cannot_await():
+    class SyncOnly:
+        def search(self, runner, initial, run_id):
+            raise AssertionError("not called")
+
+    with pytest.raises(ValueError):
+        AsyncToTRunner(AsyncDigitGenerator(), DigitSumEvaluator(), GreedySelector(), ScoreThresholdStopper(1.0), CFG, strategy=SyncOnly())
+
+
+def test_max_step_stopper_is_reported_as_a_step_limit():
+    runner = ToTRunner(DigitGenerator(), DigitSumEvaluator(), GreedySelector(), MaxStepStopper(max_step=1), CFG)
+    result = runner.run([Candidate(state=None, text="0")])
+
+    assert len(result.logs) == 2
+    assert result.search.stopped_by == "steps"
+    assert not result.search.solved
+
+
+def test_text_estimate_is_flagged_without_recorded_calls():
+    runner = ToTRunner(DigitGenerator(), DigitSumEvaluator(), GreedySelector(), ScoreThresholdStopper(100.0), CFG)
+    result = runner.run([Candidate(state=None, text="0")])
+
+    assert result.search.tokens_estimated
+
+
+def test_search_tokens_count_every_llm_call_of_the_run(mock_tot):
+    result = mock_tot(steps=2).run([Candidate(state=None, text="Once upon a time")])
+
+    total = result.telemetry.total().total_tokens
+    assert total > 0
+    assert result.search.tokens == total
+    assert not result.search.tokens_estimated
@@ -0,0 +1,44 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+from tot_unit.core import Candidate, MaxStepStopper, SampleSelector, ToTConfig, ToTRunner
+from tot_unit.core.fast_selectors import WeightedSampleSelector
+
+
+class DigitGenerator:
+    def generate(self, step, current, n_generate):
+        return [Candidate(state=None, text=f"{c.text}{k}") for c in current for k in range(n_generate)]
+
+
+class DigitSumEvaluator:
+    def evaluate(self, step, candidates, n_evaluate):
+        return [1.0 + sum(int(d) for d in c.text) for c in candidates]
+
+
+CFG = ToTConfig(steps=3, n_generate=4, n_select=2, n_evaluate=1)
+PROBLEMS = [f"{i}" for i in range(8)]
+
+
+def _run(runner, problem):
+    result = runner.run([Candidate(state=None, text=problem)], run_id=f"problem-{problem}")
+    return [[c.text for c in log.selected] for log in result.logs]
+
+
+def test_runs_sharing_a_sampling_selector_do_not_depend_on_thread_order():
+    for selector in (SampleSelector(seed=7), WeightedSampleSelector(seed=7)):
+        runner = ToTRunner(DigitGenerator(), DigitSumEvaluator(), selector, MaxStepStopper(99), CFG)
+        sequential = {p: _run(runner, p) for p in PROBLEMS}
+
+        shuffled = list(PROBLEMS)
+        random.Random(0).shuffle(shuffled)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            concurrent = dict(zip(shuffled, pool.map(lambda p: _run(runner, p), shuffled)))
+
+        assert concurrent == sequential
+
+
+def test_runs_leave_the_shared_rng_alone():
+    selector = SampleSelector(seed=7)
+    before = selector._rng.getstate()
+    ToTRunner(DigitGenerator(), DigitSumEvaluator(), selector, MaxStepStopper(99), CFG).run([Candidate(state=None, text="0")])
+    assert selector._rng.getstate() == before
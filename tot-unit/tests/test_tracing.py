@@ -0,0 +1,22 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from tot_unit import UsageStats
+from tot_unit.core.tracing import record_call, run_scope
+
+OPENAI = SimpleNamespace(prompt_tokens=100, completion_tokens=20, prompt_tokens_details=SimpleNamespace(cached_tokens=64))
+DEEPSEEK = SimpleNamespace(prompt_tokens=100, completion_tokens=20, prompt_cache_hit_tokens=64, prompt_cache_miss_tokens=36)
+
+
+@pytest.mark.parametrize("usage", [OPENAI, DEEPSEEK], ids=["openai", "deepseek"])
+def test_telemetry_and_usage_stats_read_cached_tokens_alike(usage):
+    stats = UsageStats()
+    stats.record(usage)
+    with run_scope("r") as telemetry:
+        record_call(time.time(), usage=usage)
+    total = telemetry.total()
+
+    assert (total.prompt_tokens, total.completion_tokens, total.cached_tokens) == (100, 20, 64)
+    assert (stats.prompt_tokens, stats.completion_tokens, stats.cached_prompt_tokens) == (100, 20, 64)
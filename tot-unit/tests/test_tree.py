@@ -0,0 +1,39 @@
+import asyncio
+import gc
+
+from tot_unit import MockLLM, RunStores, TreeCandidate
+from tot_unit.core import Candidate
+
+
+def _problems(n):
+    return [[Candidate(state=None, text=f"problem {i}: ")] for i in range(n)]
+
+
+def test_batch_runs_get_their_own_store_and_release_it(mock_tot):
+    tot = mock_tot(MockLLM(), compact_tree=True)
+    runner = tot.build_runner()
+    stores = runner.generator.store
+    assert isinstance(stores, RunStores)
+
+    results = dict(runner.run_batch(_problems(4), max_workers=4))
+    trees = {index: {c.store for c in r.final_candidates} for index, r in results.items()}
+    for index, result in results.items():
+        assert all(isinstance(c, TreeCandidate) for c in result.final_candidates)
+        assert all(c.text.startswith(f"problem {index}: ") for c in result.final_candidates)
+        assert len(trees[index]) == 1
+    assert len(set.union(*trees.values())) == 4
+
+    del results, trees, result
+    gc.collect()
+    assert len(stores) == 0
+
+
+def test_async_runs_resolve_the_store_of_their_run(mock_tot):
+    tot = mock_tot(MockLLM(), compact_tree=True)
+
+    async def collect():
+        return {index: result async for index, result in tot.arun_many(_problems(3))}
+
+    results = asyncio.run(collect())
+    stores = {c.store for r in results.values() for c in r.final_candidates}
+    assert len(stores) == 3
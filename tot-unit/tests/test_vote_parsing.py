@@ -0,0 +1,71 @@
+import pytest
+
+from tot_unit.vote_parsing import JSONVoteParser, RankingVoteParser, RegexVoteParser, count_votes, parse_confidence
+
+
+def _pick(parser, output, n=5):
+    votes = parser(output, n)
+    return votes.index(max(votes)) + 1 if any(votes) else None
+
+
+@pytest.mark.parametrize(
+    "output, expected",
+    [
+        ("I think 3.", 3),
+        ("The best choice is 4", 4),
+        ("I am sure of 2", 2),
+        ("50% sure, choice 2", 2),
+        ("Answer: 2. Later I mention 3 of 5", 2),
+        ("2 of 5 are fine", 2),
+        ("Score 1.5 overall", None),
+        ("8/10 for this one", None),
+        ("Choice 9", None),
+    ],
+)
+def test_regex_parser_reads_free_text_votes(output, expected):
+    assert _pick(RegexVoteParser(), output) == expected
+
+
+def test_regex_parser_without_fallback_needs_a_pattern():
+    assert _pick(RegexVoteParser(fallback=False), "I think 3.") is None
+
+
+def test_confidence_weights_the_vote():
+    assert RegexVoteParser(confidence=True)("Answer: 2, confidence: 80%", 3) == [0.0, 0.8, 0.0]
+    assert RegexVoteParser(confidence=True)("Answer: 2", 3) == [0.0, 1.0, 0.0]
+    assert parse_confidence("confidence 0.4, then confidence level: 90") == 0.9
+
+
+def test_json_parser_reads_fenced_objects():
+    output = 'Here you go:\n```json\n{"choice": 2, "confidence": 0.5}\n```'
+    assert JSONVoteParser()(output, 3) == [0.0, 0.5, 0.0]
+
+
+def test_json_ranking_gets_normalized_borda_weights():
+    assert JSONVoteParser()('{"ranking": [3, 1]}', 3) == pytest.approx([0.4, 0.0, 0.6])
+
+
+@pytest.mark.parametrize(
+    "output, expected",
+    [
+        # invalid JSON goes to the regex fallback
+        ('{choice: 2', [0.0, 1.0, 0.0]),
+        # booleans are not ids
+        ('{"choice": true} so answer: 1', [1.0, 0.0, 0.0]),
+        # out of range, and the fallback finds nothing in range either
+        ('{"choice": 7}', [0.0, 0.0, 0.0]),
+    ],
+)
+def test_json_parser_edge_cases(output, expected):
+    assert JSONVoteParser()(output, 3) == expected
+
+
+def test_ranking_parser_scores_every_candidate():
+    parser = RankingVoteParser()
+    assert parser("Ranking: 3 > 1 > 2", 3) == pytest.approx([1 / 3, 1 / 6, 1 / 2])
+    assert parser("Ranking: 9 > 8", 3) == [0.0, 0.0, 0.0]
+    assert parser("no ranking, answer: 2", 3) == [0.0, 1.0, 0.0]
+
+
+def test_count_votes_sums_samples():
+    assert count_votes(["Answer: 1", "Answer: 1", "pick 2"], 3) == [2.0, 1.0, 0.0]